@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Broadcast latency benchmark for SecureWebSocketServer.
+
+Simulates N authenticated devices with in-process fake websockets (each
+send takes --send-ms, and --slow-fraction of devices take --slow-ms) and
+compares the legacy path (json.dumps + awaited send per client) with the
+encode-once fan-out through per-connection writer queues.
+
+Usage:
+    python benchmarks/bench_broadcast.py
+    python benchmarks/bench_broadcast.py --devices 1000 10000 --send-ms 1 --slow-ms 200
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nanobot.gateway.connection import ConnectionState, ConnectionWriter  # noqa: E402
+from nanobot.gateway.websocket import AuthenticatedClient, SecureWebSocketServer  # noqa: E402
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float, done: asyncio.Event, counter: list[int], total: int):
+        self.delay = delay
+        self.done = done
+        self.counter = counter
+        self.total = total
+
+    async def send(self, frame: str | bytes) -> None:
+        await asyncio.sleep(self.delay)
+        self.counter[0] += 1
+        if self.counter[0] >= self.total:
+            self.done.set()
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        pass
+
+
+def build(n: int, send_s: float, slow_s: float, slow_fraction: float):
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=None)
+    done = asyncio.Event()
+    counter = [0]
+    slow_every = int(1 / slow_fraction) if slow_fraction > 0 else 0
+    for i in range(n):
+        delay = slow_s if slow_every and i % slow_every == 0 else send_s
+        ws = FakeWebSocket(delay, done, counter, n)
+        writer = ConnectionWriter(ws, send_timeout=60)
+        writer.start()
+        server._connections[ws] = ConnectionState(ws, "127.0.0.1", writer)
+        server._register_client(ws, AuthenticatedClient(f"device_{i}", f"Phone {i}", ws, 0.0))
+    return server, done
+
+
+async def shutdown(server: SecureWebSocketServer) -> None:
+    for state in server._connections.values():
+        await state.writer.stop()
+
+
+async def legacy_broadcast(server: SecureWebSocketServer, message: str) -> None:
+    for client in list(server.authenticated_clients.values()):
+        await client.websocket.send(json.dumps({"type": "message", "content": message}))
+
+
+async def run(n: int, send_s: float, slow_s: float, slow_fraction: float) -> dict[str, float]:
+    message = "x" * 200
+
+    server, done = build(n, send_s, slow_s, slow_fraction)
+    start = time.perf_counter()
+    await legacy_broadcast(server, message)
+    legacy = time.perf_counter() - start
+    await shutdown(server)
+
+    server, done = build(n, send_s, slow_s, slow_fraction)
+    start = time.perf_counter()
+    await server.broadcast_message(message)
+    enqueue = time.perf_counter() - start
+    await done.wait()
+    delivered = time.perf_counter() - start
+    await shutdown(server)
+
+    return {"legacy_s": legacy, "enqueue_s": enqueue, "delivered_s": delivered}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--send-ms", type=float, default=1.0, help="Per-send latency of a normal client")
+    parser.add_argument("--slow-ms", type=float, default=200.0, help="Per-send latency of a slow client")
+    parser.add_argument("--slow-fraction", type=float, default=0.01, help="Fraction of slow clients")
+    args = parser.parse_args()
+
+    print(f"{'devices':>8} {'legacy (s)':>12} {'enqueue (ms)':>14} {'all delivered (s)':>18}")
+    for n in args.devices:
+        r = asyncio.run(run(n, args.send_ms / 1000, args.slow_ms / 1000, args.slow_fraction))
+        print(f"{n:>8} {r['legacy_s']:>12.3f} {1000 * r['enqueue_s']:>14.2f} {r['delivered_s']:>18.3f}")
+
+
+if __name__ == "__main__":
+    main()
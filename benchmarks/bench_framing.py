@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Wire size and CPU cost of mobile protocol frame encodings.
+
+Encodes a mix of typical frames (acks, short chat messages, long markdown
+replies) with every available codec, then compresses the stream the way
+permessage-deflate does (raw deflate, shared context, sync flush per
+message) at the server's window/memLevel settings. Reports average bytes
+per frame and server CPU per frame for encode, decode and compression.
+
+Usage:
+    python benchmarks/bench_framing.py
+    python benchmarks/bench_framing.py --frames 20000 --window-bits 12 --mem-level 5
+"""
+
+import argparse
+import random
+import sys
+import time
+import zlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from nanobot.gateway.codec import load_codecs  # noqa: E402
+
+WORDS = (
+    "the agent found three files in your workspace and updated the config "
+    "so the deploy uses the new bucket please review the diff below before "
+    "merging it tomorrow morning 你好 résumé"
+).split()
+
+
+def sample_frames(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return " ".join(rng.choice(WORDS) for _ in range(words))
+
+    frames = []
+    for i in range(n):
+        kind = i % 4
+        if kind == 0:
+            frames.append({"type": "ack", "message": "Message received", "message_id": f"m-{i:08d}"})
+        elif kind == 1:
+            frames.append({"type": "message", "content": text(12)})
+        elif kind == 2:
+            frames.append({"type": "message", "content": text(4)})
+        else:
+            body = "\n".join(f"- {text(10)}" for _ in range(25))
+            frames.append({"type": "message", "content": f"## Summary\n\n{body}\n\n```python\nprint('done')\n```"})
+    return frames
+
+
+def deflate_stream(payloads: list[bytes], window_bits: int, mem_level: int) -> tuple[int, float]:
+    """Total compressed bytes and seconds, compressing like permessage-deflate."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -window_bits, mem_level)
+    total = 0
+    start = time.perf_counter()
+    for payload in payloads:
+        data = compressor.compress(payload) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        total += len(data) - 4  # Trailing 00 00 ff ff is stripped on the wire
+    return total, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--frames", type=int, default=10000)
+    parser.add_argument("--window-bits", type=int, default=12)
+    parser.add_argument("--mem-level", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = sample_frames(args.frames)
+    codecs = load_codecs(["json", "msgpack", "cbor"])
+    missing = {"msgpack", "cbor"} - set(codecs)
+    if missing:
+        print(f"(skipping {', '.join(sorted(missing))}: install nanobot-ai[binary])")
+
+    print(
+        f"{'encoding':>8} {'raw B/frame':>12} {'deflate B/frame':>16} "
+        f"{'encode us':>10} {'decode us':>10} {'deflate us':>11}"
+    )
+    for name, codec in codecs.items():
+        start = time.perf_counter()
+        encoded = [codec.encode(f) for f in frames]
+        encode_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for e in encoded:
+            codec.decode(e)
+        decode_s = time.perf_counter() - start
+
+        payloads = [e.encode("utf-8") if isinstance(e, str) else e for e in encoded]
+        raw = sum(len(p) for p in payloads)
+        deflated, deflate_s = deflate_stream(payloads, args.window_bits, args.mem_level)
+
+        n = len(frames)
+        print(
+            f"{name:>8} {raw / n:>12.1f} {deflated / n:>16.1f} "
+            f"{1e6 * encode_s / n:>10.2f} {1e6 * decode_s / n:>10.2f} {1e6 * deflate_s / n:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
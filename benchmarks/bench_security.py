@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Per-message cost of SecurityValidator checks as allowlists and pattern sets grow.
+
+Compares the previous implementations (a linear scan over whitelist
+networks; one re.search per suspicious pattern) against the prefix trie
+and the PatternMatcher, on random IPv4/IPv6 networks and on generated
+keyword patterns plus the built-in ones, over ordinary chat text.
+Reports microseconds per check.
+
+Usage:
+    python benchmarks/bench_security.py
+    python benchmarks/bench_security.py --checks 20000 --networks 10 1000 10000
+"""
+
+import argparse
+import ipaddress
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from loguru import logger  # noqa: E402
+
+from nanobot.security.hardening import SUSPICIOUS_PATTERNS, SecurityValidator  # noqa: E402
+
+
+def random_networks(n: int, rng: random.Random) -> list[str]:
+    networks = []
+    for i in range(n):
+        if i % 4 == 3:
+            address = ipaddress.IPv6Address(rng.getrandbits(128))
+            networks.append(str(ipaddress.ip_network(f"{address}/{rng.randint(32, 128)}", strict=False)))
+        else:
+            address = ipaddress.IPv4Address(rng.getrandbits(32))
+            networks.append(str(ipaddress.ip_network(f"{address}/{rng.randint(16, 32)}", strict=False)))
+    return networks
+
+
+def random_ips(n: int, rng: random.Random) -> list[str]:
+    return [
+        str(ipaddress.IPv6Address(rng.getrandbits(128)) if i % 4 == 3 else ipaddress.IPv4Address(rng.getrandbits(32)))
+        for i in range(n)
+    ]
+
+
+def legacy_ip_check(networks: list, ip_address: str) -> bool:
+    ip = ipaddress.ip_address(ip_address)
+    return any(ip in network for network in networks)
+
+
+def legacy_content_check(patterns: list[str], content: str) -> bool:
+    return not any(re.search(pattern, content, re.IGNORECASE) for pattern in patterns)
+
+
+def sample_messages(n: int, rng: random.Random) -> list[str]:
+    words = "please summarise the report and send the numbers to the team before noon".split()
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(5, 200))) for _ in range(n)]
+
+
+def timed(fn, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fn(item)
+    return 1e6 * (time.perf_counter() - start) / len(items)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--checks", type=int, default=1000)
+    parser.add_argument("--networks", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--patterns", type=int, nargs="+", default=[3, 50, 500])
+    args = parser.parse_args()
+    logger.remove()  # Validators log every rejection
+    rng = random.Random(0)
+
+    ips = random_ips(args.checks, rng)
+    print(f"{'networks':>8} {'linear us':>10} {'trie us':>8}")
+    for n in args.networks:
+        validator = SecurityValidator(random_networks(n, rng), enable_whitelist=True)
+        linear = timed(lambda ip: legacy_ip_check(validator.ip_whitelist, ip), ips)
+        trie = timed(validator.validate_ip_address, ips)
+        print(f"{n:>8} {linear:>10.2f} {trie:>8.2f}")
+
+    messages = sample_messages(args.checks, rng)
+    print(f"\n{'patterns':>8} {'per-pattern us':>15} {'matcher us':>12}")
+    for n in args.patterns:
+        extra = [rf"\bblocked{i:04d}\b" for i in range(max(0, n - len(SUSPICIOUS_PATTERNS)))]
+        validator = SecurityValidator(extra_patterns=extra)
+        patterns = validator.suspicious_patterns
+        separate = timed(lambda m: legacy_content_check(patterns, m), messages)
+        matcher = timed(validator.validate_message_content, messages)
+        print(f"{len(patterns):>8} {separate:>15.2f} {matcher:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
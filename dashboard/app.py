@@ -24,6 +24,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from nanobot.pairing.manager import PairingManager
 from nanobot.gateway.websocket import SecureWebSocketServer
+from nanobot.security.hardening import AuditLogger
 
 app = FastAPI(title="Entobot Enterprise Dashboard")
 
@@ -50,6 +51,7 @@ class DashboardState:
         self.websocket_server: SecureWebSocketServer | None = None
         self.activity_log: list[dict[str, Any]] = []
         self.audit_log: list[dict[str, Any]] = []
+        self.audit_logger: AuditLogger | None = None  # Reads the gateway's audit file, when enabled
         self.message_count = 0
         self.dashboard_clients: list[WebSocket] = []
         self.demo_mode = True  # Enable demo mode by default
@@ -98,6 +100,16 @@ def init_managers():
         )
         logger.info("Pairing manager initialized for dashboard")
 
+    if not state.audit_logger:
+        try:
+            from nanobot.config.loader import load_config
+
+            enterprise = load_config().enterprise
+            if enterprise.audit_log_enabled:
+                state.audit_logger = AuditLogger(Path(enterprise.audit_log_path), read_only=True)
+        except Exception as e:
+            logger.warning(f"Audit log unavailable, showing dashboard events only: {e}")
+
     # Add initial demo data
     if state.demo_mode:
         state.add_activity("system", "Dashboard initialized", {"mode": "demo"})
@@ -195,9 +207,29 @@ async def get_activity():
     return state.activity_log[:50]
 
 
+def _audit_view(entry: dict[str, Any]) -> dict[str, Any]:
+    """An AuditLogger record in the dashboard's event shape."""
+    details = entry.get("details") or {}
+    subject = entry.get("device_id") or entry.get("ip_address") or ""
+    return {
+        "timestamp": entry.get("timestamp"),
+        "type": entry.get("event_type"),
+        "message": details.get("reason") or f"{entry.get('event_type')} {subject}".strip(),
+        "severity": "info" if entry.get("success") else "warning",
+    }
+
+
 @app.get("/api/dashboard/audit")
-async def get_audit_log():
-    """Get security audit log"""
+async def get_audit_log(since: str | None = None, until: str | None = None, limit: int = 50):
+    """Get security audit log, newest first (since/until: ISO timestamps, UTC)"""
+
+    # Read the audit file off the event loop; only the blocks needed are decompressed
+    if state.audit_logger and not state.demo_mode:
+        if since or until:
+            events = await asyncio.to_thread(state.audit_logger.get_events, since, until, limit)
+        else:
+            events = await asyncio.to_thread(state.audit_logger.get_recent_events, limit)
+        return [_audit_view(entry) for entry in reversed(events)]
 
     # Add demo audit events
     if state.demo_mode and len(state.audit_log) < 5:
@@ -211,7 +243,7 @@ async def get_audit_log():
             if len(state.audit_log) < 20:
                 state.add_audit_event(event_type, msg, severity)
 
-    return state.audit_log[:50]
+    return state.audit_log[:limit]
 
 
 @app.post("/api/dashboard/generate-qr")
@@ -223,13 +255,13 @@ async def generate_qr():
 
     try:
         # Create pairing session
-        session_id, qr_bytes = state.pairing_manager.create_pairing_session()
+        session_id, qr_bytes = await state.pairing_manager.create_pairing_session_async()
 
         # Convert to base64
         qr_base64 = base64.b64encode(qr_bytes).decode('utf-8')
 
         # Get session details
-        session = state.pairing_manager.get_session(session_id)
+        session = await state.pairing_manager.get_session_async(session_id)
 
         # Log activity
         state.add_activity("qr_generated", f"QR code generated for pairing", {
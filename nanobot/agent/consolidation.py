@@ -0,0 +1,291 @@
+"""Memory consolidation - merge old daily notes into a compact MEMORY.md."""
+
+import re
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from nanobot.agent.memory import MemoryStore, estimate_tokens
+from nanobot.cron.types import CronJob, CronSchedule
+from nanobot.providers.base import LLMProvider
+from nanobot.utils.helpers import ensure_dir
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import MemoryConsolidationConfig
+    from nanobot.cron.service import CronService
+
+# Cron job name and system_event message used to schedule consolidation
+CONSOLIDATION_JOB_NAME = "memory-consolidation"
+CONSOLIDATION_EVENT = "memory_consolidation"
+
+CONSOLIDATION_PROMPT = """You maintain an AI assistant's long-term memory file (MEMORY.md).
+Merge the existing memory and the daily notes below into a single updated MEMORY.md.
+
+Rules:
+- Keep durable facts: user preferences, people, projects, decisions, recurring tasks.
+- Drop chit-chat, duplicates, and anything superseded by a newer note.
+- Group related facts under short markdown headings; use terse bullet points.
+- Keep the result under {max_chars} characters.
+- Output only the new MEMORY.md content, with no preamble."""
+
+_PINNED_RE = re.compile(r"^(#{1,6})\s+pinned\b.*$", re.IGNORECASE | re.MULTILINE)
+
+
+def _split_pinned(text: str) -> tuple[str, str]:
+    """Split MEMORY.md into (pinned section, rest). Pinned text is never rewritten."""
+    match = _PINNED_RE.search(text)
+    if not match:
+        return "", text
+    level = len(match.group(1))
+    end_re = re.compile(rf"^#{{1,{level}}}\s", re.MULTILINE)
+    end = end_re.search(text, match.end())
+    stop = end.start() if end else len(text)
+    return text[match.start():stop].strip(), (text[:match.start()] + text[stop:]).strip()
+
+
+def _dedupe_lines(text: str, seen: set[str] | None = None) -> str:
+    """Drop repeated non-heading lines, keeping the first occurrence (pass seen to share it across texts)."""
+    seen = set() if seen is None else seen
+    out = []
+    for line in text.splitlines():
+        key = " ".join(line.lower().split()).lstrip("-* ")
+        if key and not line.lstrip().startswith("#"):
+            if key in seen:
+                continue
+            seen.add(key)
+        out.append(line)
+    return re.sub(r"\n{3,}", "\n\n", "\n".join(out)).strip()
+
+
+def _cap(text: str, max_bytes: int) -> str:
+    """Trim text to max_bytes, keeping the leading (longest-standing) content."""
+    data = text.encode("utf-8")
+    if len(data) <= max_bytes:
+        return text
+    cut = data[:max_bytes].decode("utf-8", errors="ignore")
+    # End at a paragraph or line break when there is one, else inside the line
+    for sep in ("\n\n", "\n"):
+        end = cut.rfind(sep)
+        if end > 0:
+            return cut[:end].rstrip()
+    return cut.rstrip()
+
+
+def _fit(existing: str, notes: str, max_bytes: int) -> str:
+    """
+    Combine existing memory and new notes within max_bytes.
+
+    The notes are trimmed first, oldest paragraphs first; existing memory
+    is only cut (from its end) if it does not fit on its own.
+    """
+    existing = _cap(existing, max_bytes)
+    room = max_bytes - len(existing.encode("utf-8")) - (2 if existing else 0)
+    kept: list[str] = []
+    for para in reversed(notes.split("\n\n")):
+        cost = len(para.encode("utf-8")) + 2
+        if cost > room:
+            break
+        kept.append(para)
+        room -= cost
+    return "\n\n".join(p for p in [existing, *reversed(kept)] if p)
+
+
+def sync_consolidation_job(cron: "CronService", config: "MemoryConsolidationConfig") -> CronJob | None:
+    """
+    Make the cron store match the consolidation config.
+
+    Run on startup: the job is (re)created when its schedule changed and
+    removed when consolidation is disabled, so the stored job never
+    outlives the config it came from.
+
+    Returns:
+        The scheduled job, or None if consolidation is disabled.
+    """
+    jobs = [j for j in cron.list_jobs(include_disabled=True) if j.name == CONSOLIDATION_JOB_NAME]
+    current = None
+    if config.enabled:
+        current = next((
+            j for j in jobs
+            if j.enabled and j.schedule.kind == "cron" and j.schedule.expr == config.schedule
+            and j.payload.kind == "system_event" and j.payload.message == CONSOLIDATION_EVENT
+        ), None)
+    for job in jobs:
+        if job is not current:
+            cron.remove_job(job.id)
+    if config.enabled and current is None:
+        current = cron.add_job(
+            name=CONSOLIDATION_JOB_NAME,
+            schedule=CronSchedule(kind="cron", expr=config.schedule),
+            message=CONSOLIDATION_EVENT,
+            kind="system_event",
+        )
+    return current
+
+
+@dataclass
+class ConsolidationReport:
+    """Outcome of a consolidation pass."""
+
+    dry_run: bool
+    merged_files: list[str] = field(default_factory=list)
+    bytes_before: int = 0
+    bytes_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    used_llm: bool = False
+    content: str = ""  # The new MEMORY.md (written unless dry_run)
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def summary(self) -> str:
+        """One-line human-readable summary."""
+        mode = "dry run" if self.dry_run else "applied"
+        return (
+            f"Memory consolidation ({mode}): merged {len(self.merged_files)} daily notes, "
+            f"{self.bytes_before} -> {self.bytes_after} bytes ({self.bytes_saved} saved), "
+            f"~{self.tokens_before} -> ~{self.tokens_after} tokens ({self.tokens_saved} saved)"
+        )
+
+
+class MemoryConsolidator:
+    """
+    Merges daily notes older than keep_days into a deduplicated, size-capped
+    MEMORY.md and moves the originals to memory/archive/.
+
+    Intended to run as a scheduled CronService system_event job. An LLM
+    (ideally a cheap model) does the merge; without a provider, or if the
+    call fails, it falls back to exact-line deduplication.
+    """
+
+    def __init__(
+        self,
+        memory: MemoryStore,
+        provider: LLMProvider | None = None,
+        model: str | None = None,
+        keep_days: int = 7,
+        max_bytes: int = 16_000,
+    ):
+        self.memory = memory
+        self.provider = provider
+        self.model = model
+        self.keep_days = keep_days
+        self.max_bytes = max_bytes
+
+    @property
+    def archive_dir(self) -> Path:
+        return self.memory.memory_dir / "archive"
+
+    def _old_daily_files(self) -> list[Path]:
+        """Daily note files older than keep_days, oldest first."""
+        cutoff = (datetime.now() - timedelta(days=self.keep_days)).strftime("%Y-%m-%d")
+        return sorted(p for p in self.memory.list_memory_files() if p.stem < cutoff)
+
+    async def _merge(self, existing: str, notes: str) -> tuple[str, bool]:
+        """Merge memory and notes, returning (text, used_llm)."""
+        fallback = _dedupe_lines(f"{existing}\n\n{notes}")
+        if not self.provider or not notes:
+            return fallback, False
+
+        try:
+            response = await self.provider.chat(
+                messages=[
+                    {"role": "system", "content": CONSOLIDATION_PROMPT.format(max_chars=self.max_bytes)},
+                    {"role": "user", "content": f"# Existing MEMORY.md\n\n{existing}\n\n# Daily notes\n\n{notes}"},
+                ],
+                model=self.model,
+                max_tokens=max(1024, self.max_bytes // 3),
+                temperature=0.2,
+            )
+        except Exception as e:
+            logger.warning(f"Memory consolidation LLM call failed, using dedupe only: {e}")
+            return fallback, False
+
+        content = (response.content or "").strip()
+        if not content or response.finish_reason == "error":
+            logger.warning("Memory consolidation got an empty/error response, using dedupe only")
+            return fallback, False
+        return _dedupe_lines(content), True
+
+    async def consolidate(self, dry_run: bool = False) -> ConsolidationReport:
+        """
+        Run one consolidation pass.
+
+        Args:
+            dry_run: Compute the new MEMORY.md and report, but don't write,
+                archive, or delete anything. The LLM is still called so the
+                report reflects real output.
+
+        Returns:
+            ConsolidationReport with sizes before and after.
+        """
+        report = ConsolidationReport(dry_run=dry_run)
+        old_files = self._old_daily_files()
+        existing = self.memory.read_long_term()
+
+        before = existing + "".join(p.read_text(encoding="utf-8") for p in old_files)
+        report.bytes_before = len(before.encode("utf-8"))
+        report.tokens_before = estimate_tokens(before)
+        report.merged_files = [p.name for p in old_files]
+
+        if not old_files and report.bytes_before <= self.max_bytes:
+            report.bytes_after, report.tokens_after = report.bytes_before, report.tokens_before
+            report.content = existing
+            logger.info("Memory consolidation: nothing to do")
+            return report
+
+        pinned, rest = _split_pinned(existing)
+        notes = "\n\n".join(p.read_text(encoding="utf-8").strip() for p in old_files)
+        merged, report.used_llm = await self._merge(rest, notes)
+
+        # Room left after the pinned section, its separator and the final newline
+        budget = max(self.max_bytes - (len(pinned.encode("utf-8")) + 2 if pinned else 0) - 1, 0)
+        if len(merged.encode("utf-8")) > budget:
+            # The merge can't tell old memory from new notes: rebuild deterministically
+            logger.warning(f"Merged memory exceeds {budget} bytes; trimming the oldest new notes first")
+            seen: set[str] = set()
+            merged = _fit(_dedupe_lines(rest, seen), _dedupe_lines(notes, seen), budget)
+            report.used_llm = False
+        body = merged
+        if not body and (rest or notes):
+            # Writing this would replace the memory with nothing but the pinned section
+            logger.warning("Memory consolidation produced no content within max_bytes; leaving MEMORY.md unchanged")
+            report.merged_files = []
+            report.bytes_after, report.tokens_after = report.bytes_before, report.tokens_before
+            report.content = existing
+            return report
+        content = f"{pinned}\n\n{body}".strip() + "\n" if pinned else body.strip() + "\n"
+
+        report.content = content
+        report.bytes_after = len(content.encode("utf-8"))
+        report.tokens_after = estimate_tokens(content)
+
+        if not dry_run:
+            self._apply(content, existing, old_files)
+
+        logger.info(report.summary())
+        return report
+
+    def _apply(self, content: str, previous: str, old_files: list[Path]) -> None:
+        """Write the new MEMORY.md and archive the originals."""
+        archive = ensure_dir(self.archive_dir)
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+
+        if previous:
+            (archive / f"MEMORY-{stamp}.md").write_text(previous, encoding="utf-8")
+        self.memory.write_long_term(content)
+
+        for path in old_files:
+            target = archive / path.name
+            if target.exists():
+                target = archive / f"{path.stem}-{stamp}.md"
+            shutil.move(str(path), str(target))
@@ -1,14 +1,22 @@
 """Context builder for assembling agent prompts."""
 
+import asyncio
 import base64
+import hashlib
 import mimetypes
 import platform
+import threading
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
-from nanobot.agent.memory import MemoryStore
+from loguru import logger
+
+from nanobot.agent.memory import MemoryChunk, MemoryStore
 from nanobot.agent.skills import SkillsLoader
 
+if TYPE_CHECKING:
+    from nanobot.agent.vectors import VectorStore
+
 
 class ContextBuilder:
     """
@@ -20,17 +28,121 @@ class ContextBuilder:
     
     BOOTSTRAP_FILES = ["AGENTS.md", "SOUL.md", "USER.md", "TOOLS.md", "IDENTITY.md"]
     
-    def __init__(self, workspace: Path):
+    # Semantic recall: how many related snippets to add and the minimum cosine score
+    RECALL_TOP_K = 4
+    RECALL_MIN_SCORE = 0.25
+    
+    def __init__(self, workspace: Path, cross_session_recall: bool = False):
         self.workspace = workspace
+        self.cross_session_recall = cross_session_recall  # Recall other sessions' turns too
         self.memory = MemoryStore(workspace)
         self.skills = SkillsLoader(workspace)
+        self._vectors: "VectorStore | None" = None
+        self._vectors_lock = threading.Lock()  # Turns are indexed in a worker thread
+        self._vectors_disabled = False
+        self._indexed_chunks: list[MemoryChunk] | None = None
+    
+    @property
+    def vectors(self) -> "VectorStore | None":
+        """The local vector index, or None if NumPy is not installed."""
+        if self._vectors is None and not self._vectors_disabled:
+            try:
+                from nanobot.agent.vectors import VectorStore
+                self._vectors = VectorStore(self.memory.memory_dir / ".vectors")
+            except ImportError as e:
+                logger.debug(f"Semantic recall disabled: {e}")
+                self._vectors_disabled = True
+        return self._vectors
+    
+    def _sync_memory_vectors(self, vectors: "VectorStore") -> None:
+        """Index current memory chunks, dropping ones that no longer exist."""
+        chunks = self.memory.get_chunks()
+        if chunks is self._indexed_chunks:
+            return
+        
+        items = []
+        for chunk in chunks:
+            digest = hashlib.blake2b(chunk.text.encode("utf-8"), digest_size=8).hexdigest()
+            items.append((f"memory:{chunk.source}:{digest}", chunk.source, chunk.text))
+        live = {key for key, _, _ in items}
+        vectors.remove([k for k in vectors.keys("memory:") if k not in live])
+        vectors.upsert(items)
+        self._indexed_chunks = chunks
     
-    def build_system_prompt(self, skill_names: list[str] | None = None) -> str:
+    @staticmethod
+    def _turn_summary(user_message: str, response: str) -> str:
+        return f"User: {user_message[:300]}\nAssistant: {response[:500]}"
+    
+    async def index_turn(self, session_key: str, turn: int, user_message: str, response: str) -> None:
+        """
+        Index a completed conversation turn for semantic recall.
+        
+        Embedding and the vector store write run in a worker thread.
+        
+        Args:
+            session_key: Session the turn belongs to.
+            turn: Turn number within the session (used to build a unique key).
+            user_message: The user's message.
+            response: The assistant's final response.
+        """
+        vectors = self.vectors
+        if vectors is None:
+            return
+        item = (f"session:{session_key}:{turn}", session_key, self._turn_summary(user_message, response))
+        
+        def upsert() -> None:
+            with self._vectors_lock:
+                vectors.upsert([item])
+        
+        try:
+            await asyncio.to_thread(upsert)
+        except Exception as e:
+            logger.warning(f"Failed to index turn for {session_key}: {e}")
+    
+    def _get_related_context(
+        self, query: str, memory: str, session_key: str | None, recent_turns: set[str]
+    ) -> str:
+        """Find semantically related memory chunks and past turns not already in the prompt."""
+        vectors = self.vectors
+        if vectors is None:
+            return ""
+        
+        try:
+            with self._vectors_lock:
+                self._sync_memory_vectors(vectors)
+                hits = vectors.search(query, top_k=self.RECALL_TOP_K * 2, min_score=self.RECALL_MIN_SCORE)
+        except Exception as e:
+            logger.warning(f"Semantic recall failed: {e}")
+            return ""
+        
+        lines = []
+        for entry, _ in hits:
+            # Other sessions belong to other users/devices: never recalled unless configured
+            if entry.key.startswith("session:") and entry.source != session_key and not self.cross_session_recall:
+                continue
+            # Skip what the prompt already carries: injected memory and the history window
+            if entry.text in memory or entry.text in recent_turns:
+                continue
+            lines.append(f"[{entry.source}]\n{entry.text}")
+            if len(lines) >= self.RECALL_TOP_K:
+                break
+        return "\n\n".join(lines)
+    
+    def build_system_prompt(
+        self,
+        skill_names: list[str] | None = None,
+        query: str | None = None,
+        session_key: str | None = None,
+        recent_turns: set[str] | None = None,
+    ) -> str:
         """
         Build the system prompt from bootstrap files, memory, and skills.
         
         Args:
             skill_names: Optional list of skills to include.
+            query: Current user message, used to select relevant memory.
+            session_key: Current session; semantic recall only returns its turns.
+            recent_turns: Summaries of turns already in the history, not recalled again.
         
         Returns:
             Complete system prompt.
@@ -46,10 +158,16 @@ class ContextBuilder:
             parts.append(bootstrap)
         
         # Memory context
-        memory = self.memory.get_memory_context()
+        memory = self.memory.get_memory_context(query)
         if memory:
             parts.append(f"# Memory\n\n{memory}")
         
+        # Semantically related memory and past conversations
+        if query:
+            related = self._get_related_context(query, memory, session_key, recent_turns or set())
+            if related:
+                parts.append(f"# Related Context\n\n{related}")
+        
         # Skills - progressive loading
         # 1. Always-loaded skills: include full content
         always_skills = self.skills.get_always_skills()
@@ -104,7 +222,8 @@ Only use the 'message' tool when you need to send a message to a specific chat c
 For normal conversation, just respond with text - do not call the message tool.
 
 Always be helpful, accurate, and concise. When using tools, explain what you're doing.
-When remembering something, write to {workspace_path}/memory/MEMORY.md"""
+When remembering something, write to {workspace_path}/memory/MEMORY.md
+Facts that must always be in context go under a "## Pinned" heading there."""
     
     def _load_bootstrap_files(self) -> str:
         """Load all bootstrap files from workspace."""
@@ -144,7 +263,16 @@ When remembering something, write to {workspace_path}/memory/MEMORY.md"""
         messages = []
 
         # System prompt
-        system_prompt = self.build_system_prompt(skill_names)
+        session_key = f"{channel}:{chat_id}" if channel and chat_id else None
+        recent_turns = {
+            self._turn_summary(user["content"], reply["content"])
+            for user, reply in zip(history, history[1:])
+            if user.get("role") == "user" and reply.get("role") == "assistant"
+            and isinstance(user.get("content"), str) and isinstance(reply.get("content"), str)
+        }
+        system_prompt = self.build_system_prompt(
+            skill_names, query=current_message, session_key=session_key, recent_turns=recent_turns
+        )
         if channel and chat_id:
             system_prompt += f"\n\n## Current Session\nChannel: {channel}\nChat ID: {chat_id}"
         messages.append({"role": "system", "content": system_prompt})
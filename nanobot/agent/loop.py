@@ -7,8 +7,8 @@ from typing import Any
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
-from nanobot.bus.queue import MessageBus
+from nanobot.bus.events import REPLY_TO_CALLER, InboundMessage, OutboundMessage
+from nanobot.bus.queue import BusClosedError, MessageBus
 from nanobot.providers.base import LLMProvider
 from nanobot.agent.context import ContextBuilder
 from nanobot.agent.tools.registry import ToolRegistry
@@ -46,6 +46,7 @@ class AgentLoop:
         cron_service: "CronService | None" = None,
         restrict_to_workspace: bool = False,
         session_manager: SessionManager | None = None,
+        cross_session_recall: bool = False,
     ):
         from nanobot.config.schema import ExecToolConfig
         from nanobot.cron.service import CronService
@@ -59,7 +60,7 @@ class AgentLoop:
         self.cron_service = cron_service
         self.restrict_to_workspace = restrict_to_workspace
         
-        self.context = ContextBuilder(workspace)
+        self.context = ContextBuilder(workspace, cross_session_recall=cross_session_recall)
         self.sessions = session_manager or SessionManager(workspace)
         self.tools = ToolRegistry()
         self.subagents = SubagentManager(
@@ -73,6 +74,8 @@ class AgentLoop:
         )
         
         self._running = False
+        self._idle = False
+        self._task: asyncio.Task | None = None
         self._register_default_tools()
     
     def _register_default_tools(self) -> None:
@@ -110,35 +113,51 @@ class AgentLoop:
     async def run(self) -> None:
         """Run the agent loop, processing messages from the bus."""
         self._running = True
+        self._task = asyncio.current_task()
         logger.info("Agent loop started")
         
         while self._running:
+            # Wait for next message (no polling; stop() cancels this wait)
+            self._idle = True
             try:
-                # Wait for next message
-                msg = await asyncio.wait_for(
-                    self.bus.consume_inbound(),
-                    timeout=1.0
+                msg = await self.bus.consume_inbound()
+            except BusClosedError:
+                break
+            except asyncio.CancelledError:
+                if self._running:
+                    raise
+                break
+            finally:
+                self._idle = False
+            
+            # Process it (a cron/heartbeat turn's reply goes back to its publisher via commit_inbound)
+            deliver = not msg.metadata.get(REPLY_TO_CALLER)
+            try:
+                response = await self._process_message(msg)
+                if response and deliver:
+                    await self.bus.publish_outbound(response)
+            except Exception as e:
+                logger.error(f"Error processing message: {e}")
+                # Send error response
+                response = OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=f"Sorry, I encountered an error: {str(e)}"
                 )
-                
-                # Process it
-                try:
-                    response = await self._process_message(msg)
-                    if response:
-                        await self.bus.publish_outbound(response)
-                except Exception as e:
-                    logger.error(f"Error processing message: {e}")
-                    # Send error response
-                    await self.bus.publish_outbound(OutboundMessage(
-                        channel=msg.channel,
-                        chat_id=msg.chat_id,
-                        content=f"Sorry, I encountered an error: {str(e)}"
-                    ))
-            except asyncio.TimeoutError:
-                continue
+                if deliver:
+                    await self.bus.publish_outbound(response)
+            # The turn is saved (or failed for good); don't replay it on restart,
+            # and answer redelivered copies with the same response
+            self.bus.commit_inbound(msg, response)
+        
+        self._task = None
+        logger.info("Agent loop stopped")
     
     def stop(self) -> None:
-        """Stop the agent loop."""
+        """Stop the agent loop. An idle loop exits at once; a turn in progress finishes first."""
         self._running = False
+        if self._task and self._idle:
+            self._task.cancel()
         logger.info("Agent loop stopping")
     
     async def _process_message(self, msg: InboundMessage) -> OutboundMessage | None:
@@ -241,6 +260,7 @@ class AgentLoop:
         session.add_message("user", msg.content)
         session.add_message("assistant", final_content)
         self.sessions.save(session)
+        await self.context.index_turn(session.key, len(session.messages) // 2, msg.content, final_content)
         
         return OutboundMessage(
             channel=msg.channel,
@@ -1,22 +1,167 @@
 """Memory system for persistent agent memory."""
 
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
 
 from nanobot.utils.helpers import ensure_dir, today_date
 
 
+_TOKEN_RE = re.compile(r"\w+")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercase word terms for ranking."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+@dataclass
+class MemoryChunk:
+    """A retrievable piece of a memory file."""
+    
+    source: str  # File name, e.g. MEMORY.md
+    heading: str  # Nearest markdown heading ("" if none)
+    text: str
+    position: int  # Order within the combined memory, for stable output
+
+
+def chunk_markdown(text: str, source: str, max_chars: int = 800) -> list[MemoryChunk]:
+    """
+    Split a markdown file into chunks on headings and blank lines.
+    
+    Consecutive paragraphs under the same heading are packed together up to
+    max_chars, so short notes don't each become their own chunk.
+    """
+    chunks: list[MemoryChunk] = []
+    heading = ""
+    buf: list[str] = []
+    
+    def flush() -> None:
+        if buf:
+            chunks.append(MemoryChunk(source, heading, "\n\n".join(buf), len(chunks)))
+            buf.clear()
+    
+    for para in re.split(r"\n\s*\n", text):
+        para = para.strip()
+        if not para:
+            continue
+        lines = para.split("\n")
+        match = _HEADING_RE.match(lines[0])
+        if match:
+            flush()
+            heading = match.group(2).strip()
+            para = "\n".join(lines[1:]).strip()
+            if not para:
+                continue
+        if buf and sum(len(b) for b in buf) + len(para) > max_chars:
+            flush()
+        buf.append(para)
+    flush()
+    
+    return chunks
+
+
+class BM25Index:
+    """
+    Small in-process BM25 index over memory chunks.
+    
+    Uses an inverted index so a query only touches postings for its own terms.
+    """
+    
+    def __init__(self, chunks: list[MemoryChunk], k1: float = 1.5, b: float = 0.75):
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self._postings: dict[str, list[tuple[int, int]]] = {}
+        self._lengths: list[int] = []
+        
+        for i, chunk in enumerate(chunks):
+            terms = tokenize(f"{chunk.heading} {chunk.text}")
+            self._lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings.setdefault(term, []).append((i, tf))
+        
+        n = len(chunks)
+        self._avgdl = (sum(self._lengths) / n) if n else 0.0
+        self._idf = {
+            term: math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+    
+    def search(self, query: str, top_k: int = 5) -> list[tuple[MemoryChunk, float]]:
+        """Return the top_k chunks for a query, best first."""
+        scores: dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf[term]
+            for i, tf in postings:
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[i] / (self._avgdl or 1))
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+        
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.chunks[i], score) for i, score in ranked]
+
+
 class MemoryStore:
     """
     Memory system for the agent.
     
     Supports daily notes (memory/YYYY-MM-DD.md) and long-term memory (MEMORY.md).
+    File contents are cached in-process and keyed on (mtime, size), so
+    repeated prompt builds only pay for a stat until a file changes.
+    
+    Once memory outgrows full_injection_tokens, get_memory_context() only
+    injects the chunks most relevant to the current message (BM25) within
+    token_budget. Sections under a "Pinned" heading in MEMORY.md are always
+    included.
     """
     
-    def __init__(self, workspace: Path):
+    PINNED_HEADING = "pinned"
+    
+    def __init__(
+        self,
+        workspace: Path,
+        top_k: int = 8,
+        token_budget: int = 2000,
+        full_injection_tokens: int = 2000,
+    ):
         self.workspace = workspace
         self.memory_dir = ensure_dir(workspace / "memory")
         self.memory_file = self.memory_dir / "MEMORY.md"
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.full_injection_tokens = full_injection_tokens
+        self._cache: dict[Path, tuple[int, int, str]] = {}
+        self._index: BM25Index | None = None
+        self._index_key: tuple[str, str] | None = None
+    
+    def _read_cached(self, path: Path) -> str:
+        """Read a memory file, reusing the cached text if it hasn't changed."""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            self._cache.pop(path, None)
+            return ""
+        
+        cached = self._cache.get(path)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        
+        content = path.read_text(encoding="utf-8")
+        self._cache[path] = (st.st_mtime_ns, st.st_size, content)
+        return content
     
     def get_today_file(self) -> Path:
         """Get path to today's memory file."""
@@ -24,30 +169,25 @@ class MemoryStore:
     
     def read_today(self) -> str:
         """Read today's memory notes."""
-        today_file = self.get_today_file()
-        if today_file.exists():
-            return today_file.read_text(encoding="utf-8")
-        return ""
+        return self._read_cached(self.get_today_file())
     
     def append_today(self, content: str) -> None:
         """Append content to today's memory notes."""
         today_file = self.get_today_file()
         
         if today_file.exists():
-            existing = today_file.read_text(encoding="utf-8")
-            content = existing + "\n" + content
+            content = "\n" + content
         else:
             # Add header for new day
             header = f"# {today_date()}\n\n"
             content = header + content
         
-        today_file.write_text(content, encoding="utf-8")
+        with open(today_file, "a", encoding="utf-8") as f:
+            f.write(content)
     
     def read_long_term(self) -> str:
         """Read long-term memory (MEMORY.md)."""
-        if self.memory_file.exists():
-            return self.memory_file.read_text(encoding="utf-8")
-        return ""
+        return self._read_cached(self.memory_file)
     
     def write_long_term(self, content: str) -> None:
         """Write to long-term memory (MEMORY.md)."""
@@ -71,10 +211,9 @@ class MemoryStore:
         for i in range(days):
             date = today - timedelta(days=i)
             date_str = date.strftime("%Y-%m-%d")
-            file_path = self.memory_dir / f"{date_str}.md"
+            content = self._read_cached(self.memory_dir / f"{date_str}.md")
             
-            if file_path.exists():
-                content = file_path.read_text(encoding="utf-8")
+            if content:
                 memories.append(content)
         
         return "\n\n---\n\n".join(memories)
@@ -87,23 +226,85 @@ class MemoryStore:
         files = list(self.memory_dir.glob("????-??-??.md"))
         return sorted(files, reverse=True)
     
-    def get_memory_context(self) -> str:
+    def _get_index(self, long_term: str, today: str) -> BM25Index:
+        """Get the BM25 index, rebuilding it only when memory text changed."""
+        key = (long_term, today)
+        if self._index is None or self._index_key != key:
+            chunks = chunk_markdown(long_term, self.memory_file.name)
+            chunks += chunk_markdown(today, self.get_today_file().name)
+            for i, chunk in enumerate(chunks):
+                chunk.position = i
+            self._index = BM25Index(chunks)
+            self._index_key = key
+        return self._index
+    
+    def get_chunks(self) -> list[MemoryChunk]:
+        """Get the current chunks of long-term memory and today's notes."""
+        return self._get_index(self.read_long_term(), self.read_today()).chunks
+    
+    def _is_pinned(self, chunk: MemoryChunk) -> bool:
+        return (
+            chunk.source == self.memory_file.name
+            and chunk.heading.lower().startswith(self.PINNED_HEADING)
+        )
+    
+    def get_memory_context(self, query: str | None = None) -> str:
         """
         Get memory context for the agent.
         
+        Args:
+            query: The current user message. When given and memory is larger
+                than full_injection_tokens, only relevant chunks are returned.
+        
         Returns:
             Formatted memory context including long-term and recent memories.
         """
+        long_term = self.read_long_term()
+        today = self.read_today()
+        
+        if query and estimate_tokens(long_term) + estimate_tokens(today) > self.full_injection_tokens:
+            return self._get_ranked_context(query, long_term, today)
+        
         parts = []
         
         # Long-term memory
-        long_term = self.read_long_term()
         if long_term:
             parts.append("## Long-term Memory\n" + long_term)
         
         # Today's notes
-        today = self.read_today()
         if today:
             parts.append("## Today's Notes\n" + today)
         
         return "\n\n".join(parts) if parts else ""
+    
+    def _get_ranked_context(self, query: str, long_term: str, today: str) -> str:
+        """Build memory context from pinned sections plus top-k relevant chunks."""
+        index = self._get_index(long_term, today)
+        
+        pinned = [c for c in index.chunks if self._is_pinned(c)]
+        budget = self.token_budget - sum(estimate_tokens(c.text) for c in pinned)
+        
+        selected: list[MemoryChunk] = []
+        for chunk, _ in index.search(query, top_k=self.top_k + len(pinned)):
+            if self._is_pinned(chunk):
+                continue
+            cost = estimate_tokens(chunk.text)
+            if cost > budget:
+                continue
+            selected.append(chunk)
+            budget -= cost
+            if len(selected) >= self.top_k:
+                break
+        
+        parts = []
+        if pinned:
+            parts.append("## Pinned\n" + "\n\n".join(c.text for c in pinned))
+        if selected:
+            selected.sort(key=lambda c: c.position)
+            lines = [
+                f"[{c.source}{' > ' + c.heading if c.heading else ''}]\n{c.text}"
+                for c in selected
+            ]
+            parts.append("## Relevant Memories\n" + "\n\n".join(lines))
+        
+        return "\n\n".join(parts) if parts else ""
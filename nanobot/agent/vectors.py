@@ -0,0 +1,279 @@
+"""Embedded vector index for semantic recall across memory and sessions."""
+
+from __future__ import annotations
+
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable
+
+from loguru import logger
+
+from nanobot.agent.memory import tokenize
+from nanobot.utils.helpers import ensure_dir
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Batch embedding function: list of texts -> float32 array of shape (n, dim)
+EmbeddingFunction = Callable[[list[str]], "np.ndarray"]
+
+
+def _require_numpy() -> Any:
+    """Import NumPy, which is an optional dependency."""
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            "Semantic recall requires NumPy. Install with: pip install 'nanobot-ai[vector]'"
+        ) from e
+    return numpy
+
+
+class HashingEmbedder:
+    """
+    Offline embedding function using the hashing trick.
+
+    Unigrams and bigrams are hashed (crc32, stable across processes) into a
+    fixed number of signed buckets and L2-normalised. No model download and
+    no network, at the cost of only lexical-level similarity.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        np = _require_numpy()
+        rows: list[int] = []
+        cols: list[int] = []
+        signs: list[float] = []
+
+        for i, text in enumerate(texts):
+            terms = tokenize(text)
+            features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                rows.append(i)
+                cols.append(h % self.dim)
+                signs.append(1.0 if (h >> 31) & 1 else -1.0)
+
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        if rows:
+            np.add.at(out, (np.asarray(rows), np.asarray(cols)), np.asarray(signs, dtype=np.float32))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        np.divide(out, norms, out=out, where=norms > 0)
+        return out
+
+
+@dataclass
+class VectorEntry:
+    """Metadata for one indexed vector."""
+
+    key: str  # Unique id, e.g. "memory:MEMORY.md:1a2b3c" or "session:mobile:dev:12"
+    source: str  # Where it came from (memory file name or session key)
+    text: str
+
+
+class VectorStore:
+    """
+    NumPy-backed, memory-mapped vector index.
+
+    Vectors live in a float32 matrix on disk (vectors.f32) that is mapped
+    rather than loaded, so 100k+ chunks cost page cache, not heap. Metadata
+    is an append-only JSONL op log (meta.jsonl) replayed at startup and
+    compacted when it accumulates too many removals.
+
+    Search is a single matrix-vector product over the occupied rows
+    followed by argpartition, so a query is one vectorised pass.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        embed: EmbeddingFunction | None = None,
+        dim: int = 256,
+        initial_capacity: int = 1024,
+    ):
+        self.np = _require_numpy()
+        self.path = ensure_dir(path)
+        self.embed = embed or HashingEmbedder(dim)
+        self.dim = dim
+        self._vectors_path = self.path / "vectors.f32"
+        self._meta_path = self.path / "meta.jsonl"
+
+        self._rows: dict[str, int] = {}
+        self._entries: list[VectorEntry | None] = []
+        self._free: list[int] = []
+        self._log_ops = 0
+
+        self._load()
+        capacity = max(initial_capacity, len(self._entries))
+        existing = self._vectors_path.stat().st_size // (4 * dim) if self._vectors_path.exists() else 0
+        self._matrix = self._open(max(capacity, existing))
+
+    def _open(self, capacity: int) -> np.ndarray:
+        """Map the vector file, growing it to hold capacity rows."""
+        size = capacity * self.dim * 4
+        with open(self._vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        return self.np.memmap(self._vectors_path, dtype=self.np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _grow(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        self._matrix.flush()
+        del self._matrix
+        self._matrix = self._open(max(needed, capacity * 2))
+
+    def _load(self) -> None:
+        """Replay the metadata op log."""
+        if not self._meta_path.exists():
+            return
+
+        with open(self._meta_path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    op = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt vector metadata line in {self._meta_path}")
+                    continue
+                self._log_ops += 1
+                row = op["row"]
+                if op["op"] == "add":
+                    while len(self._entries) <= row:
+                        self._entries.append(None)
+                    self._entries[row] = VectorEntry(op["key"], op["source"], op["text"])
+                    self._rows[op["key"]] = row
+                elif op["op"] == "del" and row < len(self._entries):
+                    entry = self._entries[row]
+                    if entry is not None:
+                        self._rows.pop(entry.key, None)
+                    self._entries[row] = None
+
+        self._free = [i for i, e in enumerate(self._entries) if e is None]
+
+    def _append_ops(self, ops: list[dict[str, Any]]) -> None:
+        with open(self._meta_path, "a", encoding="utf-8") as f:
+            for op in ops:
+                f.write(json.dumps(op, ensure_ascii=False) + "\n")
+        self._log_ops += len(ops)
+        if self._log_ops > 2 * max(len(self._rows), 512):
+            self._compact_log()
+
+    def _compact_log(self) -> None:
+        """Rewrite the op log with only live entries."""
+        tmp = self._meta_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for row, entry in enumerate(self._entries):
+                if entry is not None:
+                    f.write(json.dumps(
+                        {"op": "add", "row": row, "key": entry.key, "source": entry.source, "text": entry.text},
+                        ensure_ascii=False,
+                    ) + "\n")
+        os.replace(tmp, self._meta_path)
+        self._log_ops = len(self._rows)
+
+    def upsert(self, items: list[tuple[str, str, str]]) -> int:
+        """
+        Add or replace entries.
+
+        Args:
+            items: (key, source, text) tuples. Entries whose key already
+                exists with the same text are skipped without re-embedding.
+
+        Returns:
+            Number of entries embedded and written.
+        """
+        pending = []
+        for key, source, text in items:
+            row = self._rows.get(key)
+            if row is not None and self._entries[row].text == text:
+                continue
+            pending.append((key, source, text))
+        if not pending:
+            return 0
+
+        vectors = self.embed([text for _, _, text in pending])
+        if vectors.shape != (len(pending), self.dim):
+            raise ValueError(f"Embedding function returned shape {vectors.shape}, expected ({len(pending)}, {self.dim})")
+
+        ops = []
+        rows = []
+        for key, source, text in pending:
+            row = self._rows.get(key)
+            if row is None:
+                row = self._free.pop() if self._free else len(self._entries)
+                if row == len(self._entries):
+                    self._entries.append(None)
+            self._entries[row] = VectorEntry(key, source, text)
+            self._rows[key] = row
+            rows.append(row)
+            ops.append({"op": "add", "row": row, "key": key, "source": source, "text": text})
+
+        self._grow(len(self._entries))
+        self._matrix[self.np.asarray(rows)] = vectors
+        self._append_ops(ops)
+        return len(pending)
+
+    def remove(self, keys: list[str]) -> int:
+        """Remove entries by key. Returns the number removed."""
+        ops = []
+        for key in keys:
+            row = self._rows.pop(key, None)
+            if row is None:
+                continue
+            self._entries[row] = None
+            self._matrix[row] = 0.0
+            self._free.append(row)
+            ops.append({"op": "del", "row": row})
+        if ops:
+            self._append_ops(ops)
+        return len(ops)
+
+    def keys(self, prefix: str = "") -> list[str]:
+        """List indexed keys, optionally filtered by prefix."""
+        return [k for k in self._rows if k.startswith(prefix)]
+
+    def search(self, query: str, top_k: int = 5, min_score: float = 0.0) -> list[tuple[VectorEntry, float]]:
+        """Return the top_k entries by cosine similarity to a query, best first."""
+        return self.search_batch([query], top_k=top_k, min_score=min_score)[0]
+
+    def search_batch(
+        self, queries: list[str], top_k: int = 5, min_score: float = 0.0
+    ) -> list[list[tuple[VectorEntry, float]]]:
+        """Search several queries with one matrix product."""
+        n = len(self._entries)
+        if n == 0 or not queries:
+            return [[] for _ in queries]
+
+        np = self.np
+        q = self.embed(queries)
+        scores = q @ self._matrix[:n].T  # (queries, rows); vectors are unit-length
+        k = min(top_k, n)
+
+        results = []
+        for row_scores in scores:
+            top = np.argpartition(-row_scores, k - 1)[:k]
+            top = top[np.argsort(-row_scores[top])]
+            hits = []
+            for i in top:
+                entry = self._entries[i]
+                score = float(row_scores[i])
+                if entry is not None and score > min_score:
+                    hits.append((entry, score))
+            results.append(hits)
+        return results
+
+    def flush(self) -> None:
+        """Flush mapped vectors to disk."""
+        self._matrix.flush()
+
+    def __len__(self) -> int:
+        return len(self._rows)
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+import secrets
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request
@@ -68,6 +70,16 @@ def get_jwt_manager(request: Request):
     return request.app.state.jwt_manager
 
 
+def require_admin(request: Request) -> None:
+    """Reject the request unless it carries the configured admin token."""
+    expected = request.app.state.config.auth.admin_token
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin API disabled (auth.admin_token not set)")
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(status_code=401, detail="Admin token required")
+
+
 @router.post("/pair", response_model=PairResponse)
 async def pair_device(
     pair_req: PairRequest,
@@ -81,7 +93,7 @@ async def pair_device(
     """
     try:
         # Validate pairing
-        if not pairing_manager.validate_pairing(
+        if not await pairing_manager.validate_pairing_async(
             pair_req.session_id, pair_req.temp_token, pair_req.device_info
         ):
             logger.warning(f"Pairing validation failed for session: {pair_req.session_id}")
@@ -149,16 +161,16 @@ async def list_devices(request: Request):
     return DevicesResponse(devices=[])
 
 
-@router.delete("/devices/{device_id}")
-async def revoke_device(device_id: str, request: Request):
+@router.delete("/devices/{device_id}", dependencies=[Depends(require_admin)])
+async def revoke_device(device_id: str, jwt_manager=Depends(get_jwt_manager)):
     """
-    Revoke access for a specific device.
+    Revoke access for a specific device (admin only).
 
-    This would typically disconnect the device and invalidate its token.
+    Every token issued to the device so far stops working; a connected
+    device is disconnected on its next message. Pairing again issues a
+    new, valid token.
     """
-    # TODO: Implement device revocation
-    # This would require maintaining a list of revoked tokens or active sessions
-
+    await asyncio.to_thread(jwt_manager.revoke_device, device_id)
     logger.info(f"Device revocation requested: {device_id}")
 
     return {"success": True, "message": f"Device {device_id} access revoked"}
@@ -175,11 +187,11 @@ async def create_pairing_session(
     to create a session on the relay, then generate the QR code locally.
     """
     try:
-        session_id, qr_bytes = pairing_manager.create_pairing_session()
-        session = pairing_manager.get_session(session_id)
+        # The CLI renders the QR code itself, so only the session is needed here
+        session = await pairing_manager.create_session_async()
 
         return {
-            "session_id": session_id,
+            "session_id": session.session_id,
             "temp_token": session.temp_token,
             "websocket_url": pairing_manager.websocket_url,
             "expires_at": session.expires_at,
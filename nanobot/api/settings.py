@@ -190,6 +190,8 @@ async def get_enterprise_settings(config=Depends(get_config)):
         "organization_name": config.enterprise.organization_name,
         "rate_limit_enabled": config.enterprise.rate_limit_enabled,
         "rate_limit_requests_per_minute": config.enterprise.rate_limit_requests_per_minute,
+        "rate_limit_burst": config.enterprise.rate_limit_burst,
+        "rate_limit_ip_requests_per_minute": config.enterprise.rate_limit_ip_requests_per_minute,
         "audit_log_enabled": config.enterprise.audit_log_enabled,
         "ip_whitelist_enabled": config.enterprise.ip_whitelist_enabled,
     }
@@ -207,5 +209,8 @@ async def get_mobile_settings(config=Depends(get_config)):
         "websocket_port": config.channels.mobile.websocket_port,
         "tls_enabled": config.channels.mobile.tls_enabled,
         "max_connections": config.channels.mobile.max_connections,
+        "max_connections_per_ip": config.channels.mobile.max_connections_per_ip,
+        "max_unauthenticated": config.channels.mobile.max_unauthenticated,
+        "auth_timeout": config.channels.mobile.auth_timeout,
         "heartbeat_interval": config.channels.mobile.heartbeat_interval,
     }
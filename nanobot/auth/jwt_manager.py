@@ -4,12 +4,16 @@ from __future__ import annotations
 
 import secrets
 import time
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import jwt
 from loguru import logger
 
+if TYPE_CHECKING:
+    from nanobot.auth.revocation import RevocationStore
+
 
 @dataclass
 class DeviceCredentials:
@@ -42,9 +46,28 @@ class JWTManager:
     - Token generation after successful pairing
     - Token validation for authenticated requests
     - Token refresh for long-lived sessions
+    - Device revocation
+
+    verify() checks each distinct token's signature once and caches the
+    resulting credentials (LRU, at most cache_size tokens) until the
+    token's exp, so a reconnecting device costs a dict lookup. Revocation
+    is a device_id -> cutoff map (whole seconds, like iat): every token
+    issued to the device in an earlier second is rejected, cached or not.
+    With a RevocationStore the map is loaded from the shared file at
+    startup and reloaded when another process changes it (checked at most
+    every revocation_refresh_s), so revocations reach every worker and
+    survive restarts.
     """
 
-    def __init__(self, secret: str, algorithm: str = "HS256", expiry_hours: int = 24 * 30):
+    def __init__(
+        self,
+        secret: str,
+        algorithm: str = "HS256",
+        expiry_hours: int = 24 * 30,
+        cache_size: int = 4096,
+        revocation_store: RevocationStore | None = None,
+        revocation_refresh_s: float = 1.0,
+    ):
         """
         Initialize JWT manager.
 
@@ -52,6 +75,9 @@ class JWTManager:
             secret: Secret key for signing tokens (must be strong in production)
             algorithm: JWT signing algorithm (default: HS256)
             expiry_hours: Token expiry time in hours (default: 30 days)
+            cache_size: Verified tokens kept in memory (0 = no cache)
+            revocation_store: Shared, persistent revocations (None = this process only)
+            revocation_refresh_s: How often to look for revocations made by other processes
         """
         if not secret or len(secret) < 32:
             logger.warning("JWT secret is weak or missing - generating random secret for this session")
@@ -60,6 +86,16 @@ class JWTManager:
         self.secret = secret
         self.algorithm = algorithm
         self.expiry_hours = expiry_hours
+        self.cache_size = cache_size
+
+        self._verified: OrderedDict[str, DeviceCredentials] = OrderedDict()
+        self.revocation_store = revocation_store
+        self.revocation_refresh_s = revocation_refresh_s
+        # device_id -> tokens issued before this second are revoked
+        self._revoked: dict[str, int] = revocation_store.load() if revocation_store else {}
+        self._revocations_checked = time.monotonic()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def generate_token(self, device_id: str, device_name: str, **extra_claims: Any) -> str:
         """
@@ -98,25 +134,48 @@ class JWTManager:
             token: JWT token to validate
 
         Returns:
-            device_id if valid, None if invalid or expired
+            device_id if valid, None if invalid, expired or revoked
         """
-        try:
-            payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
+        credentials = self.verify(token)
+        return credentials.device_id if credentials else None
 
-            # Verify required fields
-            device_id = payload.get("device_id")
-            if not device_id:
-                logger.warning("JWT token missing device_id")
-                return None
+    def verify(self, token: str) -> DeviceCredentials | None:
+        """
+        Validate an access token and return its credentials.
+
+        Args:
+            token: JWT token to validate
 
-            # Check token type
-            if payload.get("type") != "access":
-                logger.warning("Invalid JWT token type")
+        Returns:
+            DeviceCredentials if valid, None if invalid, expired or revoked
+        """
+        credentials = self._verified.get(token)
+        if credentials is not None:
+            if credentials.is_expired():
+                del self._verified[token]
+                logger.warning("JWT token expired")
                 return None
+            self._verified.move_to_end(token)
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+            credentials = self._decode(token)
+            if credentials is None:
+                return None
+            if self.cache_size > 0:
+                self._verified[token] = credentials
+                if len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
 
-            logger.debug(f"Validated JWT token for device: {device_id}")
-            return device_id
+        if self.is_revoked(credentials.device_id, credentials.issued_at):
+            logger.warning(f"JWT token for revoked device: {credentials.device_id}")
+            return None
+        return credentials
 
+    def _decode(self, token: str) -> DeviceCredentials | None:
+        """Verify signature, expiry and required claims (the expensive part of verify())."""
+        try:
+            payload = jwt.decode(token, self.secret, algorithms=[self.algorithm])
         except jwt.ExpiredSignatureError:
             logger.warning("JWT token expired")
             return None
@@ -124,6 +183,77 @@ class JWTManager:
             logger.warning(f"Invalid JWT token: {e}")
             return None
 
+        # Verify required fields
+        device_id = payload.get("device_id")
+        if not device_id:
+            logger.warning("JWT token missing device_id")
+            return None
+
+        # Check token type
+        if payload.get("type") != "access":
+            logger.warning("Invalid JWT token type")
+            return None
+
+        try:
+            credentials = DeviceCredentials(
+                device_id=device_id,
+                device_name=payload.get("device_name", "Unknown Device"),
+                issued_at=float(payload.get("iat", 0)),
+                expires_at=float(payload.get("exp", float("inf"))),
+            )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid JWT token claims: {e}")
+            return None
+
+        logger.debug(f"Validated JWT token for device: {device_id}")
+        return credentials
+
+    def revoke_device(self, device_id: str) -> None:
+        """
+        Revoke every token issued to a device so far; pairing again issues a working one.
+
+        iat has one-second resolution, so the cutoff is the current second:
+        tokens issued later in that same second (e.g. by re-pairing right
+        away) stay valid.
+        """
+        cutoff = int(time.time())
+        self._revoked[device_id] = cutoff
+        if self.revocation_store:
+            self.revocation_store.revoke(device_id, cutoff)
+        logger.info(f"Revoked tokens for device: {device_id}")
+
+    def restore_device(self, device_id: str) -> bool:
+        """Lift a revocation. Returns False if the device was not revoked."""
+        restored = self._revoked.pop(device_id, None) is not None
+        if self.revocation_store:
+            restored = self.revocation_store.restore(device_id) or restored
+        return restored
+
+    def is_revoked(self, device_id: str, issued_at: float) -> bool:
+        """Whether a token issued to device_id at issued_at has been revoked."""
+        self._sync_revocations()
+        cutoff = self._revoked.get(device_id)
+        return cutoff is not None and issued_at < cutoff
+
+    def _sync_revocations(self) -> None:
+        """Pick up revocations written by other processes."""
+        if not self.revocation_store:
+            return
+        now = time.monotonic()
+        if now - self._revocations_checked < self.revocation_refresh_s:
+            return
+        self._revocations_checked = now
+        if self.revocation_store.changed():
+            self._revoked = self.revocation_store.load()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "cached_tokens": len(self._verified),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "revoked_devices": len(self._revoked),
+        }
+
     def get_token_payload(self, token: str) -> dict[str, Any] | None:
         """
         Get full token payload without validation (for inspection).
@@ -151,8 +281,11 @@ class JWTManager:
             old_token: Existing JWT token
 
         Returns:
-            New JWT token or None if old token is invalid
+            New JWT token or None if old token is invalid, expired or revoked
         """
+        # Same checks as authentication, so a revoked device cannot refresh its way back in
+        if self.verify(old_token) is None:
+            return None
         payload = self.get_token_payload(old_token)
         if not payload:
             return None
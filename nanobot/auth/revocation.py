@@ -0,0 +1,70 @@
+"""Device revocations shared through SQLite by every gateway and relay process."""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS revoked_devices (
+    device_id TEXT PRIMARY KEY,
+    cutoff INTEGER NOT NULL
+);
+"""
+
+
+class RevocationStore:
+    """
+    device_id -> revocation cutoff (whole seconds), kept in a SQLite file.
+
+    Every process that opens the file sees the same revocations, and they
+    survive restarts. changed() is a cheap check (PRAGMA data_version) for
+    whether another connection wrote since the last call, so readers can
+    keep an in-memory copy and reload it only when needed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+        os.chmod(self.path, 0o600)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._version = self._data_version()
+
+    def _data_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def load(self) -> dict[str, int]:
+        with self._lock:
+            self._version = self._data_version()
+            return dict(self._db.execute("SELECT device_id, cutoff FROM revoked_devices"))
+
+    def changed(self) -> bool:
+        """Whether another process has written since the last load()/changed()."""
+        with self._lock:
+            version = self._data_version()
+            changed, self._version = version != self._version, version
+            return changed
+
+    def revoke(self, device_id: str, cutoff: int) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO revoked_devices VALUES (?, ?)", (device_id, cutoff))
+
+    def restore(self, device_id: str) -> bool:
+        with self._lock:
+            return self._db.execute("DELETE FROM revoked_devices WHERE device_id = ?", (device_id,)).rowcount > 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def open_revocation_store(path: str | Path = "") -> RevocationStore | None:
+    """A store at path, or None (revocations kept in memory only) if path is empty."""
+    return RevocationStore(Path(path)) if path else None
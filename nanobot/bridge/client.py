@@ -51,7 +51,7 @@ class BridgeClient:
         """Initialize local agent components — the full agent stack."""
         logger.info("Initializing local agent components...")
 
-        self.bus = MessageBus()
+        self.bus = MessageBus.from_config(self.config.bus)
         self.session_manager = SessionManager(self.config.workspace_path)
 
         # Build LLM provider
@@ -67,6 +67,7 @@ class BridgeClient:
             exec_config=self.config.tools.exec,
             restrict_to_workspace=self.config.tools.restrict_to_workspace,
             session_manager=self.session_manager,
+            cross_session_recall=self.config.agents.defaults.cross_session_recall,
         )
 
         # Subscribe to outbound messages — send them back through the bridge
@@ -165,6 +166,7 @@ class BridgeClient:
                 sender_id=data.get("sender", "unknown"),
                 chat_id=data.get("device_id", "unknown"),
                 content=data.get("content", ""),
+                message_id=data.get("message_id"),
             )
             logger.info(f"Message from {inbound.sender_id}: {inbound.content[:50]}...")
             await self.bus.publish_inbound(inbound)
@@ -0,0 +1,79 @@
+"""Time-bounded deduplication of redelivered inbound messages."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+
+
+@dataclass
+class _Entry:
+    seen_at: float
+    done: bool = False
+    responses: list[OutboundMessage] = field(default_factory=list)
+
+
+class DedupCache:
+    """
+    Remembers inbound message ids for window_s seconds.
+
+    Keys are (session_key, message_id), so ids only need to be unique per
+    chat. Once the original turn is committed its responses are kept, so a
+    redelivered copy can be answered from the cache instead of re-running
+    the agent. Expiry is lazy (checked on access) and the cache is capped at
+    max_entries, oldest first.
+    """
+
+    def __init__(self, window_s: float = 600.0, max_entries: int = 10_000):
+        self.window_s = window_s
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self.duplicates = 0
+
+    def _expire(self, now: float) -> None:
+        while self._entries:
+            entry = next(iter(self._entries.values()))
+            if now - entry.seen_at < self.window_s and len(self._entries) <= self.max_entries:
+                break
+            self._entries.popitem(last=False)
+
+    def seen(self, msg: InboundMessage) -> _Entry | None:
+        """
+        Look up a message, registering it if new.
+
+        Returns:
+            None for a first delivery, otherwise the original's entry
+            (entry.done tells whether its responses are available).
+        """
+        if not msg.message_id:
+            return None
+        now = time.monotonic()
+        self._expire(now)
+        key = (msg.session_key, msg.message_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.duplicates += 1
+            return entry
+        self._entries[key] = _Entry(seen_at=now)
+        return None
+
+    def complete(self, msg: InboundMessage, response: OutboundMessage | None) -> None:
+        """Record the outcome of a first delivery's turn."""
+        if not msg.message_id:
+            return
+        entry = self._entries.get((msg.session_key, msg.message_id))
+        if entry is not None:
+            entry.done = True
+            if response is not None:
+                entry.responses.append(response)
+
+    def forget(self, msg: InboundMessage) -> None:
+        """Drop a message that was never processed, so a retry is accepted."""
+        if msg.message_id:
+            self._entries.pop((msg.session_key, msg.message_id), None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,137 @@
+"""Per-channel outbound delivery workers."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import OutboundMessage
+
+
+@dataclass
+class DeadLetter:
+    """An outbound message that could not be delivered."""
+
+    msg: OutboundMessage
+    reason: str  # "overflow", "timeout" or the last exception text
+    attempts: int
+    failed_at: float
+
+
+class OutboundWorker:
+    """
+    Delivers outbound messages for a single channel.
+
+    Each channel gets its own bounded queue and writer task, so a stalled
+    channel (slow API, dead socket) only backs up its own queue. Every send
+    is bounded by send_timeout and retried with jittered exponential
+    backoff; messages that still fail, or arrive while the queue is full,
+    are recorded as dead letters.
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        send: Callable[[OutboundMessage], Awaitable[Any]],
+        maxsize: int = 100,
+        send_timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        dead_letter_limit: int = 100,
+    ):
+        self.channel = channel
+        self.send = send
+        self.send_timeout = send_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.queue: asyncio.Queue[OutboundMessage] = asyncio.Queue(maxsize=maxsize)
+        self.dead_letters: deque[DeadLetter] = deque(maxlen=dead_letter_limit)
+        self._task: asyncio.Task | None = None
+
+        self.sent = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.dead_lettered = 0
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=f"outbound-{self.channel}")
+
+    async def stop(self) -> None:
+        """Stop the writer task; queued messages are discarded."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def submit(self, msg: OutboundMessage) -> bool:
+        """
+        Queue a message without waiting.
+
+        Returns:
+            False if the channel's queue is full (the message is dead-lettered).
+        """
+        try:
+            self.queue.put_nowait(msg)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Outbound queue for {self.channel} full, dead-lettering message to {msg.chat_id}")
+            self._dead_letter(msg, "overflow", 0)
+            return False
+
+    def _dead_letter(self, msg: OutboundMessage, reason: str, attempts: int) -> None:
+        self.dead_lettered += 1
+        self.dead_letters.append(DeadLetter(msg, reason, attempts, time.time()))
+
+    async def _run(self) -> None:
+        while True:
+            msg = await self.queue.get()
+            await self._deliver(msg)
+
+    async def _deliver(self, msg: OutboundMessage) -> None:
+        reason = ""
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                async with asyncio.timeout(self.send_timeout):
+                    await self.send(msg)
+                self.sent += 1
+                return
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                reason = "timeout"
+            except Exception as e:
+                reason = str(e) or type(e).__name__
+
+            if attempt > self.max_retries:
+                break
+            self.retries += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+            logger.warning(f"Send to {self.channel} failed ({reason}), retry {attempt} in {delay:.1f}s")
+            await asyncio.sleep(delay * (0.5 + random.random() / 2))
+
+        logger.error(f"Giving up on message to {self.channel}:{msg.chat_id} after {attempt} attempts: {reason}")
+        self._dead_letter(msg, reason, attempt)
+
+    def get_stats(self) -> dict[str, Any]:
+        """Delivery counters and queue depth for this channel."""
+        return {
+            "depth": self.queue.qsize(),
+            "maxsize": self.queue.maxsize,
+            "sent": self.sent,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "dead_lettered": self.dead_lettered,
+        }
@@ -2,7 +2,15 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
+from uuid import uuid4
+
+# Inbound priority lanes, highest first
+Lane = Literal["interactive", "system", "scheduled"]
+LANES: tuple[Lane, ...] = ("interactive", "system", "scheduled")
+
+# Metadata flag: the turn's reply goes back to the publisher (MessageBus.process_inbound), not to a channel
+REPLY_TO_CALLER = "reply_to_caller"
 
 
 @dataclass
@@ -16,12 +24,48 @@ class InboundMessage:
     timestamp: datetime = field(default_factory=datetime.now)
     media: list[str] = field(default_factory=list)  # Media URLs
     metadata: dict[str, Any] = field(default_factory=dict)  # Channel-specific data
+    lane: Lane = "interactive"  # Priority lane: chat traffic, subagent/system, cron/heartbeat
+    message_id: str | None = None  # Sender-assigned id; redelivered copies share it
+    wal_offset: int | None = field(default=None, repr=False)  # Position in the durable inbound log
+    uid: str = field(default_factory=lambda: uuid4().hex, repr=False)  # Bus-wide identity, kept across processes
     
     @property
     def session_key(self) -> str:
         """Unique key for session identification."""
         return f"{self.channel}:{self.chat_id}"
 
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-safe form for logs and cross-process transport."""
+        return {
+            "channel": self.channel,
+            "sender_id": self.sender_id,
+            "chat_id": self.chat_id,
+            "content": self.content,
+            "timestamp": self.timestamp.isoformat(),
+            "media": self.media,
+            "metadata": self.metadata,
+            "lane": self.lane,
+            "message_id": self.message_id,
+            "wal_offset": self.wal_offset,
+            "uid": self.uid,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "InboundMessage":
+        return cls(
+            channel=data["channel"],
+            sender_id=data["sender_id"],
+            chat_id=data["chat_id"],
+            content=data["content"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            media=data.get("media", []),
+            metadata=data.get("metadata", {}),
+            lane=data.get("lane", "interactive"),
+            message_id=data.get("message_id"),
+            wal_offset=data.get("wal_offset"),
+            uid=data.get("uid") or uuid4().hex,
+        )
+
 
 @dataclass
 class OutboundMessage:
@@ -34,4 +78,24 @@ class OutboundMessage:
     media: list[str] = field(default_factory=list)
     metadata: dict[str, Any] = field(default_factory=dict)
 
+    def to_dict(self) -> dict[str, Any]:
+        """JSON-safe form for cross-process transport."""
+        return {
+            "channel": self.channel,
+            "chat_id": self.chat_id,
+            "content": self.content,
+            "reply_to": self.reply_to,
+            "media": self.media,
+            "metadata": self.metadata,
+        }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "OutboundMessage":
+        return cls(
+            channel=data["channel"],
+            chat_id=data["chat_id"],
+            content=data["content"],
+            reply_to=data.get("reply_to"),
+            media=data.get("media", []),
+            metadata=data.get("metadata", {}),
+        )
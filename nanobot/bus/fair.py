@@ -0,0 +1,147 @@
+"""Weighted fair-share scheduling of inbound messages across senders."""
+
+from __future__ import annotations
+
+import time
+from typing import Any, Literal
+
+from nanobot.bus.events import InboundMessage
+
+# What identifies a flow: the sending user, or the conversation
+FairShareKey = Literal["sender", "session"]
+
+
+class Flow:
+    """Scheduling state and wait statistics for one sender (or session)."""
+
+    __slots__ = (
+        "key", "weight", "vtime", "service_s", "queued", "inflight",
+        "served", "wait_total_s", "wait_max_s",
+    )
+
+    def __init__(self, key: str, weight: float):
+        self.key = key
+        self.weight = weight
+        self.vtime = 0.0  # Weighted agent time consumed, in virtual seconds
+        self.service_s = 1.0  # Moving average of this flow's turn duration
+        self.queued = 0
+        self.inflight = 0
+        self.served = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+
+    @property
+    def idle(self) -> bool:
+        return self.queued == 0 and self.inflight == 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "weight": self.weight,
+            "queued": self.queued,
+            "inflight": self.inflight,
+            "served": self.served,
+            "avg_turn_s": round(self.service_s, 3),
+            "avg_wait_ms": round(1000 * self.wait_total_s / self.served, 2) if self.served else 0.0,
+            "max_wait_ms": round(1000 * self.wait_max_s, 2),
+        }
+
+
+class FairScheduler:
+    """
+    Start-time fair queuing over flows, charged by agent time.
+
+    Each flow accumulates virtual time: the seconds its turns kept the agent
+    busy, divided by its weight. The consumer always serves the backlogged
+    flow with the least virtual time, so a sender running long tool loops
+    falls behind senders with quick questions instead of starving them.
+    A flow that goes idle and comes back starts at the current virtual
+    clock, so idling does not bank credit.
+
+    A turn is charged its flow's average duration when dispatched (several
+    consumers may be running at once) and corrected to the real duration
+    when committed.
+    """
+
+    def __init__(
+        self,
+        key: FairShareKey = "sender",
+        weights: dict[str, float] | None = None,
+        max_idle_flows: int = 1024,
+    ):
+        self.key = key
+        self.weights = weights or {}
+        self.max_idle_flows = max_idle_flows
+        self.flows: dict[str, Flow] = {}
+        self._vclock = 0.0
+        self._dispatched: dict[str, tuple[Flow, float, float]] = {}  # msg.uid -> (flow, start, charge)
+
+    def flow_key(self, msg: InboundMessage) -> str:
+        if self.key == "session":
+            return msg.session_key
+        return f"{msg.channel}:{msg.sender_id}"
+
+    def weight_for(self, msg: InboundMessage) -> float:
+        """Most specific configured weight: "channel:sender", sender, channel, else 1."""
+        for name in (f"{msg.channel}:{msg.sender_id}", msg.sender_id, msg.channel):
+            if name in self.weights:
+                return max(self.weights[name], 0.01)
+        return 1.0
+
+    def enqueue(self, msg: InboundMessage) -> Flow:
+        """Account for a newly queued message and return its flow."""
+        key = self.flow_key(msg)
+        flow = self.flows.get(key)
+        if flow is None:
+            if len(self.flows) >= self.max_idle_flows:
+                self._prune()
+            flow = self.flows[key] = Flow(key, self.weight_for(msg))
+        if flow.idle:
+            flow.vtime = max(flow.vtime, self._vclock)
+        flow.queued += 1
+        return flow
+
+    def _prune(self) -> None:
+        for key in [k for k, f in self.flows.items() if f.idle]:
+            del self.flows[key]
+
+    def dispatch(self, flow: Flow, msg: InboundMessage, wait_s: float) -> None:
+        """Charge a flow for a message handed to a consumer."""
+        self._vclock = flow.vtime
+        charge = flow.service_s / flow.weight
+        flow.vtime += charge
+        flow.queued -= 1
+        flow.inflight += 1
+        flow.served += 1
+        flow.wait_total_s += wait_s
+        flow.wait_max_s = max(flow.wait_max_s, wait_s)
+        self._dispatched[msg.uid] = (flow, time.monotonic(), charge)
+
+    def dequeue_unserved(self, flow: Flow) -> None:
+        """A queued message left without being served (e.g. dropped)."""
+        flow.queued -= 1
+
+    def done(self, msg: InboundMessage) -> None:
+        """Correct the dispatch estimate with the turn's real duration."""
+        entry = self._dispatched.pop(msg.uid, None)
+        if entry is None:
+            return
+        flow, started, charge = entry
+        elapsed = time.monotonic() - started
+        flow.vtime += elapsed / flow.weight - charge
+        flow.service_s = 0.8 * flow.service_s + 0.2 * elapsed
+        flow.inflight -= 1
+
+    def requeue(self, msg: InboundMessage) -> None:
+        """Refund a dispatched message that is being put back unprocessed."""
+        entry = self._dispatched.pop(msg.uid, None)
+        if entry is None:
+            return
+        flow, _, charge = entry
+        flow.vtime -= charge
+        flow.served -= 1
+        flow.inflight -= 1
+
+    def get_stats(self, limit: int = 50) -> dict[str, dict[str, Any]]:
+        """Per-flow stats for the flows with the most total wait."""
+        top = sorted(self.flows.values(), key=lambda f: f.wait_total_s, reverse=True)[:limit]
+        return {f.key: f.to_dict() for f in top}
@@ -0,0 +1,321 @@
+"""Cross-process message bus transport over Unix domain sockets."""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import json
+import os
+import struct
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import BusClosedError, MessageBus
+
+# Frame header: payload length (uint32, big-endian) + frame kind (uint8)
+_HEADER = struct.Struct(">IB")
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+# Frame kinds
+PUBLISH_INBOUND = 1  # client -> hub: InboundMessage, answered by ACK
+DELIVER_INBOUND = 2  # hub -> client: {"seq", "msg"}, answers one PULL
+PUBLISH_OUTBOUND = 3  # client -> hub: publish; hub -> client: deliver to a subscribed channel
+SUBSCRIBE = 4  # client -> hub: {"channel"}
+PULL = 5  # client -> hub: ready for one inbound message
+COMMIT = 6  # client -> hub: {"seq", "response"} for a delivered message whose turn is done
+ACK = 7  # hub -> client: {"ok"}; acks arrive in PUBLISH_INBOUND order
+
+
+def encode_frame(kind: int, payload: dict[str, Any]) -> bytes:
+    """Encode one length-prefixed frame with a compact JSON body."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if len(body) > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {len(body)} bytes exceeds {MAX_FRAME_BYTES}")
+    return _HEADER.pack(len(body), kind) + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[int, dict[str, Any]]:
+    """
+    Read one frame.
+
+    Raises:
+        asyncio.IncompleteReadError: If the peer closed the connection.
+        ValueError: On an oversized frame.
+    """
+    length, kind = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME_BYTES}")
+    return kind, json.loads(await reader.readexactly(length))
+
+
+class _Connection:
+    """Frame writer shared by the tasks that use one socket."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self._drain_lock = asyncio.Lock()
+
+    def write(self, kind: int, payload: dict[str, Any]) -> None:
+        """Buffer a frame; frames are never interleaved because write() is synchronous."""
+        self.writer.write(encode_frame(kind, payload))
+
+    async def send(self, kind: int, payload: dict[str, Any]) -> None:
+        self.write(kind, payload)
+        async with self._drain_lock:
+            await self.writer.drain()
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class BusServer:
+    """
+    Serves a local MessageBus to other processes on a Unix socket.
+
+    The hub process owns the real bus (lanes, overflow policies, WAL).
+    Channel front-ends publish inbound messages and subscribe to outbound
+    channels through it; agent workers pull inbound messages one at a time
+    and publish their responses back. A message delivered to a worker stays
+    in flight until the worker commits it; if the worker disconnects first,
+    the message is requeued for another worker. Messages of one session are
+    never in flight on two consumers at once.
+
+    A connection's publishes run in order on their own task: one waiting on
+    a full lane must not hold up the COMMIT frames read after it, since
+    those commits may be what frees the lane.
+    """
+
+    def __init__(self, bus: MessageBus, path: Path):
+        self.bus = bus
+        self.path = Path(path).expanduser()
+        self._server: asyncio.AbstractServer | None = None
+        self._seq = itertools.count(1)
+        self._connections: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Start listening, replacing a stale socket file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            self.path.unlink()
+        self.bus.session_exclusive = True
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.path))
+        os.chmod(self.path, 0o600)
+        logger.info(f"Bus server listening on {self.path}")
+
+    async def stop(self) -> None:
+        """Stop listening and drop every connection."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        self.path.unlink(missing_ok=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        conn = _Connection(writer)
+        in_flight: dict[int, InboundMessage] = {}
+        pulls: set[asyncio.Task] = set()
+        subscriptions: list[tuple[str, Callable[[OutboundMessage], Awaitable[None]]]] = []
+        publishes: asyncio.Queue[tuple[int, dict[str, Any]]] = asyncio.Queue()
+
+        async def forward(msg: OutboundMessage) -> None:
+            await conn.send(PUBLISH_OUTBOUND, msg.to_dict())
+
+        async def publish_loop() -> None:
+            # In frame order, so ACKs match the client's pending publishes
+            while True:
+                kind, data = await publishes.get()
+                if kind == PUBLISH_INBOUND:
+                    ok = await self.bus.publish_inbound(InboundMessage.from_dict(data))
+                    await conn.send(ACK, {"ok": ok})
+                else:
+                    await self.bus.publish_outbound(OutboundMessage.from_dict(data))
+
+        publisher = asyncio.create_task(publish_loop())
+        try:
+            while True:
+                kind, data = await read_frame(reader)
+                if kind in (PUBLISH_INBOUND, PUBLISH_OUTBOUND):
+                    if publisher.done():
+                        error = publisher.exception()
+                        if not isinstance(error, ConnectionError):
+                            logger.warning(f"Bus server: publish failed, dropping connection: {error}")
+                        break
+                    publishes.put_nowait((kind, data))
+                elif kind == SUBSCRIBE:
+                    self.bus.subscribe_outbound(data["channel"], forward)
+                    subscriptions.append((data["channel"], forward))
+                elif kind == PULL:
+                    pull = asyncio.create_task(self._serve_pull(conn, in_flight))
+                    pulls.add(pull)
+                    pull.add_done_callback(pulls.discard)
+                elif kind == COMMIT:
+                    msg = in_flight.pop(data["seq"], None)
+                    if msg:
+                        response = data.get("response")
+                        self.bus.commit_inbound(msg, OutboundMessage.from_dict(response) if response else None)
+                else:
+                    logger.warning(f"Bus server: unknown frame kind {kind}")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as e:
+            logger.warning(f"Bus server: dropping connection after bad frame: {e}")
+        finally:
+            publisher.cancel()
+            for pull in pulls:
+                pull.cancel()
+            await asyncio.gather(publisher, *pulls, return_exceptions=True)
+            for channel, callback in subscriptions:
+                self.bus.unsubscribe_outbound(channel, callback)
+            for msg in in_flight.values():
+                self.bus.requeue_inbound(msg)
+            if in_flight:
+                logger.warning(f"Bus client disconnected, requeued {len(in_flight)} in-flight messages")
+            conn.close()
+            self._connections.discard(task)
+
+    async def _serve_pull(self, conn: _Connection, in_flight: dict[int, InboundMessage]) -> None:
+        try:
+            msg = await self.bus.consume_inbound()
+        except BusClosedError:
+            return
+        seq = next(self._seq)
+        in_flight[seq] = msg
+        try:
+            await conn.send(DELIVER_INBOUND, {"seq": seq, "msg": msg.to_dict()})
+        except (ConnectionError, asyncio.CancelledError):
+            # The disconnect handler requeues everything left in in_flight
+            pass
+
+
+class RemoteMessageBus(MessageBus):
+    """
+    MessageBus client for a BusServer in another process.
+
+    Drop-in for AgentLoop workers and channel front-ends: inbound publishes
+    and outbound publishes go to the hub; consume_inbound() pulls one message
+    at a time from the hub's lanes; outbound messages for channels subscribed
+    here arrive from the hub and are delivered by the local
+    dispatch_outbound() workers.
+
+    Losing the hub connection stops the bus, so the process should be run
+    under a supervisor that restarts it.
+    """
+
+    def __init__(self, path: Path, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.path = Path(path).expanduser()
+        self._conn: _Connection | None = None
+        self._reader_task: asyncio.Task | None = None
+        self._inbox: asyncio.Queue[InboundMessage | None] = asyncio.Queue()
+        self._acks: deque[asyncio.Future] = deque()
+        self._deliveries: dict[str, int] = {}  # msg.uid -> hub delivery seq
+        self._pull_pending = False
+
+    async def connect(self) -> None:
+        """Connect to the hub and re-send outbound subscriptions."""
+        reader, writer = await asyncio.open_unix_connection(str(self.path))
+        self._conn = _Connection(writer)
+        for channel in self._outbound_subscribers:
+            self._conn.write(SUBSCRIBE, {"channel": channel})
+        self._reader_task = asyncio.create_task(self._read_loop(reader))
+        logger.info(f"Connected to bus hub at {self.path}")
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                kind, data = await read_frame(reader)
+                if kind == DELIVER_INBOUND:
+                    self._pull_pending = False
+                    msg = InboundMessage.from_dict(data["msg"])
+                    self._deliveries[msg.uid] = data["seq"]
+                    self._inbox.put_nowait(msg)
+                elif kind == PUBLISH_OUTBOUND:
+                    await MessageBus.publish_outbound(self, OutboundMessage.from_dict(data))
+                elif kind == ACK:
+                    if self._acks:
+                        self._acks.popleft().set_result(data["ok"])
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            if not self._closed:
+                logger.error(f"Lost connection to bus hub: {e or type(e).__name__}")
+        finally:
+            self._reader_task = None
+            self.stop()
+
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        if self._closed or not self._conn:
+            return False
+        ack = asyncio.get_running_loop().create_future()
+        self._acks.append(ack)
+        await self._conn.send(PUBLISH_INBOUND, msg.to_dict())
+        return await ack
+
+    async def consume_inbound(self) -> InboundMessage:
+        if self._closed and self._inbox.empty():
+            raise BusClosedError()
+        if self._inbox.empty() and not self._pull_pending and self._conn:
+            self._pull_pending = True
+            await self._conn.send(PULL, {})
+        msg = await self._inbox.get()
+        if msg is None:
+            self._inbox.put_nowait(None)
+            raise BusClosedError()
+        return msg
+
+    def commit_inbound(self, msg: InboundMessage, response: OutboundMessage | None = None) -> None:
+        seq = self._deliveries.pop(msg.uid, None)
+        if seq is not None and self._conn and not self._closed:
+            self._conn.write(COMMIT, {"seq": seq, "response": response.to_dict() if response else None})
+
+    async def publish_outbound(self, msg: OutboundMessage) -> None:
+        if self._closed or not self._conn:
+            logger.warning(f"Bus hub not connected, dropping outbound message to {msg.channel}")
+            return
+        await self._conn.send(PUBLISH_OUTBOUND, msg.to_dict())
+
+    def subscribe_outbound(
+        self,
+        channel: str,
+        callback: Callable[[OutboundMessage], Awaitable[None]]
+    ) -> None:
+        new = channel not in self._outbound_subscribers
+        super().subscribe_outbound(channel, callback)
+        if new and self._conn:
+            self._conn.write(SUBSCRIBE, {"channel": channel})
+
+    def stop(self) -> None:
+        if self._closed:
+            return
+        super().stop()
+        self._inbox.put_nowait(None)
+        for ack in self._acks:
+            if not ack.done():
+                ack.set_result(False)
+        self._acks.clear()
+        if self._reader_task:
+            self._reader_task.cancel()
+        if self._conn:
+            self._conn.close()
+            self._conn = None
+
+    @property
+    def inbound_size(self) -> int:
+        """Messages pulled from the hub but not yet consumed."""
+        return self._inbox.qsize()
+
+    def get_stats(self) -> dict[str, Any]:
+        stats = super().get_stats()
+        stats["remote"] = {
+            "path": str(self.path),
+            "connected": self._conn is not None,
+            "in_flight": len(self._deliveries),
+        }
+        return stats
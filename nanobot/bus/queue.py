@@ -1,80 +1,541 @@
 """Async message queue for decoupled channel-agent communication."""
 
+from __future__ import annotations
+
 import asyncio
-from typing import Callable, Awaitable
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Literal
 
 from loguru import logger
 
-from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.dedup import DedupCache
+from nanobot.bus.dispatch import OutboundWorker
+from nanobot.bus.events import LANES, REPLY_TO_CALLER, InboundMessage, Lane, OutboundMessage
+from nanobot.bus.fair import FairScheduler, FairShareKey
+from nanobot.bus.wal import InboundLog
+from nanobot.utils.helpers import get_data_path
+
+if TYPE_CHECKING:
+    from nanobot.config.schema import BusConfig
+
+# What to do with an inbound message when its lane is full
+OverflowPolicy = Literal["block", "drop_oldest", "reject"]
+
+DEFAULT_LANE_MAXSIZE: dict[Lane, int] = {"interactive": 1000, "system": 200, "scheduled": 100}
+
+BUSY_REPLY = "I'm handling a lot of messages right now. Please try again in a moment."
+
+
+class BusClosedError(Exception):
+    """Raised by consume_* once the bus has been stopped."""
+
+
+BusClosed = BusClosedError  # Former name, kept for existing imports
+
+
+@dataclass
+class QueueStats:
+    """Counters for one queue."""
+
+    enqueued: int = 0
+    dequeued: int = 0
+    dropped: int = 0
+    rejected: int = 0
+    wait_total_s: float = 0.0
+    wait_max_s: float = 0.0
+
+    def record_wait(self, wait_s: float) -> None:
+        self.dequeued += 1
+        self.wait_total_s += wait_s
+        if wait_s > self.wait_max_s:
+            self.wait_max_s = wait_s
+
+    def to_dict(self, depth: int, maxsize: int) -> dict[str, Any]:
+        return {
+            "depth": depth,
+            "maxsize": maxsize,
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(1000 * self.wait_total_s / self.dequeued, 2) if self.dequeued else 0.0,
+            "max_wait_ms": round(1000 * self.wait_max_s, 2),
+        }
+
+
+class _Lane:
+    """Bounded inbound priority lane with one FIFO per flow (maxsize 0 = unbounded)."""
+
+    def __init__(self, name: Lane, maxsize: int):
+        self.name = name
+        self.maxsize = maxsize
+        self.queues: dict[str, deque[tuple[float, InboundMessage]]] = {}
+        self.size = 0
+        self.reserved = 0  # Slots held by publishers still writing to the WAL
+        self.stats = QueueStats()
+        self.space = asyncio.Event()
+
+    def full(self) -> bool:
+        return self.maxsize > 0 and self.size + self.reserved >= self.maxsize
+
+    def push(self, key: str, item: tuple[float, InboundMessage], front: bool = False) -> None:
+        queue = self.queues.setdefault(key, deque())
+        if front:
+            queue.appendleft(item)
+        else:
+            queue.append(item)
+        self.size += 1
+
+    def pop(self, key: str, index: int = 0) -> tuple[float, InboundMessage]:
+        queue = self.queues[key]
+        if index:
+            item = queue[index]
+            del queue[index]
+        else:
+            item = queue.popleft()
+        if not queue:
+            del self.queues[key]
+        self.size -= 1
+        return item
 
 
 class MessageBus:
     """
     Async message bus that decouples chat channels from the agent core.
-    
+
     Channels push messages to the inbound queue, and the agent processes
     them and pushes responses to the outbound queue.
+
+    Inbound traffic is split into bounded priority lanes (interactive, then
+    system/subagent, then scheduled); the consumer always takes from the
+    highest non-empty lane. Within a lane, a FairScheduler picks among
+    senders (or sessions) by weighted agent time used, so one heavy user
+    cannot monopolise the agent. When a lane is full the channel's overflow
+    policy applies: "block" the publisher, "drop_oldest" queued message of
+    the most backlogged sender, or "reject" the new one with a busy reply.
+    Queue depth and time-in-queue, overall and per sender, are reported by
+    get_stats().
+
+    Outbound messages are routed to one OutboundWorker per channel, so a
+    slow or failing channel cannot hold up delivery to the others.
+
+    With an InboundLog (durable mode) every inbound message is written to
+    the log before publish_inbound returns, the consumer calls
+    commit_inbound() once the turn is saved, and messages left uncommitted
+    by a previous run are queued again at construction.
+
+    Messages carrying a message_id are deduplicated for dedup_window
+    seconds: a redelivered copy is not queued again, and once the original
+    turn is committed the copy is answered with the cached response.
     """
-    
-    def __init__(self):
-        self.inbound: asyncio.Queue[InboundMessage] = asyncio.Queue()
-        self.outbound: asyncio.Queue[OutboundMessage] = asyncio.Queue()
+
+    def __init__(
+        self,
+        lane_maxsize: dict[Lane, int] | None = None,
+        outbound_maxsize: int = 1000,
+        overflow_policy: OverflowPolicy = "block",
+        channel_policies: dict[str, OverflowPolicy] | None = None,
+        channel_queue_maxsize: int = 100,
+        send_timeout: float = 10.0,
+        send_retries: int = 3,
+        retry_backoff: float = 0.5,
+        wal: InboundLog | None = None,
+        dedup_window: float = 600.0,
+        dedup_max_entries: int = 10_000,
+        fair_share_key: FairShareKey = "sender",
+        fair_share_weights: dict[str, float] | None = None,
+    ):
+        sizes = {**DEFAULT_LANE_MAXSIZE, **(lane_maxsize or {})}
+        self._lanes: dict[Lane, _Lane] = {lane: _Lane(lane, sizes[lane]) for lane in LANES}
+        self._inbound_ready = asyncio.Event()
+        self.overflow_policy = overflow_policy
+        self.channel_policies = channel_policies or {}
+        self.fair = FairScheduler(fair_share_key, fair_share_weights)
+
+        # A None item is the shutdown sentinel
+        self.outbound: asyncio.Queue[tuple[float, OutboundMessage] | None] = asyncio.Queue(maxsize=outbound_maxsize)
+        self._outbound_stats = QueueStats()
         self._outbound_subscribers: dict[str, list[Callable[[OutboundMessage], Awaitable[None]]]] = {}
-        self._running = False
-    
-    async def publish_inbound(self, msg: InboundMessage) -> None:
-        """Publish a message from a channel to the agent."""
-        await self.inbound.put(msg)
-    
+        self._workers: dict[str, OutboundWorker] = {}
+        self._worker_options = {
+            "maxsize": channel_queue_maxsize,
+            "send_timeout": send_timeout,
+            "max_retries": send_retries,
+            "backoff_base": retry_backoff,
+        }
+        self._closed = False
+        self._replies: dict[str, asyncio.Future[OutboundMessage | None]] = {}
+
+        # When several consumers share the bus, hold back a session's next
+        # message until its current one is committed (turns stay ordered)
+        self.session_exclusive = False
+        self._active_sessions: set[str] = set()
+
+        self.dedup = DedupCache(dedup_window, dedup_max_entries) if dedup_window > 0 else None
+
+        self.wal = wal
+        if wal:
+            for msg in wal.replay():
+                self._enqueue(msg)
+
+    @classmethod
+    def from_config(cls, config: BusConfig) -> MessageBus:
+        """Create a bus from the `bus` config section."""
+        wal = None
+        if config.durable:
+            wal_dir = Path(config.wal_dir).expanduser() if config.wal_dir else get_data_path() / "bus"
+            wal = InboundLog(
+                wal_dir,
+                segment_bytes=config.wal_segment_bytes,
+                fsync_interval=config.wal_fsync_interval_ms / 1000,
+                commit_interval=config.wal_commit_interval_ms / 1000,
+            )
+        return cls(
+            lane_maxsize={
+                "interactive": config.interactive_maxsize,
+                "system": config.system_maxsize,
+                "scheduled": config.scheduled_maxsize,
+            },
+            outbound_maxsize=config.outbound_maxsize,
+            overflow_policy=config.overflow_policy,
+            channel_policies=dict(config.channel_policies),
+            channel_queue_maxsize=config.channel_queue_maxsize,
+            send_timeout=config.send_timeout,
+            send_retries=config.send_retries,
+            retry_backoff=config.retry_backoff,
+            wal=wal,
+            dedup_window=config.dedup_window_s,
+            dedup_max_entries=config.dedup_max_entries,
+            fair_share_key=config.fair_share_key,
+            fair_share_weights=dict(config.fair_share_weights),
+        )
+
+    async def publish_inbound(self, msg: InboundMessage) -> bool:
+        """
+        Publish a message from a channel to the agent.
+
+        Returns:
+            True if queued (or a duplicate of an accepted message), False if
+            rejected because the lane is full.
+        """
+        if self._closed:
+            logger.warning(f"Bus stopped, dropping inbound message from {msg.session_key}")
+            return False
+
+        if self.dedup is not None:
+            original = self.dedup.seen(msg)
+            if original is not None:
+                logger.info(f"Duplicate inbound message {msg.message_id} from {msg.session_key}")
+                if original.done:
+                    for response in original.responses:
+                        await self.publish_outbound(replace(response))
+                return True
+
+        lane = self._lanes[msg.lane]
+        if lane.full():
+            policy = self.channel_policies.get(msg.channel, self.overflow_policy)
+            if policy == "reject":
+                lane.stats.rejected += 1
+                if self.dedup is not None:
+                    self.dedup.forget(msg)
+                logger.warning(f"Inbound {lane.name} lane full, rejecting message from {msg.session_key}")
+                await self.publish_outbound(OutboundMessage(
+                    channel=msg.channel,
+                    chat_id=msg.chat_id,
+                    content=BUSY_REPLY,
+                    metadata={"busy": True},
+                ))
+                return False
+            # With every slot reserved by in-flight publishers there is nothing to drop; wait instead
+            if policy == "drop_oldest" and lane.queues:
+                heaviest = max(lane.queues, key=lambda k: len(lane.queues[k]))
+                _, dropped = lane.pop(heaviest)
+                self.fair.dequeue_unserved(self.fair.flows[heaviest])
+                lane.stats.dropped += 1
+                self._commit_wal(dropped)
+                if self.dedup is not None:
+                    self.dedup.forget(dropped)
+                logger.warning(f"Inbound {lane.name} lane full, dropped oldest message from {dropped.session_key}")
+            else:
+                while lane.full():
+                    lane.space.clear()
+                    await lane.space.wait()
+                    if self._closed:
+                        if self.dedup is not None:
+                            self.dedup.forget(msg)
+                        return False
+
+        if self.wal:
+            # Hold the slot across the write, or concurrent publishers could overfill the lane
+            lane.reserved += 1
+            try:
+                await self.wal.append(msg)
+            except BaseException:
+                lane.space.set()
+                raise
+            finally:
+                lane.reserved -= 1
+        self._enqueue(msg)
+        return True
+
+    async def process_inbound(self, msg: InboundMessage) -> OutboundMessage | None:
+        """
+        Publish a message and wait for the agent's reply to it.
+
+        The reply is handed back here instead of being sent to a channel;
+        cron and heartbeat turns use this and decide themselves whether to
+        deliver it. Returns None if the message was not queued.
+        """
+        msg.message_id = msg.message_id or uuid.uuid4().hex
+        msg.metadata[REPLY_TO_CALLER] = True
+        reply = asyncio.get_running_loop().create_future()
+        self._replies[msg.message_id] = reply
+        try:
+            if not await self.publish_inbound(msg):
+                return None
+            return await reply
+        finally:
+            self._replies.pop(msg.message_id, None)
+
+    def _enqueue(self, msg: InboundMessage, front: bool = False) -> None:
+        lane = self._lanes[msg.lane]
+        flow = self.fair.enqueue(msg)
+        lane.push(flow.key, (time.monotonic(), msg), front=front)
+        lane.stats.enqueued += 1
+        self._inbound_ready.set()
+
     async def consume_inbound(self) -> InboundMessage:
-        """Consume the next inbound message (blocks until available)."""
-        return await self.inbound.get()
-    
+        """
+        Consume the next inbound message, highest-priority lane first.
+
+        Blocks until a message is available without polling.
+
+        Raises:
+            BusClosedError: If the bus has been stopped.
+        """
+        while True:
+            if self._closed:
+                raise BusClosedError()
+            for lane in self._lanes.values():
+                msg = self._take(lane)
+                if msg:
+                    lane.space.set()
+                    return msg
+            self._inbound_ready.clear()
+            await self._inbound_ready.wait()
+
+    def _take(self, lane: _Lane) -> InboundMessage | None:
+        """Pop the next message of the flow with the least virtual time."""
+        best = None
+        for key, queue in lane.queues.items():
+            flow = self.fair.flows[key]
+            if best and flow.vtime >= best[0].vtime:
+                continue
+            index = 0
+            if self.session_exclusive:
+                index = next(
+                    (i for i, (_, m) in enumerate(queue) if m.session_key not in self._active_sessions),
+                    None,
+                )
+                if index is None:
+                    continue
+            best = (flow, key, index)
+        if best is None:
+            return None
+
+        flow, key, index = best
+        enqueued_at, msg = lane.pop(key, index)
+        wait = time.monotonic() - enqueued_at
+        lane.stats.record_wait(wait)
+        self.fair.dispatch(flow, msg, wait)
+        if self.session_exclusive:
+            self._active_sessions.add(msg.session_key)
+        return msg
+
+    def requeue_inbound(self, msg: InboundMessage) -> None:
+        """Put a consumed but unprocessed message back at the head of its flow."""
+        self.fair.requeue(msg)
+        if self._active_sessions:
+            self._active_sessions.discard(msg.session_key)
+        self._enqueue(msg, front=True)
+
+    def commit_inbound(self, msg: InboundMessage, response: OutboundMessage | None = None) -> None:
+        """
+        Mark an inbound message as handled so durable mode won't replay it.
+
+        Args:
+            msg: The consumed message.
+            response: The turn's reply, cached to answer redelivered copies.
+        """
+        self._commit_wal(msg)
+        if self.dedup is not None:
+            self.dedup.complete(msg, response)
+        reply = self._replies.get(msg.message_id) if msg.message_id else None
+        if reply is not None and not reply.done():
+            reply.set_result(response)
+        self._release(msg)
+
+    def _commit_wal(self, msg: InboundMessage) -> None:
+        if self.wal and msg.wal_offset is not None:
+            self.wal.commit(msg.wal_offset)
+
+    def _release(self, msg: InboundMessage) -> None:
+        self.fair.done(msg)
+        if self._active_sessions:
+            self._active_sessions.discard(msg.session_key)
+        self._inbound_ready.set()
+
     async def publish_outbound(self, msg: OutboundMessage) -> None:
-        """Publish a response from the agent to channels."""
-        await self.outbound.put(msg)
-    
+        """Publish a response from the agent to channels (blocks while the outbound queue is full)."""
+        await self.outbound.put((time.monotonic(), msg))
+        self._outbound_stats.enqueued += 1
+
     async def consume_outbound(self) -> OutboundMessage:
-        """Consume the next outbound message (blocks until available)."""
-        return await self.outbound.get()
-    
+        """
+        Consume the next outbound message (blocks until available).
+
+        Raises:
+            BusClosedError: If the bus has been stopped.
+        """
+        if self._closed:
+            raise BusClosedError()
+        item = await self.outbound.get()
+        if item is None:
+            # Leave the sentinel in place for any other consumer
+            self.outbound.put_nowait(None)
+            raise BusClosedError()
+        enqueued_at, msg = item
+        self._outbound_stats.record_wait(time.monotonic() - enqueued_at)
+        return msg
+
     def subscribe_outbound(
-        self, 
-        channel: str, 
+        self,
+        channel: str,
         callback: Callable[[OutboundMessage], Awaitable[None]]
     ) -> None:
         """Subscribe to outbound messages for a specific channel."""
         if channel not in self._outbound_subscribers:
             self._outbound_subscribers[channel] = []
         self._outbound_subscribers[channel].append(callback)
-    
+
+    def unsubscribe_outbound(
+        self,
+        channel: str,
+        callback: Callable[[OutboundMessage], Awaitable[None]]
+    ) -> None:
+        """Remove a callback added with subscribe_outbound()."""
+        callbacks = self._outbound_subscribers.get(channel, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._outbound_subscribers.pop(channel, None)
+
+    def has_subscribers(self, channel: str) -> bool:
+        """Whether any callback is subscribed to a channel."""
+        return bool(self._outbound_subscribers.get(channel))
+
+    def route_outbound(self, msg: OutboundMessage) -> bool:
+        """
+        Hand a message to its channel's delivery worker without waiting.
+
+        Returns:
+            False if nobody is subscribed or the channel's queue is full.
+        """
+        if not self.has_subscribers(msg.channel):
+            return False
+        return self._worker(msg.channel).submit(msg)
+
+    def get_channel_stats(self, channel: str) -> dict[str, Any] | None:
+        """A channel's delivery worker stats, or None if nothing has been routed to it."""
+        worker = self._workers.get(channel)
+        return worker.get_stats() if worker else None
+
+    async def stop_workers(self) -> None:
+        """Stop every channel delivery worker."""
+        for worker in self._workers.values():
+            await worker.stop()
+        self._workers.clear()
+
+    def _worker(self, channel: str) -> OutboundWorker:
+        """Get (or start) the delivery worker for a channel."""
+        worker = self._workers.get(channel)
+        if worker is None:
+            worker = OutboundWorker(channel, self._make_sender(channel), **self._worker_options)
+            worker.start()
+            self._workers[channel] = worker
+        return worker
+
+    def _make_sender(self, channel: str) -> Callable[[OutboundMessage], Awaitable[None]]:
+        async def send(msg: OutboundMessage) -> None:
+            # A retry re-invokes every subscriber; channels normally have one
+            for callback in self._outbound_subscribers.get(channel, []):
+                await callback(msg)
+        return send
+
     async def dispatch_outbound(self) -> None:
         """
-        Dispatch outbound messages to subscribed channels.
-        Run this as a background task.
+        Route outbound messages to each channel's delivery worker.
+        Run this as a background task; it returns once the bus is stopped.
         """
-        self._running = True
-        while self._running:
-            try:
-                msg = await asyncio.wait_for(self.outbound.get(), timeout=1.0)
-                subscribers = self._outbound_subscribers.get(msg.channel, [])
-                for callback in subscribers:
-                    try:
-                        await callback(msg)
-                    except Exception as e:
-                        logger.error(f"Error dispatching to {msg.channel}: {e}")
-            except asyncio.TimeoutError:
-                continue
-    
+        try:
+            while True:
+                try:
+                    msg = await self.consume_outbound()
+                except BusClosedError:
+                    break
+                if not self.has_subscribers(msg.channel):
+                    logger.warning(f"No subscriber for outbound channel: {msg.channel}")
+                    continue
+                self.route_outbound(msg)
+        finally:
+            await self.stop_workers()
+
     def stop(self) -> None:
-        """Stop the dispatcher loop."""
-        self._running = False
-    
+        """Stop the bus, waking every blocked consumer and publisher immediately."""
+        if self._closed:
+            return
+        self._closed = True
+        self._inbound_ready.set()
+        for lane in self._lanes.values():
+            lane.space.set()
+        for reply in self._replies.values():
+            if not reply.done():
+                reply.set_result(None)
+        try:
+            self.outbound.put_nowait(None)
+        except asyncio.QueueFull:
+            pass  # Nobody is blocked in get(); consumers check _closed on their next call
+        if self.wal:
+            self.wal.close()
+
+    @property
+    def is_closed(self) -> bool:
+        """Whether stop() has been called."""
+        return self._closed
+
+    def get_stats(self) -> dict[str, Any]:
+        """Queue depth, drop/reject counters and time-in-queue for every lane, sender, outbound and channel worker."""
+        return {
+            "inbound": {
+                name: lane.stats.to_dict(lane.size, lane.maxsize)
+                for name, lane in self._lanes.items()
+            },
+            "outbound": self._outbound_stats.to_dict(self.outbound.qsize(), self.outbound.maxsize),
+            "channels": {name: worker.get_stats() for name, worker in self._workers.items()},
+            "wal": self.wal.get_stats() if self.wal else None,
+            "senders": self.fair.get_stats(),
+            "dedup": {"entries": len(self.dedup), "duplicates": self.dedup.duplicates} if self.dedup is not None else None,
+        }
+
     @property
     def inbound_size(self) -> int:
         """Number of pending inbound messages."""
-        return self.inbound.qsize()
-    
+        return sum(lane.size for lane in self._lanes.values())
+
     @property
     def outbound_size(self) -> int:
         """Number of pending outbound messages."""
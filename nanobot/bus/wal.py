@@ -0,0 +1,303 @@
+"""Durable write-ahead log for inbound bus messages."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from nanobot.bus.events import InboundMessage
+from nanobot.utils.helpers import ensure_dir
+
+_SEGMENT_PREFIX = "segment-"
+_SEGMENT_SUFFIX = ".log"
+_COMMIT_FILE = "committed.json"
+
+
+def _encode(offset: int, msg: InboundMessage) -> bytes:
+    record = msg.to_dict()
+    record["wal_offset"] = offset
+    return (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+
+
+def _decode(line: bytes) -> tuple[int, InboundMessage]:
+    msg = InboundMessage.from_dict(json.loads(line))
+    return msg.wal_offset, msg
+
+
+class InboundLog:
+    """
+    Append-only segment log of inbound messages.
+
+    Messages are appended to the active segment file and acknowledged only
+    once fsynced. Concurrent appends share one fsync (group commit), so
+    throughput is bounded by batches, not by per-message disk syncs.
+
+    Consumers commit a message's offset once its turn is saved. Offsets may
+    be committed out of order (priority lanes reorder delivery); the log
+    keeps a low watermark plus the set of committed offsets above it.
+    Commits are persisted in batches, off the event loop, every
+    commit_interval seconds; a crash can replay the messages committed in
+    the last window (the bus's dedup cache answers those).
+    Segments entirely below the watermark are deleted, and the active
+    segment is rotated once it reaches segment_bytes.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        segment_bytes: int = 16 * 1024 * 1024,
+        fsync_interval: float = 0.005,
+        commit_interval: float = 0.05,
+    ):
+        self.path = ensure_dir(path)
+        self.segment_bytes = segment_bytes
+        self.fsync_interval = fsync_interval
+        self.commit_interval = commit_interval
+
+        self._commit_path = self.path / _COMMIT_FILE
+        self._watermark = -1  # Every offset <= watermark is committed
+        self._committed: set[int] = set()  # Committed offsets above the watermark
+        self._segments: list[tuple[int, Path]] = []  # (first offset, path), oldest first
+        self._pending: dict[int, InboundMessage] = {}
+        self._next_offset = 0
+
+        self._load()
+        self._file = open(self._active_path(), "ab")
+        self._dir_fd = os.open(self.path, os.O_RDONLY)
+        self._sync_waiters: list[asyncio.Future] = []
+        self._sync_task: asyncio.Task | None = None
+        self._commit_version = 0  # Bumped by every commit()
+        self._written_version = 0  # Last version persisted to the commit file
+        self._commit_lock = threading.Lock()  # Serialises commit-file writes across threads
+        self._commit_task: asyncio.Task | None = None
+
+    def _segment_path(self, first_offset: int) -> Path:
+        return self.path / f"{_SEGMENT_PREFIX}{first_offset:020d}{_SEGMENT_SUFFIX}"
+
+    def _active_path(self) -> Path:
+        if not self._segments:
+            self._segments.append((self._next_offset, self._segment_path(self._next_offset)))
+        return self._segments[-1][1]
+
+    def _load(self) -> None:
+        """Read the commit state and collect uncommitted messages for replay."""
+        if self._commit_path.exists():
+            try:
+                state = json.loads(self._commit_path.read_text(encoding="utf-8"))
+                self._watermark = state["watermark"]
+                self._committed = set(state.get("committed", []))
+            except (json.JSONDecodeError, KeyError) as e:
+                logger.warning(f"Corrupt WAL commit file, replaying everything: {e}")
+
+        for seg in sorted(self.path.glob(f"{_SEGMENT_PREFIX}*{_SEGMENT_SUFFIX}")):
+            first = int(seg.name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)])
+            self._segments.append((first, seg))
+            with open(seg, "rb") as f:
+                for line in f:
+                    try:
+                        offset, msg = _decode(line)
+                    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+                        # A torn write at the tail of the last segment
+                        logger.warning(f"Skipping corrupt WAL record in {seg.name}")
+                        continue
+                    self._next_offset = max(self._next_offset, offset + 1)
+                    if offset > self._watermark and offset not in self._committed:
+                        self._pending[offset] = msg
+
+        if self._segments:
+            self._trim_torn_tail(self._segments[-1][1])
+        self._next_offset = max(self._next_offset, self._watermark + 1)
+        if self._pending:
+            logger.info(f"WAL: {len(self._pending)} uncommitted inbound messages to replay")
+
+    @staticmethod
+    def _trim_torn_tail(seg: Path) -> None:
+        """
+        Cut a partial record off the end of the active segment.
+
+        Otherwise the next append would be glued onto it and the combined
+        line skipped as corrupt on the next replay.
+        """
+        with open(seg, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                step = min(64 * 1024, end)
+                f.seek(end - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b"\n")
+                if newline >= 0:
+                    end = end - step + newline + 1
+                    break
+                end -= step
+            if end < size:
+                logger.warning(f"Truncating {size - end} bytes of torn WAL record in {seg.name}")
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def replay(self) -> list[InboundMessage]:
+        """Uncommitted messages from previous runs, oldest first."""
+        return [self._pending[o] for o in sorted(self._pending)]
+
+    async def append(self, msg: InboundMessage) -> int:
+        """
+        Append a message and wait until it is durable.
+
+        Returns:
+            The message's offset (also stored on msg.wal_offset).
+        """
+        offset = self._next_offset
+        self._next_offset += 1
+        msg.wal_offset = offset
+        self._file.write(_encode(offset, msg))
+        self._pending[offset] = msg
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._sync_waiters.append(waiter)
+        if self._sync_task is None:
+            self._sync_task = asyncio.create_task(self._group_sync())
+        try:
+            await waiter
+        except Exception:
+            self._pending.pop(offset, None)  # Not acknowledged; the publisher sees the error
+            raise
+
+        if self._file.tell() >= self.segment_bytes:
+            self._rotate()
+        return offset
+
+    async def _group_sync(self) -> None:
+        """Flush and fsync once for every append that arrived in the window."""
+        waiters: list[asyncio.Future] = []
+        try:
+            await asyncio.sleep(self.fsync_interval)
+            waiters, self._sync_waiters = self._sync_waiters, []
+            self._file.flush()
+            await asyncio.to_thread(os.fsync, self._file.fileno())
+        except Exception as e:
+            # Nobody awaits this task: the appenders are the ones to see the error.
+            # Later appends share the failed buffer, so they fail too.
+            logger.error(f"WAL sync failed: {e}")
+            waiters += self._sync_waiters
+            self._sync_waiters = []
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+        finally:
+            self._sync_task = None
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        if self._sync_waiters:
+            self._sync_task = asyncio.create_task(self._group_sync())
+
+    def _rotate(self) -> None:
+        # Appends waiting on the next group sync may still be in this segment
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._segments.append((self._next_offset, self._segment_path(self._next_offset)))
+        self._file = open(self._segments[-1][1], "ab")
+        self._truncate()
+
+    def commit(self, offset: int) -> None:
+        """Mark a message as fully processed so it is not replayed."""
+        if offset <= self._watermark or offset in self._committed:
+            return
+        self._pending.pop(offset, None)
+        self._committed.add(offset)
+        while self._watermark + 1 in self._committed:
+            self._watermark += 1
+            self._committed.discard(self._watermark)
+        self._commit_version += 1
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_commit_state(self._commit_state())  # No event loop to batch on
+            return
+        if self._commit_task is None:
+            self._commit_task = asyncio.create_task(self._group_commit())
+
+    def _commit_state(self) -> tuple[int, bytes]:
+        state = {"watermark": self._watermark, "committed": sorted(self._committed)}
+        return self._commit_version, json.dumps(state).encode()
+
+    def _write_commit_state(self, snapshot: tuple[int, bytes]) -> None:
+        version, data = snapshot
+        with self._commit_lock:
+            # A batch still in a worker thread when close() wrote a newer state
+            if self._dir_fd is None or version <= self._written_version:
+                return
+            # Durable before and after the rename, or a crash could lose or blank the watermark
+            tmp = self._commit_path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self._commit_path)
+            os.fsync(self._dir_fd)
+            self._written_version = version
+
+    async def _group_commit(self) -> None:
+        """Persist every commit made in the window with one write, in a worker thread."""
+        try:
+            while self._written_version < self._commit_version:
+                await asyncio.sleep(self.commit_interval)
+                await asyncio.to_thread(self._write_commit_state, self._commit_state())
+        except Exception as e:
+            # Retried by the next commit; until then a crash replays these messages
+            logger.error(f"WAL commit persist failed: {e}")
+        finally:
+            self._commit_task = None
+
+    def _truncate(self) -> None:
+        """Delete closed segments whose messages are all committed."""
+        while len(self._segments) > 1 and self._segments[1][0] - 1 <= self._watermark:
+            _, seg = self._segments.pop(0)
+            seg.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        """Flush and close the active segment."""
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        if self._commit_task:
+            self._commit_task.cancel()
+            self._commit_task = None
+        self._write_commit_state(self._commit_state())
+        with self._commit_lock:
+            os.close(self._dir_fd)
+            self._dir_fd = None
+        # Everything written so far is durable; release appends waiting on a group sync
+        if self._sync_task:
+            self._sync_task.cancel()
+            self._sync_task = None
+        for waiter in self._sync_waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        self._sync_waiters = []
+
+    @property
+    def pending_count(self) -> int:
+        """Appended messages not yet committed."""
+        return len(self._pending)
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "next_offset": self._next_offset,
+            "watermark": self._watermark,
+            "unpersisted_commits": self._commit_version - self._written_version,
+            "pending": len(self._pending),
+            "segments": len(self._segments),
+        }
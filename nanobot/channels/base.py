@@ -89,7 +89,8 @@ class BaseChannel(ABC):
         chat_id: str,
         content: str,
         media: list[str] | None = None,
-        metadata: dict[str, Any] | None = None
+        metadata: dict[str, Any] | None = None,
+        message_id: str | None = None,
     ) -> None:
         """
         Handle an incoming message from the chat platform.
@@ -102,6 +103,7 @@ class BaseChannel(ABC):
             content: Message text content.
             media: Optional list of media URLs.
             metadata: Optional channel-specific metadata.
+            message_id: Optional platform message id, used to drop redeliveries.
         """
         if not self.is_allowed(sender_id):
             logger.warning(
@@ -116,7 +118,8 @@ class BaseChannel(ABC):
             chat_id=str(chat_id),
             content=content,
             media=media or [],
-            metadata=metadata or {}
+            metadata=metadata or {},
+            message_id=str(message_id) if message_id is not None else None,
         )
         
         await self.bus.publish_inbound(msg)
@@ -7,7 +7,6 @@ from typing import Any, TYPE_CHECKING
 
 from loguru import logger
 
-from nanobot.bus.events import OutboundMessage
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.base import BaseChannel
 from nanobot.config.schema import Config
@@ -23,7 +22,8 @@ class ChannelManager:
     Responsibilities:
     - Initialize enabled channels (Telegram, WhatsApp, etc.)
     - Start/stop channels
-    - Route outbound messages
+    - Register each channel's send() with the bus, whose dispatcher
+      delivers outbound messages (one delivery worker per channel)
     """
     
     def __init__(self, config: Config, bus: MessageBus, session_manager: "SessionManager | None" = None):
@@ -56,8 +56,10 @@ class ChannelManager:
             logger.warning("No channels enabled")
             return
         
-        # Start outbound dispatcher
-        self._dispatch_task = asyncio.create_task(self._dispatch_outbound())
+        # Outbound delivery: the bus runs one worker per subscribed channel
+        for name, channel in self.channels.items():
+            self.bus.subscribe_outbound(name, channel.send)
+        self._dispatch_task = asyncio.create_task(self.bus.dispatch_outbound())
         
         # Start channels
         tasks = []
@@ -79,40 +81,17 @@ class ChannelManager:
                 await self._dispatch_task
             except asyncio.CancelledError:
                 pass
+            self._dispatch_task = None
         
         # Stop all channels
         for name, channel in self.channels.items():
+            self.bus.unsubscribe_outbound(name, channel.send)
             try:
                 await channel.stop()
                 logger.info(f"Stopped {name} channel")
             except Exception as e:
                 logger.error(f"Error stopping {name}: {e}")
     
-    async def _dispatch_outbound(self) -> None:
-        """Dispatch outbound messages to the appropriate channel."""
-        logger.info("Outbound dispatcher started")
-        
-        while True:
-            try:
-                msg = await asyncio.wait_for(
-                    self.bus.consume_outbound(),
-                    timeout=1.0
-                )
-                
-                channel = self.channels.get(msg.channel)
-                if channel:
-                    try:
-                        await channel.send(msg)
-                    except Exception as e:
-                        logger.error(f"Error sending to {msg.channel}: {e}")
-                else:
-                    logger.warning(f"Unknown channel: {msg.channel}")
-                    
-            except asyncio.TimeoutError:
-                continue
-            except asyncio.CancelledError:
-                break
-    
     def get_channel(self, name: str) -> BaseChannel | None:
         """Get a channel by name."""
         return self.channels.get(name)
@@ -122,7 +101,8 @@ class ChannelManager:
         return {
             name: {
                 "enabled": True,
-                "running": channel.is_running
+                "running": channel.is_running,
+                "outbound": self.bus.get_channel_stats(name),
             }
             for name, channel in self.channels.items()
         }
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 from typing import TYPE_CHECKING
 
 from loguru import logger
@@ -39,7 +38,6 @@ class MobileChannel(BaseChannel):
         """
         super().__init__(config, bus)
         self.websocket_server = websocket_server
-        self._outbound_task: asyncio.Task | None = None
 
     async def start(self) -> None:
         """Start the mobile channel."""
@@ -49,12 +47,10 @@ class MobileChannel(BaseChannel):
 
         self._running = True
 
-        # Subscribe to outbound messages for this channel
+        # Subscribe to outbound messages for this channel; delivery is
+        # driven by the bus dispatcher, so no background task is needed
         self.bus.subscribe_outbound(self.name, self._handle_outbound)
 
-        # Start outbound message handler
-        self._outbound_task = asyncio.create_task(self._process_outbound())
-
         logger.info("Mobile channel started")
 
     async def stop(self) -> None:
@@ -64,15 +60,6 @@ class MobileChannel(BaseChannel):
 
         self._running = False
 
-        # Cancel outbound task
-        if self._outbound_task:
-            self._outbound_task.cancel()
-            try:
-                await self._outbound_task
-            except asyncio.CancelledError:
-                pass
-            self._outbound_task = None
-
         logger.info("Mobile channel stopped")
 
     async def send(self, msg: OutboundMessage) -> None:
@@ -102,25 +89,6 @@ class MobileChannel(BaseChannel):
         """
         await self.send(msg)
 
-    async def _process_outbound(self) -> None:
-        """
-        Process outbound messages from the bus.
-
-        This runs as a background task to handle messages.
-        """
-        logger.debug("Mobile channel outbound processor started")
-
-        while self._running:
-            try:
-                # Wait for outbound messages
-                await asyncio.sleep(0.1)  # Small sleep to prevent busy loop
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in mobile channel outbound processor: {e}")
-
-        logger.debug("Mobile channel outbound processor stopped")
-
     def get_connected_devices(self) -> list[dict]:
         """
         Get list of connected mobile devices.
@@ -325,6 +325,7 @@ def gateway(
 ):
     """Start the nanobot gateway."""
     from nanobot.config.loader import load_config, get_data_dir
+    from nanobot.bus.events import InboundMessage, OutboundMessage
     from nanobot.bus.queue import MessageBus
     from nanobot.agent.loop import AgentLoop
     from nanobot.channels.manager import ChannelManager
@@ -332,6 +333,11 @@ def gateway(
     from nanobot.cron.service import CronService
     from nanobot.cron.types import CronJob
     from nanobot.heartbeat.service import HeartbeatService
+    from nanobot.agent.consolidation import (
+        CONSOLIDATION_EVENT,
+        MemoryConsolidator,
+        sync_consolidation_job,
+    )
     
     if verbose:
         import logging
@@ -340,7 +346,7 @@ def gateway(
     console.print(f"{__logo__} Starting nanobot gateway on port {port}...")
     
     config = load_config()
-    bus = MessageBus()
+    bus = MessageBus.from_config(config.bus)
     provider = _make_provider(config)
     session_manager = SessionManager(config.workspace_path)
     
@@ -360,31 +366,58 @@ def gateway(
         cron_service=cron,
         restrict_to_workspace=config.tools.restrict_to_workspace,
         session_manager=session_manager,
+        cross_session_recall=config.agents.defaults.cross_session_recall,
+    )
+    
+    # Memory consolidation runs as a cron system_event job
+    consolidation = config.agents.consolidation
+    consolidator = MemoryConsolidator(
+        agent.context.memory,
+        provider=provider,
+        model=consolidation.model or None,
+        keep_days=consolidation.keep_days,
+        max_bytes=consolidation.max_bytes,
     )
+    sync_consolidation_job(cron, consolidation)
     
     # Set cron callback (needs agent)
     async def on_cron_job(job: CronJob) -> str | None:
         """Execute a cron job through the agent."""
-        response = await agent.process_direct(
-            job.payload.message,
-            session_key=f"cron:{job.id}",
+        if job.payload.kind == "system_event" and job.payload.message == CONSOLIDATION_EVENT:
+            if not consolidation.enabled:
+                return "Memory consolidation is disabled"
+            report = await consolidator.consolidate()
+            return report.summary()
+        
+        # Queued on the scheduled lane, behind chat and subagent traffic
+        reply = await bus.process_inbound(InboundMessage(
             channel=job.payload.channel or "cli",
+            sender_id="cron",
             chat_id=job.payload.to or "direct",
-        )
+            content=job.payload.message,
+            lane="scheduled",
+        ))
+        response = reply.content if reply else ""
         if job.payload.deliver and job.payload.to:
-            from nanobot.bus.events import OutboundMessage
             await bus.publish_outbound(OutboundMessage(
                 channel=job.payload.channel or "cli",
                 chat_id=job.payload.to,
-                content=response or ""
+                content=response
             ))
         return response
     cron.on_job = on_cron_job
     
     # Create heartbeat service
     async def on_heartbeat(prompt: str) -> str:
-        """Execute heartbeat through the agent."""
-        return await agent.process_direct(prompt, session_key="heartbeat")
+        """Execute heartbeat through the agent (scheduled lane)."""
+        reply = await bus.process_inbound(InboundMessage(
+            channel="cli",
+            sender_id="heartbeat",
+            chat_id="direct",
+            content=prompt,
+            lane="scheduled",
+        ))
+        return reply.content if reply else ""
     
     heartbeat = HeartbeatService(
         workspace=config.workspace_path,
@@ -407,8 +440,17 @@ def gateway(
     
     console.print(f"[green]✓[/green] Heartbeat: every 30m")
     
+    # Serve the bus to `nanobot worker` processes
+    bus_server = None
+    if config.bus.ipc_socket:
+        from nanobot.bus.ipc import BusServer
+        bus_server = BusServer(bus, Path(config.bus.ipc_socket))
+        console.print(f"[green]✓[/green] Bus socket: {config.bus.ipc_socket}")
+    
     async def run():
         try:
+            if bus_server:
+                await bus_server.start()
             await cron.start()
             await heartbeat.start()
             await asyncio.gather(
@@ -420,11 +462,142 @@ def gateway(
             heartbeat.stop()
             cron.stop()
             agent.stop()
+            if bus_server:
+                await bus_server.stop()
+            bus.stop()
             await channels.stop_all()
     
     asyncio.run(run())
 
 
+@app.command()
+def worker(
+    socket: str = typer.Option(None, "--socket", "-s", help="Gateway bus socket (default: bus.ipcSocket)"),
+    verbose: bool = typer.Option(False, "--verbose", "-v", help="Verbose output"),
+):
+    """Run an extra agent worker process attached to a gateway's bus."""
+    from nanobot.config.loader import load_config
+    from nanobot.bus.ipc import RemoteMessageBus
+    from nanobot.agent.loop import AgentLoop
+    from nanobot.session.manager import SessionManager
+    
+    if verbose:
+        import logging
+        logging.basicConfig(level=logging.DEBUG)
+    
+    config = load_config()
+    path = socket or config.bus.ipc_socket
+    if not path:
+        console.print("[red]Error: no bus socket. Set bus.ipcSocket in config or pass --socket.[/red]")
+        raise typer.Exit(1)
+    
+    async def run():
+        bus = RemoteMessageBus(Path(path))
+        try:
+            await bus.connect()
+        except OSError as e:
+            console.print(f"[red]Cannot connect to gateway bus at {path}: {e}[/red]")
+            raise typer.Exit(1)
+        
+        agent = AgentLoop(
+            bus=bus,
+            provider=_make_provider(config),
+            workspace=config.workspace_path,
+            model=config.agents.defaults.model,
+            max_iterations=config.agents.defaults.max_tool_iterations,
+            brave_api_key=config.tools.web.search.api_key or None,
+            exec_config=config.tools.exec,
+            restrict_to_workspace=config.tools.restrict_to_workspace,
+            session_manager=SessionManager(config.workspace_path),
+            cross_session_recall=config.agents.defaults.cross_session_recall,
+        )
+        console.print(f"{__logo__} Agent worker attached to {path}")
+        try:
+            await agent.run()
+        finally:
+            agent.stop()
+            bus.stop()
+    
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        console.print("\nWorker stopped.")
+
+
+@app.command("mobile-worker")
+def mobile_worker(
+    worker_id: int = typer.Option(..., "--id", help="Worker number (0 is the main server)"),
+    port: int = typer.Option(None, "--port", "-p", help="WebSocket port (default: channels.mobile.websocketPort)"),
+    bus_socket: str = typer.Option(..., "--bus", help="Gateway bus socket"),
+):
+    """Run an extra mobile websocket worker sharing the main server's port (started by start_server.py)."""
+    from nanobot.auth.jwt_manager import JWTManager
+    from nanobot.auth.revocation import open_revocation_store
+    from nanobot.bus.ipc import RemoteMessageBus
+    from nanobot.config.loader import load_config
+    from nanobot.gateway.cluster import default_cluster_dir, join_cluster
+    from nanobot.gateway.websocket import SecureWebSocketServer
+    from nanobot.pairing.manager import PairingManager
+    from nanobot.security.hardening import AuditLogger
+
+    config = load_config()
+    mobile = config.channels.mobile
+    if not config.auth.jwt_secret:
+        console.print("[red]Error: auth.jwtSecret must be set to run several websocket workers.[/red]")
+        raise typer.Exit(1)
+    port = port or mobile.websocket_port
+    protocol = "wss" if mobile.tls_enabled else "ws"
+
+    async def run():
+        bus = RemoteMessageBus(Path(bus_socket))
+        try:
+            await bus.connect()
+        except OSError as e:
+            console.print(f"[red]Cannot connect to gateway bus at {bus_socket}: {e}[/red]")
+            raise typer.Exit(1)
+
+        pairing = PairingManager.from_config(config, f"{protocol}://localhost:{port}")
+        # One writer per audit file: extra workers log next to the main server's file
+        audit_logger = None
+        if config.enterprise.audit_log_enabled:
+            audit_path = Path(config.enterprise.audit_log_path).expanduser()
+            audit_logger = AuditLogger(audit_path.with_name(f"{audit_path.stem}-w{worker_id}{audit_path.suffix}"))
+        server = SecureWebSocketServer.from_config(
+            mobile,
+            config.enterprise,
+            host="0.0.0.0",
+            port=port,
+            pairing_manager=pairing,
+            jwt_manager=JWTManager(
+                secret=config.auth.jwt_secret,
+                algorithm=config.auth.jwt_algorithm,
+                expiry_hours=config.auth.jwt_expiry_hours,
+                cache_size=config.auth.jwt_cache_size,
+                revocation_store=open_revocation_store(config.auth.revocation_store),
+            ),
+            message_bus=bus,
+            audit_logger=audit_logger,
+        )
+        cluster_dir = Path(mobile.cluster_dir).expanduser() if mobile.cluster_dir else default_cluster_dir()
+        join_cluster(server, cluster_dir, str(worker_id))
+
+        stopped = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopped.set)
+        await pairing.start()
+        await server.start()
+        try:
+            await stopped.wait()
+        finally:
+            await server.stop()
+            await pairing.stop()
+            bus.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
 # ============================================================================
 # Relay Server (deploy to Railway — thin forwarder, no LLM keys)
 # ============================================================================
@@ -541,6 +714,7 @@ def agent(
     
     config = load_config()
     
+    # A private in-memory bus: the durable log and bus socket belong to the gateway
     bus = MessageBus()
     provider = _make_provider(config)
 
@@ -901,6 +1075,52 @@ def cron_run(
         console.print(f"[red]Failed to run job {job_id}[/red]")
 
 
+# ============================================================================
+# Memory Commands
+# ============================================================================
+
+memory_app = typer.Typer(help="Manage agent memory")
+app.add_typer(memory_app, name="memory")
+
+
+@memory_app.command("consolidate")
+def memory_consolidate(
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report savings without changing files"),
+    no_llm: bool = typer.Option(False, "--no-llm", help="Only deduplicate, don't call the model"),
+):
+    """Merge old daily notes into MEMORY.md and archive them."""
+    from nanobot.config.loader import load_config
+    from nanobot.agent.consolidation import MemoryConsolidator
+    from nanobot.agent.memory import MemoryStore
+    
+    config = load_config()
+    consolidation = config.agents.consolidation
+    consolidator = MemoryConsolidator(
+        MemoryStore(config.workspace_path),
+        provider=None if no_llm else _make_provider(config),
+        model=consolidation.model or None,
+        keep_days=consolidation.keep_days,
+        max_bytes=consolidation.max_bytes,
+    )
+    
+    report = asyncio.run(consolidator.consolidate(dry_run=dry_run))
+    
+    table = Table(title="Memory Consolidation" + (" (dry run)" if dry_run else ""))
+    table.add_column("", style="cyan")
+    table.add_column("Before", justify="right")
+    table.add_column("After", justify="right")
+    table.add_column("Saved", justify="right", style="green")
+    table.add_row("Bytes", str(report.bytes_before), str(report.bytes_after), str(report.bytes_saved))
+    table.add_row("Tokens (est.)", str(report.tokens_before), str(report.tokens_after), str(report.tokens_saved))
+    console.print(table)
+    console.print(f"Daily notes merged: {len(report.merged_files)}")
+    
+    if dry_run:
+        console.print(Panel(report.content or "(empty)", title="New MEMORY.md", border_style="dim"))
+    else:
+        console.print(f"[green]✓[/green] Originals archived to {consolidator.archive_dir}")
+
+
 # ============================================================================
 # Pairing Commands (Enterprise Mobile App)
 # ============================================================================
@@ -932,11 +1152,8 @@ def pairing_generate_qr(
         protocol = "wss" if config.channels.mobile.tls_enabled else "ws"
         websocket_url = f"{protocol}://localhost:{ws_host}"
 
-    # Create pairing manager
-    pairing_manager = PairingManager(
-        websocket_url=websocket_url,
-        session_expiry_minutes=config.auth.pairing_session_expiry_minutes,
-    )
+    # Create pairing manager (sessions reach the server only through a shared auth.pairingStore)
+    pairing_manager = PairingManager.from_config(config, websocket_url)
 
     # Generate pairing session
     session_id, qr_bytes = pairing_manager.create_pairing_session()
@@ -980,10 +1197,7 @@ def pairing_list():
     protocol = "wss" if config.channels.mobile.tls_enabled else "ws"
     websocket_url = f"{protocol}://localhost:{ws_host}"
 
-    pairing_manager = PairingManager(
-        websocket_url=websocket_url,
-        session_expiry_minutes=config.auth.pairing_session_expiry_minutes,
-    )
+    pairing_manager = PairingManager.from_config(config, websocket_url)
 
     count = pairing_manager.get_active_session_count()
     console.print(f"Active pairing sessions: {count}")
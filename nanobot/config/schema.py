@@ -1,6 +1,8 @@
 """Configuration schema using Pydantic."""
 
 from pathlib import Path
+from typing import Literal
+
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
 
@@ -54,8 +56,24 @@ class MobileAppConfig(BaseModel):
     tls_enabled: bool = True
     tls_cert_path: str | None = None
     tls_key_path: str | None = None
-    max_connections: int = 100
+    max_connections: int = 100  # 0 = unlimited
+    max_connections_per_ip: int = 0  # 0 = unlimited; behind the relay or a reverse proxy every client shares the proxy's IP
+    max_unauthenticated: int = 50  # Connections allowed to be waiting for auth at once
+    auth_timeout: float = 10.0  # Seconds a new connection has to authenticate
+    retry_after: int = 5  # Seconds rejected clients are told to wait
     heartbeat_interval: int = 30  # seconds
+    send_queue_size: int = 256  # Frames buffered per client before it counts as a slow consumer
+    slow_consumer_policy: Literal["drop", "disconnect"] = "disconnect"
+    send_timeout: float = 10.0  # seconds
+    encodings: list[Literal["msgpack", "cbor", "json"]] = Field(default_factory=lambda: ["msgpack", "cbor", "json"])  # Offered in this order
+    compression: bool = True  # permessage-deflate
+    compression_window_bits: int = 12  # 9-15; smaller uses less memory per connection
+    compression_mem_level: int = 5  # zlib memLevel 1-9
+    max_message_size: int = 10_000_000  # Largest frame accepted from a client, in bytes
+    outbox_size: int = 200  # Unacknowledged messages kept per device for replay on reconnect (0 = off)
+    outbox_ttl: float = 86400.0  # Seconds an unacknowledged message is kept
+    workers: int = 1  # Websocket processes sharing the port via SO_REUSEPORT (start_server.py)
+    cluster_dir: str = ""  # Device registry and worker sockets (default: ~/.nanobot/gateway)
 
 
 class AuthConfig(BaseModel):
@@ -63,7 +81,11 @@ class AuthConfig(BaseModel):
     jwt_secret: str = ""  # Must be set for production
     jwt_algorithm: str = "HS256"
     jwt_expiry_hours: int = 24 * 30  # 30 days
+    jwt_cache_size: int = 4096  # Verified tokens cached until they expire (0 = verify every time)
+    revocation_store: str = "~/.nanobot/revoked_devices.db"  # Revoked devices, shared by every gateway/relay process ("" = in memory)
     pairing_session_expiry_minutes: int = 5
+    pairing_store: str = ""  # SQLite file shared by relay/gateway processes ("" = in memory; gateway workers use the cluster dir)
+    admin_token: str = ""  # Bearer token for admin API calls such as device revocation ("" = admin calls disabled)
     oauth_enabled: bool = False
     oauth_providers: dict[str, dict[str, str]] = Field(default_factory=dict)
 
@@ -72,9 +94,11 @@ class EnterpriseConfig(BaseModel):
     """Enterprise features configuration."""
     organization_name: str = ""
     rate_limit_enabled: bool = True
-    rate_limit_requests_per_minute: int = 60
+    rate_limit_requests_per_minute: int = 60  # Chat messages per device, per worker process (0 = off)
+    rate_limit_burst: int = 10  # Messages a device may send back to back
+    rate_limit_ip_requests_per_minute: int = 300  # Chat messages per client IP, across devices and workers (0 = off)
     audit_log_enabled: bool = True
-    audit_log_path: str = "~/.nanobot/logs/audit.log"
+    audit_log_path: str = "~/.nanobot/logs/audit.log"  # Extra websocket workers write audit-w<N>.log beside it
     ip_whitelist_enabled: bool = False
     ip_whitelist: list[str] = Field(default_factory=list)
 
@@ -107,11 +131,22 @@ class AgentDefaults(BaseModel):
     max_tokens: int = 8192
     temperature: float = 0.7
     max_tool_iterations: int = 20
+    cross_session_recall: bool = False  # Semantic recall may surface other sessions' turns (other users' conversations)
+
+
+class MemoryConsolidationConfig(BaseModel):
+    """Scheduled merge of old daily notes into MEMORY.md."""
+    enabled: bool = False  # Opt in: rewrites MEMORY.md with the LLM and archives daily notes
+    schedule: str = "0 3 * * *"  # Cron expression (daily at 03:00)
+    model: str = ""  # Cheap model for merging; empty = agent default model
+    keep_days: int = 7  # Daily notes newer than this stay untouched
+    max_bytes: int = 16_000  # Size cap for the consolidated MEMORY.md
 
 
 class AgentsConfig(BaseModel):
     """Agent configuration."""
     defaults: AgentDefaults = Field(default_factory=AgentDefaults)
+    consolidation: MemoryConsolidationConfig = Field(default_factory=MemoryConsolidationConfig)
 
 
 class ProviderConfig(BaseModel):
@@ -165,6 +200,30 @@ class ToolsConfig(BaseModel):
     restrict_to_workspace: bool = False  # If true, restrict all tool access to workspace directory
 
 
+class BusConfig(BaseModel):
+    """Message bus queue limits and overflow handling."""
+    interactive_maxsize: int = 1000  # Chat traffic lane (0 = unbounded)
+    system_maxsize: int = 200  # Subagent/system lane
+    scheduled_maxsize: int = 100  # Cron/heartbeat lane
+    outbound_maxsize: int = 1000
+    overflow_policy: Literal["block", "drop_oldest", "reject"] = "block"
+    channel_policies: dict[str, Literal["block", "drop_oldest", "reject"]] = Field(default_factory=dict)  # e.g. {"mobile": "reject"}
+    channel_queue_maxsize: int = 100  # Per-channel outbound delivery queue
+    send_timeout: float = 10.0  # Seconds allowed for one channel send
+    send_retries: int = 3  # Retries before a message is dead-lettered
+    retry_backoff: float = 0.5  # Initial retry delay in seconds (doubles each retry)
+    durable: bool = False  # Write inbound messages to a log and replay unprocessed ones at startup
+    wal_dir: str = ""  # Log directory (default: ~/.nanobot/bus)
+    wal_segment_bytes: int = 16 * 1024 * 1024  # Rotate log segments at this size
+    wal_fsync_interval_ms: float = 5.0  # Group-commit window for fsync
+    wal_commit_interval_ms: float = 50.0  # Batch window for persisting processed offsets (a crash may replay this window)
+    dedup_window_s: float = 600.0  # Answer redelivered message ids from cache for this long (0 = off)
+    dedup_max_entries: int = 10000
+    fair_share_key: Literal["sender", "session"] = "sender"  # Unit that gets an equal share of agent time
+    fair_share_weights: dict[str, float] = Field(default_factory=dict)  # By "channel:sender", sender or channel
+    ipc_socket: str = ""  # Unix socket the gateway serves its bus on, for `nanobot worker` processes
+
+
 class RelayConfig(BaseModel):
     """Relay/bridge configuration for split deployment.
 
@@ -182,6 +241,7 @@ class Config(BaseSettings):
     providers: ProvidersConfig = Field(default_factory=ProvidersConfig)
     gateway: GatewayConfig = Field(default_factory=GatewayConfig)
     tools: ToolsConfig = Field(default_factory=ToolsConfig)
+    bus: BusConfig = Field(default_factory=BusConfig)
 
     # Enterprise features
     auth: AuthConfig = Field(default_factory=AuthConfig)
@@ -0,0 +1,99 @@
+"""Connection admission control for the websocket gateway."""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Any
+
+# Close code for connections turned away under load (1013 = try again later)
+CLOSE_TRY_AGAIN_LATER = 1013
+
+# Close code for sockets that did not authenticate in time (1008 = policy violation)
+CLOSE_AUTH_TIMEOUT = 1008
+
+
+class AdmissionController:
+    """
+    Decides whether a new websocket may stay open.
+
+    Three limits are enforced when a connection arrives: total open
+    connections, open connections per client IP, and connections that have
+    not authenticated yet. The last one keeps a reconnect storm from filling
+    the server with idle handshakes; the server additionally closes any
+    socket that has not authenticated within its auth deadline.
+
+    A limit of 0 disables that check.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_per_ip: int = 0,
+        max_unauthenticated: int = 50,
+        retry_after: int = 5,
+    ):
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self.max_unauthenticated = max_unauthenticated
+        self.retry_after = retry_after
+
+        self._per_ip: Counter[str] = Counter()
+        self.open = 0
+        self.unauthenticated = 0
+
+        self.accepted = 0
+        self.rejected: Counter[str] = Counter()  # reason -> count
+        self.auth_timeouts = 0
+
+    def admit(self, client_ip: str) -> str | None:
+        """
+        Try to admit a connection from client_ip.
+
+        Returns:
+            None if admitted (the caller must later call release()),
+            otherwise the reason it was rejected.
+        """
+        reason = None
+        if self.max_connections and self.open >= self.max_connections:
+            reason = "server_full"
+        elif self.max_per_ip and self._per_ip[client_ip] >= self.max_per_ip:
+            reason = "ip_limit"
+        elif self.max_unauthenticated and self.unauthenticated >= self.max_unauthenticated:
+            reason = "unauthenticated_limit"
+
+        if reason:
+            self.rejected[reason] += 1
+            return reason
+
+        self.open += 1
+        self.unauthenticated += 1
+        self._per_ip[client_ip] += 1
+        self.accepted += 1
+        return None
+
+    def authenticated(self) -> None:
+        """An admitted connection completed authentication."""
+        self.unauthenticated -= 1
+
+    def release(self, client_ip: str, authenticated: bool) -> None:
+        """An admitted connection closed."""
+        self.open -= 1
+        if not authenticated:
+            self.unauthenticated -= 1
+        self._per_ip[client_ip] -= 1
+        if self._per_ip[client_ip] <= 0:
+            del self._per_ip[client_ip]
+
+    def close_reason(self, reason: str) -> str:
+        """Close-frame reason telling the client when to retry."""
+        return f"{reason}; retry after {self.retry_after}s"
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "open": self.open,
+            "unauthenticated": self.unauthenticated,
+            "ips": len(self._per_ip),
+            "accepted": self.accepted,
+            "rejected": dict(self.rejected),
+            "auth_timeouts": self.auth_timeouts,
+        }
@@ -0,0 +1,293 @@
+"""Shared device registry and cross-worker delivery for a multi-process gateway."""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from nanobot.bus.ipc import encode_frame, read_frame
+
+if TYPE_CHECKING:
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+# Frame kinds on a worker's peer socket (same framing as the bus IPC)
+DELIVER = 1  # {"device_id", "message"} -> REPLY {"ok"}
+TAKEOVER = 2  # {"device_id"} -> REPLY {"outbox"}; the sender now owns the device
+REPLY = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    socket TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    started_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS devices (
+    device_id TEXT PRIMARY KEY,
+    worker_id TEXT NOT NULL,
+    device_name TEXT NOT NULL,
+    online INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def default_cluster_dir() -> Path:
+    return Path.home() / ".nanobot" / "gateway"
+
+
+class DeviceRegistry:
+    """
+    Which gateway worker holds each device, shared through SQLite.
+
+    A device row keeps pointing at its last worker after it disconnects
+    (online = 0): that worker still holds the device's outbox, so messages
+    for an offline device are routed there and the outbox moves with the
+    device when it reconnects elsewhere. The database runs in WAL mode so
+    workers can read while another writes; every statement is a short
+    single-row operation.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def reset(self) -> None:
+        """Forget every worker and device (the primary does this before starting workers)."""
+        with self._lock:
+            self._db.execute("DELETE FROM workers")
+            self._db.execute("DELETE FROM devices")
+
+    def add_worker(self, worker_id: str, socket: Path) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO workers VALUES (?, ?, ?, ?)",
+                (worker_id, str(socket), os.getpid(), time.time()),
+            )
+            self._db.execute("UPDATE devices SET online = 0 WHERE worker_id = ?", (worker_id,))
+
+    def remove_worker(self, worker_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM workers WHERE worker_id = ?", (worker_id,))
+            self._db.execute("UPDATE devices SET online = 0 WHERE worker_id = ?", (worker_id,))
+
+    def claim(self, device_id: str, worker_id: str, device_name: str) -> tuple[str, str] | None:
+        """
+        Record that a device is now connected to worker_id.
+
+        Returns:
+            (worker_id, socket) of the worker that held it before, if it was another one.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT d.worker_id, w.socket FROM devices d LEFT JOIN workers w USING (worker_id) "
+                    "WHERE d.device_id = ?",
+                    (device_id,),
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO devices VALUES (?, ?, ?, 1, ?)",
+                    (device_id, worker_id, device_name, time.time()),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        if row and row[0] != worker_id and row[1]:
+            return row[0], row[1]
+        return None
+
+    def release(self, device_id: str, worker_id: str) -> None:
+        """Mark a device offline, unless it has already moved to another worker."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE devices SET online = 0, updated_at = ? WHERE device_id = ? AND worker_id = ?",
+                (time.time(), device_id, worker_id),
+            )
+
+    def lookup(self, device_id: str) -> tuple[str, bool, str | None] | None:
+        """(worker_id, online, worker socket) for a device, or None if never seen."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT d.worker_id, d.online, w.socket FROM devices d LEFT JOIN workers w USING (worker_id) "
+                "WHERE d.device_id = ?",
+                (device_id,),
+            ).fetchone()
+        return (row[0], bool(row[1]), row[2]) if row else None
+
+    def online_count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM devices WHERE online = 1").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class _Peer:
+    """Request/response connection to another worker; one request at a time."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.lock = asyncio.Lock()
+
+
+class ClusterNode:
+    """
+    One gateway worker's membership in a multi-process gateway.
+
+    Every worker binds the same websocket port with SO_REUSEPORT, so the
+    kernel spreads phones across them. Each worker also listens on its own
+    Unix socket: send_to_device for a device held by another worker is
+    forwarded there, and a worker that a device reconnects to takes the
+    device's outbox over from the worker that held it before.
+    """
+
+    def __init__(
+        self,
+        server: SecureWebSocketServer,
+        registry: DeviceRegistry,
+        worker_id: str,
+        socket_path: Path,
+        request_timeout: float = 5.0,
+    ):
+        self.server = server
+        self.registry = registry
+        self.worker_id = worker_id
+        self.socket_path = Path(socket_path)
+        self.request_timeout = request_timeout
+        self._server: asyncio.AbstractServer | None = None
+        self._peers: dict[str, _Peer] = {}
+
+        self.forwarded = 0
+        self.received = 0
+        self.takeovers = 0
+
+    async def start(self) -> None:
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        self.socket_path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path))
+        os.chmod(self.socket_path, 0o600)
+        await asyncio.to_thread(self.registry.add_worker, self.worker_id, self.socket_path)
+        logger.info(f"Gateway worker {self.worker_id} listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        await asyncio.to_thread(self.registry.remove_worker, self.worker_id)
+        for peer in self._peers.values():
+            peer.writer.close()
+        self._peers.clear()
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.socket_path.unlink(missing_ok=True)
+
+    async def claim(self, device_id: str, device_name: str) -> None:
+        """Register a device that authenticated here, taking its outbox from its previous worker."""
+        previous = await asyncio.to_thread(self.registry.claim, device_id, self.worker_id, device_name)
+        if not previous or self.server.outbox is None:
+            return
+        reply = await self._request(*previous, TAKEOVER, {"device_id": device_id})
+        if reply and reply.get("outbox"):
+            self.server.outbox.adopt(device_id, reply["outbox"])
+            self.takeovers += 1
+
+    async def release(self, device_id: str) -> None:
+        await asyncio.to_thread(self.registry.release, device_id, self.worker_id)
+
+    async def deliver(self, device_id: str, message: str) -> bool | None:
+        """
+        Forward a message to the worker holding device_id.
+
+        Returns:
+            The owner's send_to_device result, or None if the device is
+            not held by another reachable worker (deliver locally instead).
+        """
+        entry = await asyncio.to_thread(self.registry.lookup, device_id)
+        if not entry:
+            return None
+        worker_id, _, socket = entry
+        if worker_id == self.worker_id or not socket:
+            return None
+        reply = await self._request(worker_id, socket, DELIVER, {"device_id": device_id, "message": message})
+        if reply is None:
+            return None
+        self.forwarded += 1
+        return bool(reply.get("ok"))
+
+    async def _request(self, worker_id: str, socket: str, kind: int, payload: dict[str, Any]) -> dict[str, Any] | None:
+        peer = self._peers.get(worker_id)
+        try:
+            if peer is None:
+                reader, writer = await asyncio.open_unix_connection(socket)
+                peer = self._peers[worker_id] = _Peer(reader, writer)
+            async with peer.lock, asyncio.timeout(self.request_timeout):
+                peer.writer.write(encode_frame(kind, payload))
+                await peer.writer.drain()
+                _, reply = await read_frame(peer.reader)
+                return reply
+        except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+            logger.warning(f"Gateway worker {worker_id} unreachable: {e}")
+            dropped = self._peers.pop(worker_id, None)
+            if dropped:
+                dropped.writer.close()
+            return None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                kind, data = await read_frame(reader)
+                if kind == DELIVER:
+                    self.received += 1
+                    ok = await self.server._send_local(data["device_id"], data["message"])
+                    reply: dict[str, Any] = {"ok": ok}
+                elif kind == TAKEOVER:
+                    box = self.server.outbox.pop(data["device_id"]) if self.server.outbox is not None else None
+                    reply = {"outbox": box.to_dict() if box else None}
+                else:
+                    reply = {"error": f"unknown frame kind {kind}"}
+                writer.write(encode_frame(REPLY, reply))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception as e:
+            logger.error(f"Gateway peer connection error: {e}")
+        finally:
+            writer.close()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "worker_id": self.worker_id,
+            "forwarded": self.forwarded,
+            "received": self.received,
+            "takeovers": self.takeovers,
+        }
+
+
+def join_cluster(server: SecureWebSocketServer, directory: Path, worker_id: str) -> ClusterNode:
+    """Put a websocket server into multi-worker mode (SO_REUSEPORT + shared registry)."""
+    directory = Path(directory).expanduser()
+    node = ClusterNode(
+        server,
+        DeviceRegistry(directory / "devices.db"),
+        worker_id,
+        directory / f"worker-{worker_id}.sock",
+    )
+    server.cluster = node
+    server.reuse_port = True
+    return node
@@ -0,0 +1,108 @@
+"""Wire encodings for mobile protocol frames."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Sequence
+
+# Clients pick an encoding by offering "nanobot.<name>" websocket subprotocols
+SUBPROTOCOL_PREFIX = "nanobot."
+
+# Server preference when a client offers several
+DEFAULT_ENCODINGS = ["msgpack", "cbor", "json"]
+
+
+class FrameCodec:
+    """Encodes protocol frames (dicts) to websocket payloads and back."""
+
+    name = "json"
+    binary = False
+
+    def encode(self, data: dict[str, Any]) -> str | bytes:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+    def decode(self, frame: str | bytes) -> Any:
+        return json.loads(frame)
+
+    @property
+    def subprotocol(self) -> str:
+        return SUBPROTOCOL_PREFIX + self.name
+
+
+class MsgPackCodec(FrameCodec):
+    name = "msgpack"
+    binary = True
+
+    def __init__(self):
+        import msgpack
+
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        return self._packb(data, use_bin_type=True)
+
+    def decode(self, frame: str | bytes) -> Any:
+        if isinstance(frame, str):
+            return json.loads(frame)  # Text frames are always JSON
+        return self._unpackb(frame, raw=False)
+
+
+class CBORCodec(FrameCodec):
+    name = "cbor"
+    binary = True
+
+    def __init__(self):
+        import cbor2
+
+        self._dumps = cbor2.dumps
+        self._loads = cbor2.loads
+
+    def encode(self, data: dict[str, Any]) -> bytes:
+        return self._dumps(data)
+
+    def decode(self, frame: str | bytes) -> Any:
+        if isinstance(frame, str):
+            return json.loads(frame)
+        return self._loads(frame)
+
+
+JSON_CODEC = FrameCodec()
+
+_CODEC_TYPES: dict[str, type[FrameCodec]] = {
+    "json": FrameCodec,
+    "msgpack": MsgPackCodec,
+    "cbor": CBORCodec,
+}
+
+
+def load_codecs(names: Sequence[str] = DEFAULT_ENCODINGS) -> dict[str, FrameCodec]:
+    """
+    Instantiate the named codecs, skipping binary ones whose library is missing.
+
+    JSON is always included, since it is what clients that negotiate
+    nothing get.
+    """
+    codecs: dict[str, FrameCodec] = {}
+    for name in names:
+        codec_type = _CODEC_TYPES.get(name)
+        if codec_type is None:
+            raise ValueError(f"Unknown frame encoding: {name}")
+        if codec_type is FrameCodec:
+            codecs[name] = JSON_CODEC
+            continue
+        try:
+            codecs[name] = codec_type()
+        except ImportError:
+            continue
+    codecs.setdefault("json", JSON_CODEC)
+    return codecs
+
+
+def select_codec(codecs: dict[str, FrameCodec], offered: Sequence[str]) -> FrameCodec | None:
+    """First codec in server preference order that the client offered, if any."""
+    offered = set(offered)
+    for codec in codecs.values():
+        if codec.subprotocol in offered:
+            return codec
+    return None
@@ -0,0 +1,161 @@
+"""Per-connection outbound queues for the websocket gateway."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+import websockets
+from loguru import logger
+
+from nanobot.gateway.codec import JSON_CODEC, FrameCodec
+
+if TYPE_CHECKING:
+    from websockets.server import WebSocketServerProtocol
+
+# What to do when a client's send queue is full
+SlowConsumerPolicy = Literal["drop", "disconnect"]
+
+# Close code sent to clients that cannot keep up (1013 = try again later)
+CLOSE_SLOW_CONSUMER = 1013
+
+
+class ConnectionWriter:
+    """
+    Bounded outbound queue for one websocket, drained by its own task.
+
+    Callers enqueue already-encoded frames and return immediately, so a slow
+    phone only backs up its own queue. When the queue is full the frame is
+    dropped ("drop") or the connection is closed ("disconnect"); a send that
+    takes longer than send_timeout always closes the connection.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocketServerProtocol,
+        maxsize: int = 256,
+        policy: SlowConsumerPolicy = "disconnect",
+        send_timeout: float = 10.0,
+    ):
+        self.websocket = websocket
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.queue: asyncio.Queue[str | bytes] = asyncio.Queue(maxsize=maxsize)
+        self._task: asyncio.Task | None = None
+        self._closing = False
+
+        self.sent = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        """Start the writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the writer task; queued frames are discarded."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def enqueue(self, frame: str | bytes) -> bool:
+        """
+        Queue an encoded frame without waiting.
+
+        Returns:
+            False if the frame was not queued (queue full or connection closing).
+        """
+        if self._closing:
+            return False
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            if self.policy == "disconnect":
+                self._close_slow("send queue full")
+            return False
+
+    def _close_slow(self, reason: str) -> None:
+        if self._closing:
+            return
+        self._closing = True
+        logger.warning(f"Disconnecting slow websocket client: {reason}")
+        asyncio.create_task(self.websocket.close(CLOSE_SLOW_CONSUMER, "Slow consumer"))
+
+    async def _run(self) -> None:
+        while True:
+            frame = await self.queue.get()
+            try:
+                # asyncio.timeout rather than wait_for: wait_for can swallow a
+                # cancel that lands as the send completes, and stop() would hang
+                async with asyncio.timeout(self.send_timeout):
+                    await self.websocket.send(frame)
+                self.sent += 1
+            except asyncio.TimeoutError:
+                self.dropped += 1
+                self._close_slow(f"send took over {self.send_timeout}s")
+                return
+            except websockets.exceptions.ConnectionClosed:
+                return
+            except Exception as e:
+                self.dropped += 1
+                logger.error(f"Failed to send message: {e}")
+
+    @property
+    def depth(self) -> int:
+        """Frames waiting to be sent."""
+        return self.queue.qsize()
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "queue_max": self.queue.maxsize,
+            "sent": self.sent,
+            "dropped": self.dropped,
+        }
+
+
+@dataclass
+class ConnectionState:
+    """
+    Everything the gateway tracks for one websocket.
+
+    Held in the server's connection index (websocket -> state), which
+    together with authenticated_clients (device_id -> client) gives
+    constant-time lookups in both directions.
+    """
+
+    websocket: WebSocketServerProtocol
+    client_ip: str
+    writer: ConnectionWriter
+    codec: FrameCodec = JSON_CODEC  # Negotiated via websocket subprotocol
+    connected_at: float = field(default_factory=time.time)
+    device_id: str | None = None
+    device_name: str | None = None
+    authenticated_at: float | None = None
+    frames_in: int = 0
+    messages_in: int = 0
+    admitted: bool = False  # Counted by the server's AdmissionController
+    auth_deadline: asyncio.TimerHandle | None = None
+
+    @property
+    def authenticated(self) -> bool:
+        return self.device_id is not None
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "client_ip": self.client_ip,
+            "device_id": self.device_id,
+            "encoding": self.codec.name,
+            "connected_at": self.connected_at,
+            "frames_in": self.frames_in,
+            "messages_in": self.messages_in,
+            **self.writer.get_stats(),
+        }
@@ -0,0 +1,140 @@
+"""Per-device outbox for messages that must survive a reconnect."""
+
+from __future__ import annotations
+
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any
+
+
+@dataclass
+class OutboxEntry:
+    seq: int
+    data: dict[str, Any]
+    queued_at: float
+    sent: bool = False  # Handed to a live connection at least once
+
+
+class DeviceOutbox:
+    """
+    Bounded log of messages for one device, numbered by a monotonically
+    increasing seq.
+
+    Entries stay until the device acknowledges them (acks are cumulative)
+    or they are pushed out by newer ones / expire after ttl_s.
+    """
+
+    def __init__(self, max_messages: int = 200, ttl_s: float = 86400.0):
+        self.max_messages = max_messages
+        self.ttl_s = ttl_s
+        self.last_seq = 0
+        self.acked_seq = 0
+        self.dropped = 0
+        self._entries: deque[OutboxEntry] = deque()
+
+    def append(self, data: dict[str, Any]) -> OutboxEntry:
+        """Number a message and keep it until acknowledged."""
+        self.last_seq += 1
+        entry = OutboxEntry(seq=self.last_seq, data={**data, "seq": self.last_seq}, queued_at=time.time())
+        self._entries.append(entry)
+        while len(self._entries) > self.max_messages:
+            self._entries.popleft()
+            self.dropped += 1
+        return entry
+
+    def ack(self, seq: int) -> int:
+        """Drop everything up to and including seq. Returns the number removed."""
+        seq = min(seq, self.last_seq)
+        self.acked_seq = max(self.acked_seq, seq)
+        removed = 0
+        while self._entries and self._entries[0].seq <= seq:
+            self._entries.popleft()
+            removed += 1
+        return removed
+
+    def pending(self, after_seq: int | None = None) -> list[OutboxEntry]:
+        """
+        Entries to replay on reconnect.
+
+        Args:
+            after_seq: Last seq the device has seen. None (a client that does
+                not track seqs) replays only messages never handed to a connection.
+        """
+        self._expire()
+        if after_seq is None:
+            return [e for e in self._entries if not e.sent]
+        self.ack(after_seq)
+        return list(self._entries)
+
+    def _expire(self) -> None:
+        cutoff = time.time() - self.ttl_s
+        while self._entries and self._entries[0].queued_at < cutoff:
+            self._entries.popleft()
+            self.dropped += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialise for handing the outbox to another gateway worker."""
+        return {
+            "last_seq": self.last_seq,
+            "acked_seq": self.acked_seq,
+            "dropped": self.dropped,
+            "entries": [
+                {"seq": e.seq, "data": e.data, "queued_at": e.queued_at, "sent": e.sent}
+                for e in self._entries
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], max_messages: int = 200, ttl_s: float = 86400.0) -> DeviceOutbox:
+        box = cls(max_messages, ttl_s)
+        box.last_seq = data.get("last_seq", 0)
+        box.acked_seq = data.get("acked_seq", 0)
+        box.dropped = data.get("dropped", 0)
+        box._entries.extend(OutboxEntry(**e) for e in data.get("entries", [])[-max_messages:])
+        return box
+
+    def get_stats(self) -> dict[str, Any]:
+        return {
+            "outbox_depth": len(self._entries),
+            "last_seq": self.last_seq,
+            "acked_seq": self.acked_seq,
+            "outbox_dropped": self.dropped,
+        }
+
+
+class OutboxStore:
+    """Outboxes by device_id, keeping at most max_devices (least recently used go first)."""
+
+    def __init__(self, max_messages: int = 200, ttl_s: float = 86400.0, max_devices: int = 10_000):
+        self.max_messages = max_messages
+        self.ttl_s = ttl_s
+        self.max_devices = max_devices
+        self._boxes: OrderedDict[str, DeviceOutbox] = OrderedDict()
+
+    def get(self, device_id: str) -> DeviceOutbox:
+        box = self._boxes.get(device_id)
+        if box is None:
+            box = self._boxes[device_id] = DeviceOutbox(self.max_messages, self.ttl_s)
+            while len(self._boxes) > self.max_devices:
+                self._boxes.popitem(last=False)
+        else:
+            self._boxes.move_to_end(device_id)
+        return box
+
+    def peek(self, device_id: str) -> DeviceOutbox | None:
+        return self._boxes.get(device_id)
+
+    def pop(self, device_id: str) -> DeviceOutbox | None:
+        return self._boxes.pop(device_id, None)
+
+    def adopt(self, device_id: str, data: dict[str, Any]) -> DeviceOutbox:
+        """Install an outbox handed over by another worker (see DeviceOutbox.to_dict)."""
+        box = DeviceOutbox.from_dict(data, self.max_messages, self.ttl_s)
+        self._boxes[device_id] = box
+        while len(self._boxes) > self.max_devices:
+            self._boxes.popitem(last=False)
+        return box
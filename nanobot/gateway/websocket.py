@@ -7,15 +7,30 @@ import json
 import ssl
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Awaitable, TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Sequence
 
 import websockets
 from loguru import logger
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
 from websockets.server import WebSocketServerProtocol
 
+from nanobot.gateway.admission import CLOSE_AUTH_TIMEOUT, CLOSE_TRY_AGAIN_LATER, AdmissionController
+from nanobot.gateway.codec import (
+    DEFAULT_ENCODINGS,
+    JSON_CODEC,
+    FrameCodec,
+    load_codecs,
+    select_codec,
+)
+from nanobot.gateway.connection import ConnectionState, ConnectionWriter, SlowConsumerPolicy
+from nanobot.gateway.outbox import DeviceOutbox, OutboxStore
+from nanobot.security.hardening import AuditLogger, RateLimiter
+
 if TYPE_CHECKING:
     from nanobot.auth.jwt_manager import JWTManager
     from nanobot.bus.queue import MessageBus
+    from nanobot.config.schema import EnterpriseConfig, MobileAppConfig
+    from nanobot.gateway.cluster import ClusterNode
     from nanobot.pairing.manager import PairingManager
 
 
@@ -27,14 +42,18 @@ class AuthenticatedClient:
     device_name: str
     websocket: WebSocketServerProtocol
     authenticated_at: float
+    writer: ConnectionWriter | None = None
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary."""
-        return {
+        info = {
             "device_id": self.device_id,
             "device_name": self.device_name,
             "authenticated_at": self.authenticated_at,
         }
+        if self.writer:
+            info.update(self.writer.get_stats())
+        return info
 
 
 class SecureWebSocketServer:
@@ -48,13 +67,39 @@ class SecureWebSocketServer:
     Message Format:
     - Client -> Server (auth):
         {"type": "pair", "session_id": "...", "temp_token": "...", "device_info": {...}}
-        {"type": "auth", "jwt_token": "..."}
+        {"type": "auth", "jwt_token": "...", "last_seq": 41}
     - Client -> Server (message):
         {"type": "message", "content": "..."}
+        {"type": "ack", "seq": 42}
     - Server -> Client:
-        {"type": "auth_success", "jwt_token": "...", "device_id": "..."}
+        {"type": "auth_success", "jwt_token": "...", "device_id": "...", "last_seq": 42}
         {"type": "error", "message": "..."}
-        {"type": "message", "content": "..."}
+        {"type": "message", "content": "...", "seq": 42}
+
+    Messages sent to a device are kept in its outbox, numbered by seq,
+    until the device acks them (acks are cumulative). A device that was
+    offline passes the last seq it saw when it re-authenticates and gets
+    only the messages after it; clients that never send last_seq get
+    the messages that could not be delivered while they were away.
+
+    Frames are JSON text by default. A client may instead negotiate a
+    binary encoding by offering websocket subprotocols such as
+    "nanobot.msgpack" or "nanobot.cbor"; the server then sends every frame
+    in that encoding and accepts either binary frames in it or JSON text.
+    permessage-deflate is negotiated with a reduced window and memLevel to
+    keep per-connection memory small.
+
+    Every connection has its own bounded send queue and writer task, so a
+    slow client cannot stall sends to anyone else.
+
+    Several server processes can share one port (see gateway.cluster):
+    each binds with SO_REUSEPORT, and send_to_device reaches devices
+    connected to any of them through a shared device registry.
+
+    New connections pass admission control first (total, per-IP and
+    unauthenticated limits); rejected ones are closed with 1013 and a
+    retry-after hint, and sockets that do not authenticate within
+    auth_timeout are closed with 1008.
     """
 
     def __init__(
@@ -69,7 +114,25 @@ class SecureWebSocketServer:
         tls_key_path: Path | None = None,
         max_connections: int = 100,
         heartbeat_interval: int = 30,
-        on_client_message: Callable[[str, str, str, str], Awaitable[None]] | None = None,
+        on_client_message: Callable[[str, str, str, str, str | None], Awaitable[None]] | None = None,
+        send_queue_size: int = 256,
+        slow_consumer_policy: SlowConsumerPolicy = "disconnect",
+        send_timeout: float = 10.0,
+        max_connections_per_ip: int = 0,
+        max_unauthenticated: int = 50,
+        auth_timeout: float = 10.0,
+        retry_after: int = 5,
+        encodings: Sequence[str] = DEFAULT_ENCODINGS,
+        compression: bool = True,
+        compression_window_bits: int = 12,
+        compression_mem_level: int = 5,
+        max_message_size: int = 10_000_000,
+        outbox_size: int = 200,
+        outbox_ttl: float = 86400.0,
+        reuse_port: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        ip_rate_limiter: RateLimiter | None = None,
+        audit_logger: AuditLogger | None = None,
     ):
         """
         Initialize WebSocket server.
@@ -83,11 +146,31 @@ class SecureWebSocketServer:
             tls_enabled: Enable TLS/SSL
             tls_cert_path: Path to TLS certificate
             tls_key_path: Path to TLS private key
-            max_connections: Maximum concurrent connections
+            max_connections: Maximum concurrent connections (0 = unlimited)
             heartbeat_interval: Heartbeat interval in seconds
-            on_client_message: Optional callback(device_id, device_name, content, chat_id)
+            on_client_message: Optional callback(device_id, device_name, content, chat_id, message_id)
                                for relay mode. When set, messages are forwarded to this
                                callback instead of the local message bus.
+            send_queue_size: Frames buffered per client before it counts as slow
+            slow_consumer_policy: "drop" frames or "disconnect" a client whose queue is full
+            send_timeout: Seconds a single send may take before the client is disconnected
+            max_connections_per_ip: Maximum concurrent connections from one IP (0 = unlimited;
+                behind a proxy all clients share its address, so leave it off there)
+            max_unauthenticated: Maximum connections still waiting to authenticate (0 = unlimited)
+            auth_timeout: Seconds a new connection has to authenticate (0 = no deadline)
+            retry_after: Seconds rejected clients are told to wait before reconnecting
+            encodings: Frame encodings offered to clients, in order of preference
+                       (binary ones are skipped if their library is not installed)
+            compression: Negotiate permessage-deflate
+            compression_window_bits: Server deflate window (9-15; smaller uses less memory)
+            compression_mem_level: zlib memLevel for the server's compressor (1-9)
+            max_message_size: Largest frame accepted from a client, in bytes
+            outbox_size: Unacknowledged messages kept per device for replay (0 = no outbox)
+            outbox_ttl: Seconds an unacknowledged message is kept
+            reuse_port: Bind with SO_REUSEPORT so several processes can share the port
+            rate_limiter: Limits chat messages per device (None = unlimited)
+            ip_rate_limiter: Limits chat messages per client IP (None = unlimited)
+            audit_logger: Records pairing, authentication and rate-limit events (None = off)
         """
         self.host = host
         self.port = port
@@ -100,11 +183,80 @@ class SecureWebSocketServer:
         self.max_connections = max_connections
         self.heartbeat_interval = heartbeat_interval
         self.on_client_message = on_client_message
+        self.send_queue_size = send_queue_size
+        self.slow_consumer_policy = slow_consumer_policy
+        self.send_timeout = send_timeout
+        self.auth_timeout = auth_timeout
+        self.codecs = load_codecs(encodings)
+        self.compression = compression
+        self.compression_window_bits = compression_window_bits
+        self.compression_mem_level = compression_mem_level
+        self.max_message_size = max_message_size
+        self.outbox = OutboxStore(max_messages=outbox_size, ttl_s=outbox_ttl) if outbox_size > 0 else None
+        self.reuse_port = reuse_port
+        self.rate_limiter = rate_limiter
+        self.ip_rate_limiter = ip_rate_limiter
+        self.audit_logger = audit_logger
+        self.cluster: ClusterNode | None = None  # Set by gateway.cluster.join_cluster()
+        self.admission = AdmissionController(
+            max_connections=max_connections,
+            max_per_ip=max_connections_per_ip,
+            max_unauthenticated=max_unauthenticated,
+            retry_after=retry_after,
+        )
 
         self.authenticated_clients: dict[str, AuthenticatedClient] = {}
+        self._connections: dict[WebSocketServerProtocol, ConnectionState] = {}
         self._server: Any = None
         self._running = False
 
+    @classmethod
+    def from_config(
+        cls, config: MobileAppConfig, enterprise: EnterpriseConfig | None = None, **kwargs: Any
+    ) -> SecureWebSocketServer:
+        """Create a server from the mobile channel config; kwargs supply the rest (managers, bus, port)."""
+        if enterprise and enterprise.rate_limit_enabled:
+            # Only build defaults the caller did not supply: each one holds state
+            # (the audit logger starts a writer thread on its file)
+            if enterprise.rate_limit_requests_per_minute > 0 and "rate_limiter" not in kwargs:
+                kwargs["rate_limiter"] = RateLimiter(
+                    enterprise.rate_limit_requests_per_minute,
+                    block_duration_seconds=0,
+                    burst=enterprise.rate_limit_burst,
+                )
+            if enterprise.rate_limit_ip_requests_per_minute > 0 and "ip_rate_limiter" not in kwargs:
+                # An IP's connections are spread over the workers, which count separately
+                workers = max(config.workers, 1)
+                kwargs["ip_rate_limiter"] = RateLimiter(
+                    max(enterprise.rate_limit_ip_requests_per_minute // workers, 1),
+                    block_duration_seconds=0,
+                    burst=max(enterprise.rate_limit_burst * 5 // workers, 1),
+                )
+        if enterprise and enterprise.audit_log_enabled and "audit_logger" not in kwargs:
+            kwargs["audit_logger"] = AuditLogger(Path(enterprise.audit_log_path))
+        return cls(
+            tls_enabled=config.tls_enabled,
+            tls_cert_path=Path(config.tls_cert_path) if config.tls_cert_path else None,
+            tls_key_path=Path(config.tls_key_path) if config.tls_key_path else None,
+            max_connections=config.max_connections,
+            heartbeat_interval=config.heartbeat_interval,
+            send_queue_size=config.send_queue_size,
+            slow_consumer_policy=config.slow_consumer_policy,
+            send_timeout=config.send_timeout,
+            max_connections_per_ip=config.max_connections_per_ip,
+            max_unauthenticated=config.max_unauthenticated,
+            auth_timeout=config.auth_timeout,
+            retry_after=config.retry_after,
+            encodings=config.encodings,
+            compression=config.compression,
+            compression_window_bits=config.compression_window_bits,
+            compression_mem_level=config.compression_mem_level,
+            max_message_size=config.max_message_size,
+            outbox_size=config.outbox_size,
+            outbox_ttl=config.outbox_ttl,
+            **kwargs,
+        )
+
     async def start(self) -> None:
         """Start the WebSocket server."""
         if self._running:
@@ -126,15 +278,36 @@ class SecureWebSocketServer:
         async def _handler(websocket):
             await self._handle_connection(websocket)
 
+        def _select_subprotocol(connection, offered: Sequence[str]) -> str | None:
+            # Clients that offer nothing (or nothing we know) get plain JSON
+            codec = select_codec(self.codecs, offered)
+            return codec.subprotocol if codec else None
+
+        extensions = None
+        if self.compression:
+            extensions = [
+                ServerPerMessageDeflateFactory(
+                    server_max_window_bits=self.compression_window_bits,
+                    compress_settings={"memLevel": self.compression_mem_level},
+                )
+            ]
+
         self._server = await websockets.serve(
             _handler,
             self.host,
             self.port,
             ssl=ssl_context,
-            max_size=10_000_000,  # 10MB max message size
+            compression=None,
+            extensions=extensions,
+            subprotocols=[codec.subprotocol for codec in self.codecs.values()],
+            select_subprotocol=_select_subprotocol,
+            max_size=self.max_message_size,
             ping_interval=self.heartbeat_interval,
             ping_timeout=self.heartbeat_interval * 2,
+            reuse_port=self.reuse_port,
         )
+        if self.cluster:
+            await self.cluster.start()
 
         self._running = True
         protocol = "wss" if self.tls_enabled else "ws"
@@ -148,6 +321,9 @@ class SecureWebSocketServer:
         self._running = False
 
         # Close all client connections
+        for state in list(self._connections.values()):
+            await state.writer.stop()
+        self._connections.clear()
         for client in list(self.authenticated_clients.values()):
             try:
                 await client.websocket.close()
@@ -156,6 +332,9 @@ class SecureWebSocketServer:
 
         self.authenticated_clients.clear()
 
+        if self.cluster:
+            await self.cluster.stop()
+
         # Stop server
         if self._server:
             self._server.close()
@@ -168,10 +347,37 @@ class SecureWebSocketServer:
         """Handle incoming WebSocket connection."""
         remote = getattr(websocket, "remote_address", None)
         client_ip = remote[0] if remote else "unknown"
-        logger.info(f"New WebSocket connection from {client_ip}")
+
+        rejected = self.admission.admit(client_ip)
+        if rejected:
+            logger.warning(f"Rejecting WebSocket connection from {client_ip}: {rejected}")
+            try:
+                await websocket.close(CLOSE_TRY_AGAIN_LATER, self.admission.close_reason(rejected))
+            except Exception:
+                pass
+            return
+        codec = self._codec_for(websocket)
+        logger.info(f"New WebSocket connection from {client_ip} ({codec.name})")
+
+        writer = ConnectionWriter(
+            websocket,
+            maxsize=self.send_queue_size,
+            policy=self.slow_consumer_policy,
+            send_timeout=self.send_timeout,
+        )
+        writer.start()
+        state = ConnectionState(
+            websocket=websocket, client_ip=client_ip, writer=writer, codec=codec, admitted=True
+        )
+        self._connections[websocket] = state
+        if self.auth_timeout > 0:
+            state.auth_deadline = asyncio.get_running_loop().call_later(
+                self.auth_timeout, self._auth_expired, state
+            )
 
         try:
             async for message in websocket:
+                state.frames_in += 1
                 try:
                     await self._handle_message(websocket, message, client_ip)
                 except Exception as e:
@@ -183,30 +389,75 @@ class SecureWebSocketServer:
         except Exception as e:
             logger.error(f"WebSocket connection error: {e}")
         finally:
-            # Remove from authenticated clients if present
-            device_id = self._find_device_id_by_websocket(websocket)
-            if device_id:
+            self._connections.pop(websocket, None)
+            if state.auth_deadline:
+                state.auth_deadline.cancel()
+            self.admission.release(client_ip, state.authenticated)
+            await writer.stop()
+
+            # Remove from authenticated clients unless the device has
+            # already re-authenticated on a newer connection
+            device_id = state.device_id
+            client = self.authenticated_clients.get(device_id) if device_id else None
+            if client and client.websocket is websocket:
                 del self.authenticated_clients[device_id]
                 logger.info(f"Device disconnected: {device_id}")
+                if self.cluster:
+                    await self.cluster.release(device_id)
+
+    def _codec_for(self, websocket: WebSocketServerProtocol) -> FrameCodec:
+        """Codec for the subprotocol negotiated on this connection."""
+        subprotocol = getattr(websocket, "subprotocol", None)
+        for codec in self.codecs.values():
+            if codec.subprotocol == subprotocol:
+                return codec
+        return JSON_CODEC
+
+    def _auth_expired(self, state: ConnectionState) -> None:
+        """Close a connection that did not authenticate before its deadline."""
+        state.auth_deadline = None
+        if state.authenticated:
+            return
+        self.admission.auth_timeouts += 1
+        logger.warning(f"Closing unauthenticated WebSocket connection from {state.client_ip}: auth timeout")
+        asyncio.create_task(state.websocket.close(CLOSE_AUTH_TIMEOUT, "Authentication timeout"))
 
     def _find_device_id_by_websocket(self, websocket: WebSocketServerProtocol) -> str | None:
         """Find device_id by websocket connection."""
-        for device_id, client in self.authenticated_clients.items():
-            if client.websocket == websocket:
-                return device_id
-        return None
+        state = self._connections.get(websocket)
+        return state.device_id if state else None
+
+    def _register_client(self, websocket: WebSocketServerProtocol, client: AuthenticatedClient) -> None:
+        """Record an authenticated device in both directions of the index."""
+        state = self._connections.get(websocket)
+        if state:
+            previous = self.authenticated_clients.get(state.device_id) if state.device_id else None
+            if previous and previous.websocket is websocket and previous.device_id != client.device_id:
+                del self.authenticated_clients[previous.device_id]
+            if state.auth_deadline:
+                state.auth_deadline.cancel()
+                state.auth_deadline = None
+            if state.admitted and not state.authenticated:
+                self.admission.authenticated()
+            state.device_id = client.device_id
+            state.device_name = client.device_name
+            state.authenticated_at = client.authenticated_at
+            client.writer = state.writer
+        self.authenticated_clients[client.device_id] = client
 
     async def _handle_message(
         self, websocket: WebSocketServerProtocol, message: str | bytes, client_ip: str
     ) -> None:
         """Handle incoming message from client."""
-        if isinstance(message, bytes):
-            message = message.decode("utf-8")
-
+        state = self._connections.get(websocket)
+        codec = state.codec if state else JSON_CODEC
         try:
-            data = json.loads(message)
-        except json.JSONDecodeError:
-            await self._send_error(websocket, "Invalid JSON")
+            data = codec.decode(message)
+        except Exception:
+            await self._send_error(websocket, "Invalid JSON" if codec is JSON_CODEC else "Invalid frame")
+            return
+        if not isinstance(data, dict):
+            await self._send_error(websocket, "Frame must be an object")
             return
 
         msg_type = data.get("type")
@@ -217,6 +468,8 @@ class SecureWebSocketServer:
             await self._handle_jwt_auth(websocket, data, client_ip)
         elif msg_type == "message":
             await self._handle_client_message(websocket, data)
+        elif msg_type == "ack":
+            self._handle_ack(websocket, data)
         elif msg_type == "ping":
             await self._send_json(websocket, {"type": "pong"})
         else:
@@ -235,7 +488,11 @@ class SecureWebSocketServer:
             return
 
         # Validate pairing
-        if not self.pairing_manager.validate_pairing(session_id, temp_token, device_info):
+        if not await self.pairing_manager.validate_pairing_async(session_id, temp_token, device_info):
+            if self.audit_logger:
+                self.audit_logger.log(
+                    "pairing", ip_address=client_ip, success=False, details={"session_id": session_id}
+                )
             await self._send_error(websocket, "Invalid pairing credentials")
             return
 
@@ -253,7 +510,9 @@ class SecureWebSocketServer:
             websocket=websocket,
             authenticated_at=time.time(),
         )
-        self.authenticated_clients[device_id] = client
+        self._register_client(websocket, client)
+        if self.cluster:
+            await self.cluster.claim(device_id, device_name)
 
         # Send success response
         await self._send_json(
@@ -267,6 +526,8 @@ class SecureWebSocketServer:
             },
         )
 
+        if self.audit_logger:
+            self.audit_logger.log_pairing(session_id, device_id, client_ip, success=True)
         logger.info(f"Device paired successfully: {device_name} ({device_id}) from {client_ip}")
 
     async def _handle_jwt_auth(
@@ -279,17 +540,14 @@ class SecureWebSocketServer:
             await self._send_error(websocket, "Missing jwt_token")
             return
 
-        # Validate JWT
-        device_id = self.jwt_manager.validate_token(jwt_token)
-        if not device_id:
-            await self._send_error(websocket, "Invalid or expired JWT token")
-            return
-
-        # Get device credentials
-        credentials = self.jwt_manager.extract_device_credentials(jwt_token)
+        # Validate JWT (one signature check per distinct token; cached until exp)
+        credentials = self.jwt_manager.verify(jwt_token)
         if not credentials:
-            await self._send_error(websocket, "Failed to extract credentials from token")
+            if self.audit_logger:
+                self.audit_logger.log_access_denied("invalid or expired JWT", ip_address=client_ip)
+            await self._send_error(websocket, "Invalid or expired JWT token")
             return
+        device_id = credentials.device_id
 
         # Add to authenticated clients
         client = AuthenticatedClient(
@@ -298,9 +556,12 @@ class SecureWebSocketServer:
             websocket=websocket,
             authenticated_at=credentials.issued_at,
         )
-        self.authenticated_clients[device_id] = client
+        self._register_client(websocket, client)
+        if self.cluster:
+            await self.cluster.claim(device_id, credentials.device_name)
 
         # Send success response
+        box = self.outbox.peek(device_id) if self.outbox is not None else None
         await self._send_json(
             websocket,
             {
@@ -308,25 +569,77 @@ class SecureWebSocketServer:
                 "device_id": device_id,
                 "device_name": credentials.device_name,
                 "message": "Authentication successful",
+                "last_seq": box.last_seq if box else 0,
             },
         )
 
+        if self.audit_logger:
+            self.audit_logger.log_authentication(device_id, client_ip, success=True)
         logger.info(f"Device authenticated: {credentials.device_name} ({device_id}) from {client_ip}")
 
+        if box:
+            last_seq = data.get("last_seq")
+            self._replay_outbox(websocket, box, last_seq if isinstance(last_seq, int) else None)
+
+    def _replay_outbox(self, websocket: WebSocketServerProtocol, box: DeviceOutbox, last_seq: int | None) -> None:
+        """Queue the messages a reconnecting device missed, oldest first."""
+        state = self._connections.get(websocket)
+        if not state:
+            return
+        entries = box.pending(last_seq)
+        for entry in entries:
+            if not state.writer.enqueue(state.codec.encode(entry.data)):
+                break
+            entry.sent = True
+        if entries:
+            logger.info(f"Replayed {len(entries)} missed message(s) to {state.device_id}")
+
+    def _handle_ack(self, websocket: WebSocketServerProtocol, data: dict[str, Any]) -> None:
+        """Release outbox entries the client confirmed (cumulative up to seq)."""
+        state = self._connections.get(websocket)
+        seq = data.get("seq")
+        if not state or not state.device_id or self.outbox is None or not isinstance(seq, int):
+            return
+        box = self.outbox.peek(state.device_id)
+        if box:
+            box.ack(seq)
+
     async def _handle_client_message(
         self, websocket: WebSocketServerProtocol, data: dict[str, Any]
     ) -> None:
         """Handle message from authenticated client."""
         # Check if client is authenticated
-        device_id = self._find_device_id_by_websocket(websocket)
+        state = self._connections.get(websocket)
+        device_id = state.device_id if state else None
         if not device_id:
             await self._send_error(websocket, "Not authenticated")
             return
 
         client = self.authenticated_clients.get(device_id)
-        if not client:
+        if not client or client.websocket is not websocket:
             await self._send_error(websocket, "Authentication expired")
             return
+        if self.jwt_manager.is_revoked(device_id, client.authenticated_at):
+            await self._send_error(websocket, "Device access revoked")
+            await websocket.close(1008, "Device access revoked")
+            return
+        state.messages_in += 1
+
+        # Optional client-assigned id; a retried send reuses it so it isn't processed twice
+        message_id = data.get("message_id")
+        if message_id is not None:
+            message_id = str(message_id)
+
+        # Shed floods before they reach the agent (or the bridge, in relay mode)
+        retry_after = self._rate_limit(device_id, state.client_ip)
+        if retry_after:
+            if self.audit_logger:
+                self.audit_logger.log_rate_limit(device_id)
+            error = {"type": "error", "message": "Rate limit exceeded", "retry_after": round(retry_after, 1)}
+            if message_id is not None:
+                error["message_id"] = message_id
+            await self._send_json(websocket, error)
+            return
 
         content = data.get("content")
         if not content:
@@ -337,50 +650,106 @@ class SecureWebSocketServer:
 
         # Forward to callback (relay mode) or publish to local message bus
         if self.on_client_message:
-            await self.on_client_message(device_id, client.device_name, content, device_id)
+            await self.on_client_message(device_id, client.device_name, content, device_id, message_id)
         elif self.message_bus:
             from nanobot.bus.events import InboundMessage
 
             inbound_msg = InboundMessage(
                 channel="mobile",
                 chat_id=device_id,
-                sender=client.device_name,
+                sender_id=client.device_name,
                 content=content,
+                message_id=message_id,
             )
             await self.message_bus.publish_inbound(inbound_msg)
         else:
             logger.warning(f"No message handler configured -- dropping message from {device_id}")
 
         # Send acknowledgment
-        await self._send_json(websocket, {"type": "ack", "message": "Message received"})
+        ack = {"type": "ack", "message": "Message received"}
+        if message_id is not None:
+            ack["message_id"] = message_id
+        await self._send_json(websocket, ack)
+
+    def _rate_limit(self, device_id: str, client_ip: str) -> float:
+        """Seconds the client must wait before its next message (0 = allowed now)."""
+        if self.ip_rate_limiter:
+            retry_after = self.ip_rate_limiter.hit(client_ip)
+            if retry_after:
+                return retry_after
+        if self.rate_limiter:
+            return self.rate_limiter.hit(device_id)
+        return 0.0
 
     async def _send_error(self, websocket: WebSocketServerProtocol, error_message: str) -> None:
         """Send error message to client."""
         await self._send_json(websocket, {"type": "error", "message": error_message})
 
-    async def _send_json(self, websocket: WebSocketServerProtocol, data: dict[str, Any]) -> None:
-        """Send JSON message to client."""
+    async def _send_json(self, websocket: WebSocketServerProtocol, data: dict[str, Any]) -> bool:
+        """
+        Queue a message for a client, in the encoding it negotiated.
+
+        Returns:
+            True if queued (or sent, for sockets without a writer).
+        """
+        state = self._connections.get(websocket)
+        if state:
+            return state.writer.enqueue(state.codec.encode(data))
         try:
             await websocket.send(json.dumps(data))
+            return True
         except Exception as e:
             logger.error(f"Failed to send message: {e}")
+            return False
 
-    async def broadcast_message(self, message: str, exclude_device_id: str | None = None) -> None:
+    async def broadcast_message(
+        self,
+        message: str,
+        exclude_device_id: str | None = None,
+        exclude_device_ids: Iterable[str] | None = None,
+        device_filter: Callable[[AuthenticatedClient], bool] | None = None,
+    ) -> int:
         """
         Broadcast message to all connected clients.
 
+        The frame is encoded once per negotiated encoding and handed to every
+        client's writer queue, so delivery proceeds concurrently and a slow
+        client only delays itself.
+
         Args:
             message: Message content
             exclude_device_id: Optional device_id to exclude from broadcast
+            exclude_device_ids: Further device_ids to exclude
+            device_filter: Optional predicate; only clients it accepts receive the message
+
+        Returns:
+            Number of clients the message was queued for
         """
+        excluded = set(exclude_device_ids or ())
+        if exclude_device_id:
+            excluded.add(exclude_device_id)
+
+        data = {"type": "message", "content": message}
+        frames: dict[str, str | bytes] = {}
+        queued = 0
         for device_id, client in list(self.authenticated_clients.items()):
-            if device_id == exclude_device_id:
+            if device_id in excluded or (device_filter and not device_filter(client)):
+                continue
+            state = self._connections.get(client.websocket)
+            codec = state.codec if state else JSON_CODEC
+            frame = frames.get(codec.name)
+            if frame is None:
+                frame = frames[codec.name] = codec.encode(data)
+            if client.writer:
+                if client.writer.enqueue(frame):
+                    queued += 1
                 continue
-
             try:
-                await self._send_json(client.websocket, {"type": "message", "content": message})
+                await client.websocket.send(frame)
+                queued += 1
             except Exception as e:
                 logger.error(f"Failed to broadcast to {device_id}: {e}")
+        return queued
 
     async def send_to_device(self, device_id: str, message: str) -> bool:
         """
@@ -391,23 +760,54 @@ class SecureWebSocketServer:
             message: Message content
 
         Returns:
-            True if sent successfully
+            True if queued for the device (or kept in its outbox until it reconnects)
         """
+        if self.cluster and device_id not in self.authenticated_clients:
+            forwarded = await self.cluster.deliver(device_id, message)
+            if forwarded is not None:
+                return forwarded
+        return await self._send_local(device_id, message)
+
+    async def _send_local(self, device_id: str, message: str) -> bool:
+        """Send to a device connected to (or whose outbox is held by) this process."""
+        data = {"type": "message", "content": message}
+        entry = self.outbox.get(device_id).append(data) if self.outbox is not None else None
         client = self.authenticated_clients.get(device_id)
         if not client:
+            if entry:
+                logger.info(f"Device {device_id} offline, kept message {entry.seq} for replay")
+                return True
             logger.warning(f"Device not connected: {device_id}")
             return False
 
-        try:
-            await self._send_json(client.websocket, {"type": "message", "content": message})
-            return True
-        except Exception as e:
-            logger.error(f"Failed to send to {device_id}: {e}")
+        if not await self._send_json(client.websocket, entry.data if entry else data):
+            if entry:
+                logger.warning(f"Send queue full for {device_id}, message {entry.seq} kept for replay")
+                return True
+            logger.warning(f"Send queue full for {device_id}, message dropped")
             return False
+        if entry:
+            entry.sent = True
+        return True
 
     def get_connected_devices(self) -> list[dict[str, Any]]:
         """Get list of connected devices."""
-        return [client.to_dict() for client in self.authenticated_clients.values()]
+        devices = []
+        for client in self.authenticated_clients.values():
+            info = client.to_dict()
+            box = self.outbox.peek(client.device_id) if self.outbox is not None else None
+            if box:
+                info.update(box.get_stats())
+            devices.append(info)
+        return devices
+
+    def get_connections(self) -> list[dict[str, Any]]:
+        """Get state for every open connection, authenticated or not."""
+        return [state.to_dict() for state in self._connections.values()]
+
+    def get_admission_stats(self) -> dict[str, Any]:
+        """Get admission counters (accepts, rejects by reason, auth timeouts)."""
+        return self.admission.get_stats()
 
     def is_device_connected(self, device_id: str) -> bool:
         """Check if device is connected."""
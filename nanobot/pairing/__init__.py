@@ -1,5 +1,11 @@
 """QR code pairing system for secure mobile app connection."""
 
-from nanobot.pairing.manager import PairingManager, PairingSession
+from nanobot.pairing.manager import PairingManager
+from nanobot.pairing.store import (
+    MemoryPairingStore,
+    PairingSession,
+    PairingStore,
+    SQLitePairingStore,
+)
 
-__all__ = ["PairingManager", "PairingSession"]
+__all__ = ["MemoryPairingStore", "PairingManager", "PairingSession", "PairingStore", "SQLitePairingStore"]
@@ -5,38 +5,66 @@ from __future__ import annotations
 import asyncio
 import secrets
 import time
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable, TypeVar
 
 import qrcode
 from loguru import logger
+from PIL import Image
 
+from nanobot.pairing.store import (
+    MemoryPairingStore,
+    PairingSession,
+    PairingStore,
+    open_pairing_store,
+)
 
-@dataclass
-class PairingSession:
-    """Represents a temporary pairing session."""
+if TYPE_CHECKING:
+    from nanobot.config.schema import Config
 
-    session_id: str
-    temp_token: str
-    expires_at: float  # Unix timestamp
-    device_info: dict[str, Any] | None = None
-    websocket_url: str = ""
+T = TypeVar("T")
 
-    def is_expired(self) -> bool:
-        """Check if the pairing session has expired."""
-        return time.time() > self.expires_at
+_ASCII_CELLS = {0: "  ", 1: "██"}
+_PNG_PIXELS = bytes.maketrans(b"\x00\x01", b"\xff\x00")  # Light module -> white, dark -> black
 
-    def to_dict(self) -> dict[str, Any]:
-        """Convert to dictionary for serialization."""
-        return {
-            "session_id": self.session_id,
-            "temp_token": self.temp_token,
-            "expires_at": self.expires_at,
-            "device_info": self.device_info,
-            "websocket_url": self.websocket_url,
-        }
+
+def _qr_modules(data: str) -> tuple[bytes, ...]:
+    """
+    Encode data as a QR code: one bytes row per module row, 1 = dark, no border.
+
+    This is the expensive step (mask selection is pure Python); callers on
+    the event loop run it in a thread. Not cached: the payload holds the
+    session's temp_token, which must not outlive the session in memory.
+    """
+    qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(bytes(row) for row in qr.get_matrix())
+
+
+def _render_png(modules: tuple[bytes, ...], box_size: int = 10, border: int = 4) -> bytes:
+    """Black-on-white PNG of a QR code, scaled up by PIL rather than drawn box by box."""
+    size = len(modules) + 2 * border
+    blank = b"\xff" * size
+    pad = b"\xff" * border
+    pixels = b"".join(
+        [blank] * border + [pad + row.translate(_PNG_PIXELS) + pad for row in modules] + [blank] * border
+    )
+    img = Image.frombytes("L", (size, size), pixels)
+    img = img.resize((size * box_size, size * box_size), Image.Resampling.NEAREST).convert("1")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _render_ascii(modules: tuple[bytes, ...], border: int = 2) -> str:
+    """Terminal rendering of a QR code, two characters per module."""
+    blank = "  " * (len(modules) + 2 * border)
+    pad = "  " * border
+    lines = [pad + row.decode("latin-1").translate(_ASCII_CELLS) + pad for row in modules]
+    return "\n".join([blank] * border + lines + [blank] * border)
 
 
 class PairingManager:
@@ -48,20 +76,58 @@ class PairingManager:
     2. Mobile app scans QR code, gets session_id, websocket_url, temp_token
     3. Mobile app connects to WebSocket with pairing credentials
     4. Server validates pairing via validate_pairing() -> returns JWT token
+
+    QR encoding is CPU-bound (tens of milliseconds), so async callers use
+    create_pairing_session_async(), which encodes on a small thread pool.
+    Sessions live in a PairingStore: in memory by default, or a SQLite file
+    shared by several relay/gateway processes. The *_async methods keep
+    SQLite lock waits and disk I/O off the event loop.
     """
 
-    def __init__(self, websocket_url: str, session_expiry_minutes: int = 5):
+    def __init__(
+        self,
+        websocket_url: str,
+        session_expiry_minutes: int = 5,
+        render_workers: int = 1,
+        store: PairingStore | None = None,
+    ):
         """
         Initialize pairing manager.
 
         Args:
             websocket_url: WebSocket URL for mobile app to connect to
             session_expiry_minutes: How long pairing sessions remain valid
+            render_workers: Threads used to encode QR codes for async callers (encoding
+                holds the GIL, so more threads mostly add event-loop latency)
+            store: Where sessions are kept (default: this process's memory)
         """
         self.websocket_url = websocket_url
         self.session_expiry_minutes = session_expiry_minutes
-        self.active_sessions: dict[str, PairingSession] = {}
+        self.render_workers = render_workers
+        self.store = store if store is not None else MemoryPairingStore()
         self._cleanup_task: asyncio.Task | None = None
+        self._cleanup_wakeup = asyncio.Event()  # Set when a session is added
+        self._executor: ThreadPoolExecutor | None = None
+
+    @classmethod
+    def from_config(cls, config: Config, websocket_url: str, **kwargs: Any) -> PairingManager:
+        """
+        Build a pairing manager with the configured session store.
+
+        auth.pairing_store names a SQLite file to share sessions through; if
+        unset, a multi-worker gateway uses pairing.db in its cluster directory.
+        """
+        kwargs.setdefault("session_expiry_minutes", config.auth.pairing_session_expiry_minutes)
+        if "store" not in kwargs:
+            # Opening a store creates the file and its schema, so only when none was passed
+            path = config.auth.pairing_store
+            mobile = config.channels.mobile
+            if not path and mobile.workers > 1:
+                from nanobot.gateway.cluster import default_cluster_dir
+
+                path = (Path(mobile.cluster_dir).expanduser() if mobile.cluster_dir else default_cluster_dir()) / "pairing.db"
+            kwargs["store"] = open_pairing_store(path)
+        return cls(websocket_url, **kwargs)
 
     async def start(self) -> None:
         """Start background cleanup task."""
@@ -79,23 +145,66 @@ class PairingManager:
                 pass
             self._cleanup_task = None
             logger.info("Pairing manager stopped")
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _store_call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run a store operation without blocking the event loop on SQLite locks or disk."""
+        if self.store.blocking:
+            return await asyncio.to_thread(fn, *args)
+        return fn(*args)
 
     async def _cleanup_expired_sessions(self) -> None:
-        """Periodically remove expired pairing sessions."""
+        """Remove pairing sessions as they expire, sleeping until the earliest expiry."""
         while True:
             try:
-                await asyncio.sleep(60)  # Cleanup every minute
-                expired = [
-                    sid for sid, session in self.active_sessions.items() if session.is_expired()
-                ]
-                for sid in expired:
-                    del self.active_sessions[sid]
-                    logger.debug(f"Removed expired pairing session: {sid}")
+                self._cleanup_wakeup.clear()
+                next_expiry = await self._store_call(self.store.next_expiry)
+                # A shared store also gets sessions from other processes, so wake at least once a minute
+                delay = 60.0 if next_expiry is None else min(max(next_expiry - time.time(), 0.0) + 0.01, 60.0)
+                try:
+                    await asyncio.wait_for(self._cleanup_wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                removed = await self._store_call(self.store.expire)
+                if removed:
+                    logger.debug(f"Removed {removed} expired pairing sessions")
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in pairing session cleanup: {e}")
 
+    def _new_session(self) -> PairingSession:
+        # Generate secure session ID and temporary token
+        now = time.time()
+        return PairingSession(
+            session_id=secrets.token_urlsafe(16),
+            temp_token=secrets.token_urlsafe(32),
+            expires_at=now + (self.session_expiry_minutes * 60),
+            websocket_url=self.websocket_url,
+            created_at=now,
+        )
+
+    def _log_created(self, session: PairingSession) -> None:
+        logger.info(f"Created pairing session: {session.session_id} (expires in {self.session_expiry_minutes}m)")
+
+    def create_session(self) -> PairingSession:
+        """Create a new pairing session without rendering its QR code."""
+        session = self._new_session()
+        self.store.add(session)
+        self._cleanup_wakeup.set()
+        self._log_created(session)
+        return session
+
+    async def create_session_async(self) -> PairingSession:
+        """Like create_session, but stores the session off the event loop."""
+        session = self._new_session()
+        await self._store_call(self.store.add, session)
+        self._cleanup_wakeup.set()
+        self._log_created(session)
+        return session
+
     def create_pairing_session(self) -> tuple[str, bytes]:
         """
         Create a new pairing session and generate QR code.
@@ -103,49 +212,19 @@ class PairingManager:
         Returns:
             Tuple of (session_id, qr_code_png_bytes)
         """
-        # Generate secure session ID and temporary token
-        session_id = secrets.token_urlsafe(16)
-        temp_token = secrets.token_urlsafe(32)
-
-        # Calculate expiry time
-        expires_at = time.time() + (self.session_expiry_minutes * 60)
-
-        # Create session
-        session = PairingSession(
-            session_id=session_id,
-            temp_token=temp_token,
-            expires_at=expires_at,
-            websocket_url=self.websocket_url,
-        )
-        self.active_sessions[session_id] = session
-
-        # Generate QR code data
-        qr_data = {
-            "session_id": session_id,
-            "websocket_url": self.websocket_url,
-            "temp_token": temp_token,
-            "timestamp": int(time.time()),
-        }
-
-        # Create QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+        session = self.create_session()
+        return session.session_id, _render_png(_qr_modules(session.qr_payload()))
+
+    async def create_pairing_session_async(self) -> tuple[str, bytes]:
+        """Like create_pairing_session, but stores the session and encodes the QR code off the event loop."""
+        session = await self.create_session_async()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.render_workers, thread_name_prefix="pairing-qr")
+        loop = asyncio.get_running_loop()
+        png = await loop.run_in_executor(
+            self._executor, lambda: _render_png(_qr_modules(session.qr_payload()))
         )
-        qr.add_data(str(qr_data))
-        qr.make(fit=True)
-
-        # Generate PNG image
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        qr_code_bytes = buffer.getvalue()
-
-        logger.info(f"Created pairing session: {session_id} (expires in {self.session_expiry_minutes}m)")
-
-        return session_id, qr_code_bytes
+        return session.session_id, png
 
     def validate_pairing(
         self, session_id: str, temp_token: str, device_info: dict[str, Any]
@@ -161,34 +240,37 @@ class PairingManager:
         Returns:
             True if pairing is valid and should proceed to JWT generation
         """
-        session = self.active_sessions.get(session_id)
-
-        if not session:
-            logger.warning(f"Pairing validation failed: session not found ({session_id})")
-            return False
+        # Checked and removed in one step (one-time use, even across processes)
+        session, reason = self.store.redeem(session_id, temp_token)
+        return self._redeemed(session_id, session, reason, device_info)
 
-        if session.is_expired():
-            logger.warning(f"Pairing validation failed: session expired ({session_id})")
-            del self.active_sessions[session_id]
-            return False
+    async def validate_pairing_async(
+        self, session_id: str, temp_token: str, device_info: dict[str, Any]
+    ) -> bool:
+        """Like validate_pairing, but redeems the session off the event loop."""
+        session, reason = await self._store_call(self.store.redeem, session_id, temp_token)
+        return self._redeemed(session_id, session, reason, device_info)
 
-        if session.temp_token != temp_token:
-            logger.warning(f"Pairing validation failed: invalid token ({session_id})")
+    def _redeemed(
+        self, session_id: str, session: PairingSession | None, reason: str | None, device_info: dict[str, Any]
+    ) -> bool:
+        if session is None:
+            logger.warning(f"Pairing validation failed: {reason} ({session_id})")
             return False
 
-        # Store device info and mark session as used
         session.device_info = device_info
 
         logger.info(f"Pairing validated successfully: {session_id} - {device_info.get('device_name', 'unknown')}")
 
-        # Remove session after successful pairing (one-time use)
-        del self.active_sessions[session_id]
-
         return True
 
     def get_session(self, session_id: str) -> PairingSession | None:
         """Get a pairing session by ID."""
-        return self.active_sessions.get(session_id)
+        return self.store.get(session_id)
+
+    async def get_session_async(self, session_id: str) -> PairingSession | None:
+        """Like get_session, but reads the store off the event loop."""
+        return await self._store_call(self.store.get, session_id)
 
     def generate_qr_ascii(self, session_id: str, temp_token: str) -> str:
         """
@@ -201,32 +283,17 @@ class PairingManager:
         Returns:
             ASCII art QR code as string
         """
-        qr_data = {
-            "session_id": session_id,
-            "websocket_url": self.websocket_url,
-            "temp_token": temp_token,
-            "timestamp": int(time.time()),
-        }
-
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=1,
-            border=2,
-        )
-        qr.add_data(str(qr_data))
-        qr.make(fit=True)
-
-        # Generate ASCII art
-        ascii_qr = qr.get_matrix()
-        output = []
-        for row in ascii_qr:
-            line = ""
-            for cell in row:
-                line += "██" if cell else "  "
-            output.append(line)
-
-        return "\n".join(output)
+        session = self.store.get(session_id)
+        if session is None or session.temp_token != temp_token:
+            # Not one of ours: encode the same fields with the current time
+            session = PairingSession(
+                session_id=session_id,
+                temp_token=temp_token,
+                expires_at=0.0,
+                websocket_url=self.websocket_url,
+                created_at=time.time(),
+            )
+        return _render_ascii(_qr_modules(session.qr_payload()))
 
     def save_qr_image(self, qr_code_bytes: bytes, output_path: Path) -> None:
         """
@@ -242,4 +309,4 @@ class PairingManager:
 
     def get_active_session_count(self) -> int:
         """Get number of active pairing sessions."""
-        return len(self.active_sessions)
+        return self.store.count()
@@ -0,0 +1,266 @@
+"""Storage for pending pairing sessions: per-process memory or a shared SQLite file."""
+
+from __future__ import annotations
+
+import heapq
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+
+@dataclass
+class PairingSession:
+    """Represents a temporary pairing session."""
+
+    session_id: str
+    temp_token: str
+    expires_at: float  # Unix timestamp
+    device_info: dict[str, Any] | None = None
+    websocket_url: str = ""
+    created_at: float = 0.0  # Unix timestamp
+
+    def is_expired(self) -> bool:
+        """Check if the pairing session has expired."""
+        return time.time() > self.expires_at
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary for serialization."""
+        return {
+            "session_id": self.session_id,
+            "temp_token": self.temp_token,
+            "expires_at": self.expires_at,
+            "device_info": self.device_info,
+            "websocket_url": self.websocket_url,
+            "created_at": self.created_at,
+        }
+
+    def qr_payload(self) -> str:
+        """Data encoded in the session's QR code."""
+        return str({
+            "session_id": self.session_id,
+            "websocket_url": self.websocket_url,
+            "temp_token": self.temp_token,
+            "timestamp": int(self.created_at),
+        })
+
+
+class PairingStore(ABC):
+    """
+    Where pairing sessions wait until they are redeemed or expire.
+
+    A session can be redeemed once: redeem() removes it in the same step
+    that checks it, so two connections presenting the same QR code cannot
+    both pair.
+    """
+
+    blocking = False  # Whether calls may wait on I/O or locks (async callers then use a thread)
+
+    @abstractmethod
+    def add(self, session: PairingSession) -> None:
+        """Store a new session."""
+
+    @abstractmethod
+    def get(self, session_id: str) -> PairingSession | None:
+        """A session that has not expired or been redeemed."""
+
+    @abstractmethod
+    def redeem(self, session_id: str, temp_token: str) -> tuple[PairingSession | None, str | None]:
+        """
+        Remove and return a session if temp_token matches and it has not expired.
+
+        Returns:
+            (session, None) on success, otherwise (None, reason). A wrong
+            token leaves the session in place.
+        """
+
+    @abstractmethod
+    def expire(self) -> int:
+        """Drop expired sessions. Returns the number removed."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of sessions that can still be redeemed."""
+
+    @abstractmethod
+    def next_expiry(self) -> float | None:
+        """When the earliest stored session expires, or None if there are none."""
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryPairingStore(PairingStore):
+    """
+    Sessions in this process's memory.
+
+    Expiry pops a heap ordered by expiry time, so it only touches sessions
+    that actually expired; heap entries of redeemed sessions are skipped.
+    """
+
+    def __init__(self):
+        self._sessions: dict[str, PairingSession] = {}
+        self._heap: list[tuple[float, str]] = []
+
+    def add(self, session: PairingSession) -> None:
+        self.expire()
+        self._sessions[session.session_id] = session
+        heapq.heappush(self._heap, (session.expires_at, session.session_id))
+
+    def get(self, session_id: str) -> PairingSession | None:
+        session = self._sessions.get(session_id)
+        return session if session and not session.is_expired() else None
+
+    def redeem(self, session_id: str, temp_token: str) -> tuple[PairingSession | None, str | None]:
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None, "session not found"
+        if session.is_expired():
+            del self._sessions[session_id]
+            return None, "session expired"
+        if not secrets.compare_digest(session.temp_token, temp_token):
+            return None, "invalid token"
+        del self._sessions[session_id]
+        return session, None
+
+    def expire(self) -> int:
+        now = time.time()
+        removed = 0
+        while self._heap and self._heap[0][0] < now:
+            expires_at, session_id = heapq.heappop(self._heap)
+            session = self._sessions.get(session_id)
+            if session is not None and session.expires_at == expires_at:
+                del self._sessions[session_id]
+                removed += 1
+        return removed
+
+    def count(self) -> int:
+        self.expire()
+        return len(self._sessions)
+
+    def next_expiry(self) -> float | None:
+        # Drop heap entries left behind by redeemed sessions
+        while self._heap and self._heap[0][1] not in self._sessions:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pairing_sessions (
+    session_id TEXT PRIMARY KEY,
+    temp_token TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    websocket_url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pairing_sessions_expiry ON pairing_sessions (expires_at);
+"""
+
+
+class SQLitePairingStore(PairingStore):
+    """
+    Sessions in a SQLite file, shared by every process that opens it.
+
+    Lets a QR code created by one relay or gateway process be redeemed
+    through another, and keeps pending pairings across restarts. SQLite's
+    file locking serialises writers; redemption checks and deletes the row
+    inside one BEGIN IMMEDIATE transaction, so a session is handed out at
+    most once even when processes race. Every statement is a short indexed
+    single-row operation, but a call can wait up to the busy timeout for
+    another process's lock.
+    """
+
+    blocking = True
+
+    def __init__(self, path: Path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.path), timeout=5.0, isolation_level=None, check_same_thread=False)
+        os.chmod(self.path, 0o600)  # Holds pairing tokens
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+
+    def add(self, session: PairingSession) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO pairing_sessions VALUES (?, ?, ?, ?, ?)",
+                (session.session_id, session.temp_token, session.expires_at, session.created_at, session.websocket_url),
+            )
+
+    def get(self, session_id: str) -> PairingSession | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT temp_token, expires_at, created_at, websocket_url FROM pairing_sessions "
+                "WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time()),
+            ).fetchone()
+        return self._session(session_id, row) if row else None
+
+    def redeem(self, session_id: str, temp_token: str) -> tuple[PairingSession | None, str | None]:
+        now = time.time()
+        with self._lock:
+            # The write lock is taken up front, so no other process can redeem between check and delete
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT temp_token, expires_at, created_at, websocket_url FROM pairing_sessions "
+                    "WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+                if row is None:
+                    result = None, "session not found"
+                elif row[1] < now:
+                    self._db.execute("DELETE FROM pairing_sessions WHERE session_id = ?", (session_id,))
+                    result = None, "session expired"
+                elif not secrets.compare_digest(row[0], temp_token):
+                    result = None, "invalid token"
+                else:
+                    self._db.execute("DELETE FROM pairing_sessions WHERE session_id = ?", (session_id,))
+                    result = self._session(session_id, row), None
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return result
+
+    def expire(self) -> int:
+        with self._lock:
+            return self._db.execute("DELETE FROM pairing_sessions WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM pairing_sessions WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()[0]
+
+    def next_expiry(self) -> float | None:
+        with self._lock:
+            return self._db.execute("SELECT MIN(expires_at) FROM pairing_sessions").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    @staticmethod
+    def _session(session_id: str, row: tuple) -> PairingSession:
+        temp_token, expires_at, created_at, websocket_url = row
+        return PairingSession(
+            session_id=session_id,
+            temp_token=temp_token,
+            expires_at=expires_at,
+            websocket_url=websocket_url,
+            created_at=created_at,
+        )
+
+
+def open_pairing_store(path: str | Path = "") -> PairingStore:
+    """A SQLite store at path, or an in-memory store if path is empty."""
+    return SQLitePairingStore(Path(path)) if path else MemoryPairingStore()
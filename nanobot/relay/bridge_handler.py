@@ -93,7 +93,7 @@ class BridgeConnectionHandler:
             await websocket.close(4001, "Auth failed")
 
     async def forward_to_bridge(
-        self, device_id: str, sender: str, content: str, chat_id: str
+        self, device_id: str, sender: str, content: str, chat_id: str, message_id: str | None = None
     ) -> None:
         """Forward a mobile message to the bridge client."""
         if not self.is_connected:
@@ -110,6 +110,7 @@ class BridgeConnectionHandler:
             "sender": sender,
             "content": content,
             "chat_id": chat_id,
+            "message_id": message_id,
         }
         try:
             await self.bridge_ws.send(json.dumps(msg))
@@ -117,13 +118,18 @@ class BridgeConnectionHandler:
             logger.error(f"Failed to forward message to bridge: {e}")
 
     async def _handle_response(self, data: dict[str, Any]) -> None:
-        """Forward bridge response back to the mobile device."""
+        """
+        Forward bridge response back to the mobile device.
+
+        If the device is offline the response waits in its outbox and is
+        replayed when it reconnects.
+        """
         device_id = data.get("device_id")
         content = data.get("content")
         if device_id and content:
             success = await self.websocket_server.send_to_device(device_id, content)
             if not success:
-                logger.warning(f"Failed to deliver response to device {device_id} — not connected")
+                logger.warning(f"Dropped response to device {device_id} — not connected and outbox disabled")
 
     async def _ping_loop(self) -> None:
         """Send periodic pings to keep the bridge connection alive."""
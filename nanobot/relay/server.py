@@ -19,7 +19,6 @@ from __future__ import annotations
 import asyncio
 import os
 import signal
-from pathlib import Path
 
 import uvicorn
 import websockets
@@ -30,6 +29,7 @@ from rich.table import Table
 
 from nanobot.api.app import create_app
 from nanobot.auth.jwt_manager import JWTManager
+from nanobot.auth.revocation import open_revocation_store
 from nanobot.gateway.websocket import SecureWebSocketServer
 from nanobot.pairing.manager import PairingManager
 from nanobot.relay.bridge_handler import BridgeConnectionHandler
@@ -64,6 +64,7 @@ class RelayServer:
         self.api_port = api_port or config.gateway.port
         self.public_url = public_url or config.relay.public_url or ""
         self._running = False
+        self._stopped = asyncio.Event()
 
         # Components (initialized in initialize_components)
         self.jwt_manager: JWTManager | None = None
@@ -86,30 +87,26 @@ class RelayServer:
             secret=jwt_secret,
             algorithm=self.config.auth.jwt_algorithm,
             expiry_hours=self.config.auth.jwt_expiry_hours,
+            cache_size=self.config.auth.jwt_cache_size,
+            revocation_store=open_revocation_store(self.config.auth.revocation_store),
         )
         logger.info("  JWT manager initialized")
 
         # 2. Pairing Manager — uses relay's public URL for QR codes
         websocket_url = self.public_url or f"ws://localhost:{self.ws_port}"
-        self.pairing_manager = PairingManager(
-            websocket_url=websocket_url,
-            session_expiry_minutes=self.config.auth.pairing_session_expiry_minutes,
-        )
+        self.pairing_manager = PairingManager.from_config(self.config, websocket_url)
         logger.info(f"  Pairing manager initialized (URL: {websocket_url})")
 
         # 3. WebSocket Server — with on_client_message callback (relay mode)
         # The callback forwards messages to the bridge instead of a local bus
-        self.websocket_server = SecureWebSocketServer(
+        self.websocket_server = SecureWebSocketServer.from_config(
+            self.config.channels.mobile,
+            self.config.enterprise,
             host="0.0.0.0",
             port=self.ws_port,
             pairing_manager=self.pairing_manager,
             jwt_manager=self.jwt_manager,
             message_bus=None,  # No local message bus in relay mode
-            tls_enabled=self.config.channels.mobile.tls_enabled,
-            tls_cert_path=Path(self.config.channels.mobile.tls_cert_path) if self.config.channels.mobile.tls_cert_path else None,
-            tls_key_path=Path(self.config.channels.mobile.tls_key_path) if self.config.channels.mobile.tls_key_path else None,
-            max_connections=self.config.channels.mobile.max_connections,
-            heartbeat_interval=self.config.channels.mobile.heartbeat_interval,
         )
         logger.info(f"  WebSocket server initialized (port: {self.ws_port})")
 
@@ -206,15 +203,15 @@ class RelayServer:
             pass
 
     async def _keep_alive(self) -> None:
-        """Keep server alive."""
-        while self._running:
-            await asyncio.sleep(1)
+        """Keep server alive until stop() is called."""
+        await self._stopped.wait()
 
     async def stop(self) -> None:
         """Stop relay server gracefully."""
         if not self._running:
             return
         self._running = False
+        self._stopped.set()
         logger.info("Relay server stopping...")
 
         if self.pairing_manager:
@@ -2,90 +2,119 @@
 
 from __future__ import annotations
 
-import asyncio
+import atexit
+import bisect
+import gzip
 import ipaddress
 import json
 import re
+import threading
 import time
-from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import Any, BinaryIO
 
 from loguru import logger
 
 
-@dataclass
-class RateLimitEntry:
-    """Rate limit entry for a device or IP."""
-
-    identifier: str
-    request_count: int
-    window_start: float
-    blocked_until: float = 0.0
-
-    def is_blocked(self) -> bool:
-        """Check if currently blocked."""
-        return time.time() < self.blocked_until
-
-
 class RateLimiter:
     """
     Rate limiter to prevent abuse.
 
-    Implements sliding window rate limiting per device_id.
+    GCRA (the generic cell rate algorithm, an exact token bucket) per
+    identifier. Each identifier keeps a single float, its theoretical
+    arrival time (TAT): requests are spaced emission_interval apart on
+    average and up to `burst` may arrive back to back. A key whose TAT is
+    in the past holds no information and is dropped lazily: each check
+    also evicts up to two such keys from the front of the (least recently
+    updated first) table, so no cleanup task or full scan is needed.
+
+    Optionally, exceeding the limit blocks the identifier for
+    block_duration_seconds; expired blocks are dropped the same lazy way.
+    A requests_per_minute of 0 disables the limiter.
+
+    Counts are kept per process: with several workers, each one enforces
+    the full limit on the requests it sees.
     """
 
-    def __init__(self, requests_per_minute: int = 60, block_duration_seconds: int = 300):
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        block_duration_seconds: int = 300,
+        burst: int | None = None,
+    ):
         """
         Initialize rate limiter.
 
         Args:
-            requests_per_minute: Maximum requests allowed per minute
-            block_duration_seconds: How long to block after exceeding limit
+            requests_per_minute: Sustained requests allowed per minute (0 = unlimited)
+            block_duration_seconds: How long to block after exceeding limit (0 = just reject)
+            burst: Requests allowed back to back (default: requests_per_minute)
         """
         self.requests_per_minute = requests_per_minute
         self.block_duration_seconds = block_duration_seconds
-        self.window_seconds = 60  # 1 minute sliding window
+        self.burst = burst or requests_per_minute
+        self.emission_interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self.tolerance = self.emission_interval * (self.burst - 1)
 
-        self._entries: dict[str, RateLimitEntry] = {}
-        self._cleanup_task: asyncio.Task | None = None
+        self._tat: dict[str, float] = {}  # identifier -> theoretical arrival time (monotonic)
+        self._blocked: dict[str, float] = {}  # identifier -> blocked until (monotonic)
+        self.allowed = 0
+        self.rejected = 0
 
     async def start(self) -> None:
-        """Start background cleanup task."""
-        if not self._cleanup_task:
-            self._cleanup_task = asyncio.create_task(self._cleanup_old_entries())
-            logger.info("Rate limiter started")
+        """Kept for compatibility; expiry is lazy, so there is no background task."""
 
     async def stop(self) -> None:
-        """Stop background cleanup task."""
-        if self._cleanup_task:
-            self._cleanup_task.cancel()
-            try:
-                await self._cleanup_task
-            except asyncio.CancelledError:
-                pass
-            self._cleanup_task = None
-            logger.info("Rate limiter stopped")
-
-    async def _cleanup_old_entries(self) -> None:
-        """Periodically remove old entries."""
-        while True:
-            try:
-                await asyncio.sleep(60)  # Cleanup every minute
-                now = time.time()
-                to_remove = [
-                    identifier
-                    for identifier, entry in self._entries.items()
-                    if now - entry.window_start > self.window_seconds * 2
-                ]
-                for identifier in to_remove:
-                    del self._entries[identifier]
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Error in rate limit cleanup: {e}")
+        """Kept for compatibility; expiry is lazy, so there is no background task."""
+
+    def hit(self, identifier: str) -> float:
+        """
+        Count one request.
+
+        Returns:
+            0.0 if allowed, otherwise seconds until a request would be allowed.
+        """
+        if self.requests_per_minute <= 0:
+            self.allowed += 1
+            return 0.0
+
+        now = time.monotonic()
+        self._evict(now)
+
+        if self._blocked:
+            until = self._blocked.get(identifier)
+            if until is not None:
+                if now < until:
+                    self.rejected += 1
+                    return until - now
+                del self._blocked[identifier]
+
+        tat = max(self._tat.get(identifier, now), now)
+        if tat - now > self.tolerance:
+            self.rejected += 1
+            if self.block_duration_seconds > 0:
+                self._blocked[identifier] = now + self.block_duration_seconds
+                logger.warning(f"Rate limit exceeded for {identifier}, blocked for {self.block_duration_seconds}s")
+                return float(self.block_duration_seconds)
+            return tat - now - self.tolerance
+
+        # Re-insert so the table stays ordered by last update
+        self._tat.pop(identifier, None)
+        self._tat[identifier] = tat + self.emission_interval
+        self.allowed += 1
+        return 0.0
+
+    def _evict(self, now: float) -> None:
+        # Both tables are ordered by expiry (blocks all last block_duration_seconds)
+        for table in (self._tat, self._blocked):
+            for _ in range(2):
+                if not table:
+                    break
+                identifier = next(iter(table))
+                if table[identifier] > now:
+                    break
+                del table[identifier]
 
     def check_rate_limit(self, identifier: str) -> tuple[bool, str | None]:
         """
@@ -97,98 +126,286 @@ class RateLimiter:
         Returns:
             Tuple of (allowed, error_message)
         """
-        now = time.time()
-        entry = self._entries.get(identifier)
-
-        # Check if currently blocked
-        if entry and entry.is_blocked():
-            remaining = int(entry.blocked_until - now)
-            return False, f"Rate limit exceeded. Blocked for {remaining} more seconds"
-
-        # Create or reset entry if window expired
-        if not entry or (now - entry.window_start) > self.window_seconds:
-            entry = RateLimitEntry(
-                identifier=identifier, request_count=1, window_start=now, blocked_until=0.0
-            )
-            self._entries[identifier] = entry
-            return True, None
-
-        # Increment request count
-        entry.request_count += 1
-
-        # Check if limit exceeded
-        if entry.request_count > self.requests_per_minute:
-            entry.blocked_until = now + self.block_duration_seconds
-            logger.warning(f"Rate limit exceeded for {identifier}: {entry.request_count} requests")
-            return False, f"Rate limit exceeded. Blocked for {self.block_duration_seconds} seconds"
-
+        retry_after = self.hit(identifier)
+        if retry_after:
+            return False, f"Rate limit exceeded. Retry in {retry_after:.0f} seconds"
         return True, None
 
     def reset_limit(self, identifier: str) -> None:
         """Reset rate limit for an identifier."""
-        if identifier in self._entries:
-            del self._entries[identifier]
-
-    def get_stats(self, identifier: str) -> dict[str, Any]:
-        """Get rate limit stats for an identifier."""
-        entry = self._entries.get(identifier)
-        if not entry:
-            return {"request_count": 0, "blocked": False}
-
+        self._tat.pop(identifier, None)
+        self._blocked.pop(identifier, None)
+
+    def get_stats(self, identifier: str | None = None) -> dict[str, Any]:
+        """Get rate limit stats for an identifier, or totals when identifier is None."""
+        if identifier is None:
+            return {
+                "tracked": len(self._tat),
+                "blocked": len(self._blocked),
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+            }
+        now = time.monotonic()
+        backlog = max(self._tat.get(identifier, now) - now, 0.0)
+        until = self._blocked.get(identifier, 0.0)
         return {
-            "request_count": entry.request_count,
-            "blocked": entry.is_blocked(),
-            "blocked_until": entry.blocked_until if entry.is_blocked() else None,
+            "tokens": int((self.tolerance - backlog) / self.emission_interval) + 1,
+            "blocked": until > now,
+            "blocked_for": until - now if until > now else None,
         }
 
 
+def _audit_timestamp(value: datetime | str) -> str:
+    """Audit timestamps are fixed-width UTC ISO strings, so they sort as text."""
+    if isinstance(value, str):
+        return value
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _parse_line(line: bytes) -> dict[str, Any] | None:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None  # Torn or partial line
+
+
 class AuditLogger:
     """
     Audit logger for security events.
 
     Logs all authentication, authorization, and security-relevant events.
+
+    log() only appends to an in-memory buffer; a background thread writes
+    batches (every flush_interval seconds, or sooner once batch_size
+    events are waiting) to a file it keeps open, counting bytes instead of
+    stat-ing the file. Past max_file_size the file is rotated into a
+    compressed segment: a series of independent gzip members of about
+    block_size bytes each (still a valid .gz file), plus a small JSON index
+    recording the first timestamp and offset of every member. Reads use
+    that index (and reverse reads of the active file), so recent-event and
+    time-range queries touch only the blocks they need. Files rotated by
+    the old uncompressed scheme (audit.1 ... audit.N) are converted into
+    segments when the writer starts.
     """
 
-    def __init__(self, log_path: Path, max_file_size_mb: int = 100, max_files: int = 10):
+    def __init__(
+        self,
+        log_path: Path,
+        max_file_size_mb: float = 100,
+        max_files: int = 10,
+        flush_interval: float = 1.0,
+        batch_size: int = 1000,
+        block_size: int = 256 * 1024,
+        read_only: bool = False,
+    ):
         """
         Initialize audit logger.
 
         Args:
             log_path: Path to audit log file
             max_file_size_mb: Maximum log file size before rotation
-            max_files: Maximum number of rotated log files to keep
+            max_files: Maximum number of rotated (compressed) segments to keep
+            flush_interval: Longest time an event waits in memory before it is written
+            batch_size: Write as soon as this many events are waiting
+            block_size: Uncompressed bytes per independently readable block in a segment
+            read_only: Only query the log (e.g. from the dashboard); another process writes it
         """
         self.log_path = Path(log_path).expanduser()
-        self.max_file_size = max_file_size_mb * 1024 * 1024
+        self.max_file_size = int(max_file_size_mb * 1024 * 1024)
         self.max_files = max_files
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.block_size = block_size
+        self.read_only = read_only
+
+        self._pending: list[dict[str, Any]] = []
+        self._logged = 0
+        self._written = 0
+        self._rotations = 0
+        self._flush_requested = False
+        self._closing = False
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()  # Taken before _cond; held while files change
+        self._file: BinaryIO | None = None
+        self._size = 0
+        self._indexes: dict[Path, dict[str, Any]] = {}
 
         # Create log directory
         self.log_path.parent.mkdir(parents=True, exist_ok=True)
 
+        self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+        if not read_only:
+            self._thread.start()
+            atexit.register(self.close)
+
         logger.info(f"Audit logger initialized: {self.log_path}")
 
-    def _rotate_if_needed(self) -> None:
-        """Rotate log file if it exceeds max size."""
-        if not self.log_path.exists():
-            return
+    def _rotating_path(self) -> Path:
+        return self.log_path.with_name(self.log_path.name + ".rotating")
 
-        if self.log_path.stat().st_size > self.max_file_size:
-            # Rotate existing files
-            for i in range(self.max_files - 1, 0, -1):
-                old_file = self.log_path.with_suffix(f".{i}")
-                new_file = self.log_path.with_suffix(f".{i + 1}")
-                if old_file.exists():
-                    if new_file.exists():
-                        new_file.unlink()
-                    old_file.rename(new_file)
+    def _segments(self) -> list[Path]:
+        """Compressed segments, oldest first (names embed their first timestamp)."""
+        stem, suffix = self.log_path.stem, self.log_path.suffix
+        return sorted(self.log_path.parent.glob(f"{stem}.*{suffix}.gz"))
 
-            # Rotate current file
-            rotated = self.log_path.with_suffix(".1")
-            if rotated.exists():
-                rotated.unlink()
-            self.log_path.rename(rotated)
+    def _run(self) -> None:
+        self._recover()
+        while True:
+            with self._cond:
+                deadline = None
+                while not (self._closing or self._flush_requested or len(self._pending) >= self.batch_size):
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    if deadline is None:
+                        deadline = time.monotonic() + self.flush_interval
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            # Readers hold _io_lock, so an event is always either buffered or on disk for them
+            rotated = None
+            with self._io_lock:
+                with self._cond:
+                    batch, self._pending = self._pending, []
+                    self._flush_requested = False
+                    closing = self._closing
+                if batch:
+                    rotated = self._write(batch)
+            if rotated is not None:
+                self._archive(rotated)
+            with self._cond:
+                self._written += len(batch)
+                self._cond.notify_all()
+                if closing and not self._pending:
+                    return
+
+    def _write(self, batch: list[dict[str, Any]]) -> Path | None:
+        """Append a batch; returns the renamed file to archive if this filled the active one."""
+        data = "".join(json.dumps(entry) + "\n" for entry in batch).encode("utf-8")
+        try:
+            if self._file is None:
+                self._file = self.log_path.open("ab")
+                self._size = self._file.tell()
+            self._file.write(data)
+            self._file.flush()
+            self._size += len(data)
+            if self._size >= self.max_file_size:
+                return self._rotate()
+        except Exception as e:
+            logger.error(f"Failed to write audit log: {e}")
+        return None
+
+    def _rotate(self) -> Path:
+        """Move the active file aside (readers still see it) and start a new one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._size = 0
+        rotating = self._rotating_path()
+        self.log_path.rename(rotating)
+        self._rotations += 1
+        logger.info(f"Rotated audit log: {self.log_path}")
+        return rotating
+
+    def _recover(self) -> None:
+        """Archive a rotation interrupted by a crash, and rotated files of the old uncompressed format."""
+        # The old format renamed audit.log to audit.1 (newest) ... audit.N (oldest)
+        stem = self.log_path.stem
+        legacy = [p for p in self.log_path.parent.glob(f"{stem}.*") if p.suffix[1:].isdigit()]
+        for path in sorted(legacy, key=lambda p: int(p.suffix[1:]), reverse=True):
+            self._archive(path)
+        if self._rotating_path().exists():
+            self._archive(self._rotating_path())
+
+    def _archive(self, source: Path) -> None:
+        """
+        Compress a closed file into a segment.
 
-            logger.info(f"Rotated audit log: {self.log_path}")
+        Compression runs without _io_lock, so log readers are not held up;
+        only swapping the segment in for the source file takes it.
+        """
+        try:
+            built = self._compress(source)
+            with self._io_lock:
+                if built is not None:
+                    tmp, segment, index = built
+                    tmp.replace(segment)
+                    self._indexes[segment] = index
+                source.unlink()
+                segments = self._segments()
+                for old in segments[: max(0, len(segments) - self.max_files)]:
+                    old.unlink(missing_ok=True)
+                    old.with_name(old.name + ".idx").unlink(missing_ok=True)
+                    self._indexes.pop(old, None)
+        except Exception as e:
+            logger.error(f"Failed to archive audit log {source.name}: {e}")
+
+    def _compress(self, source: Path) -> tuple[Path, Path, dict[str, Any]] | None:
+        """Write source as a temporary segment plus its index; returns (tmp, segment, index), or None if empty."""
+        blocks: list[list[Any]] = []
+        first = last = None
+        events = 0
+        tmp = source.with_name(source.name + ".gz.tmp")
+        with source.open("rb") as src, tmp.open("wb") as dst:
+            while True:
+                lines = src.readlines(self.block_size)
+                if not lines:
+                    break
+                entry = _parse_line(lines[0])
+                block_first = entry["timestamp"] if entry else (last or "")
+                member = gzip.compress(b"".join(lines), mtime=0)
+                blocks.append([block_first, dst.tell(), len(member), len(lines)])
+                dst.write(member)
+                first = first or block_first
+                entry = _parse_line(lines[-1])
+                last = entry["timestamp"] if entry else last
+                events += len(lines)
+        if not blocks:
+            tmp.unlink()
+            return None
+
+        stamp = first.replace("-", "").replace(":", "")
+        segment = self.log_path.with_name(f"{self.log_path.stem}.{stamp}{self.log_path.suffix}.gz")
+        index = {"first": first, "last": last, "events": events, "blocks": blocks}
+        index_path = segment.with_name(segment.name + ".idx")
+        index_tmp = index_path.with_name(index_path.name + ".tmp")
+        index_tmp.write_text(json.dumps(index))
+        index_tmp.replace(index_path)  # Index first: a visible segment always has one
+        return tmp, segment, index
+
+    def _index(self, segment: Path) -> dict[str, Any] | None:
+        index = self._indexes.get(segment)
+        if index is None:
+            try:
+                index = self._indexes[segment] = json.loads(segment.with_name(segment.name + ".idx").read_text())
+            except (OSError, ValueError) as e:
+                logger.warning(f"Unreadable audit index for {segment.name}: {e}")
+                return None
+        return index
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every event logged so far is on disk. Returns False on timeout."""
+        with self._cond:
+            target = self._logged
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._written >= target or not self._thread.is_alive(), timeout)
+
+    def close(self) -> None:
+        """Write out buffered events and stop the writer thread."""
+        atexit.unregister(self.close)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
 
     def log(
         self,
@@ -208,11 +425,8 @@ class AuditLogger:
             details: Additional event details
             success: Whether the event was successful
         """
-        self._rotate_if_needed()
-
-        timestamp = datetime.utcnow().isoformat() + "Z"
         log_entry = {
-            "timestamp": timestamp,
+            "timestamp": _audit_timestamp(datetime.now(timezone.utc)),
             "event_type": event_type,
             "device_id": device_id,
             "ip_address": ip_address,
@@ -220,11 +434,14 @@ class AuditLogger:
             "details": details or {},
         }
 
-        try:
-            with self.log_path.open("a") as f:
-                f.write(json.dumps(log_entry) + "\n")
-        except Exception as e:
-            logger.error(f"Failed to write audit log: {e}")
+        with self._cond:
+            if self._closing or self.read_only:
+                logger.error(f"Audit logger closed or read-only, dropping {event_type} event")
+                return
+            self._pending.append(log_entry)
+            self._logged += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify_all()
 
     def log_authentication(
         self, device_id: str, ip_address: str, success: bool, method: str = "jwt"
@@ -275,40 +492,357 @@ class AuditLogger:
         """
         Get recent audit events.
 
+        Reads the active file (and one being archived) backwards, then the
+        last blocks of the newest segments, until count events are found.
+
         Args:
             count: Number of events to retrieve
 
         Returns:
-            List of recent events
+            List of recent events, oldest first
         """
-        if not self.log_path.exists():
+        if count <= 0:
             return []
+        events: list[dict[str, Any]] = []  # Newest first
+        try:
+            with self._io_lock:
+                with self._cond:
+                    events.extend(reversed(self._pending[-count:]))
+                for path in (self.log_path, self._rotating_path()):
+                    if len(events) < count:
+                        events.extend(self._tail_text(path, count - len(events)))
+                for segment in reversed(self._segments()):
+                    if len(events) >= count:
+                        break
+                    events.extend(self._tail_segment(segment, count - len(events)))
+        except Exception as e:
+            logger.error(f"Failed to read audit log: {e}")
+        events.reverse()
+        return events
+
+    def get_events(
+        self,
+        since: datetime | str | None = None,
+        until: datetime | str | None = None,
+        limit: int = 1000,
+    ) -> list[dict[str, Any]]:
+        """
+        Get audit events in a time range.
+
+        Args:
+            since: Earliest timestamp (inclusive); naive datetimes are UTC
+            until: Latest timestamp (inclusive)
+            limit: Maximum number of events to return
+
+        Returns:
+            Up to limit matching events, oldest first
+        """
+        start = _audit_timestamp(since) if since is not None else ""
+        end = _audit_timestamp(until) if until is not None else "\uffff"
+        events: list[dict[str, Any]] = []
+
+        def take(entries) -> bool:
+            for entry in entries:
+                ts = entry.get("timestamp", "")
+                if ts > end:
+                    return True
+                if ts >= start:
+                    events.append(entry)
+                    if len(events) >= limit:
+                        return True
+            return False
 
         try:
-            with self.log_path.open("r") as f:
-                lines = f.readlines()
-                recent_lines = lines[-count:]
-                return [json.loads(line) for line in recent_lines]
+            with self._io_lock:
+                for segment in self._segments():
+                    index = self._index(segment)
+                    if index is None or index["last"] < start:
+                        continue
+                    if index["first"] > end or take(self._read_segment(segment, index, start)):
+                        return events
+                for path in (self._rotating_path(), self.log_path):
+                    if take(self._read_text(path, start)):
+                        return events
+                with self._cond:
+                    take(list(self._pending))
         except Exception as e:
             logger.error(f"Failed to read audit log: {e}")
+        return events
+
+    def _tail_text(self, path: Path, count: int) -> list[dict[str, Any]]:
+        """Last count events of an uncompressed file, newest first, reading backwards in chunks."""
+        if not path.exists():
+            return []
+        events: list[dict[str, Any]] = []
+        with path.open("rb") as f:
+            pos = f.seek(0, 2)
+            partial = b""
+            while pos > 0 and len(events) < count:
+                step = min(64 * 1024, pos)
+                pos -= step
+                f.seek(pos)
+                lines = (f.read(step) + partial).split(b"\n")
+                partial = lines.pop(0)  # May continue in the previous chunk
+                for line in reversed(lines):
+                    entry = _parse_line(line) if line else None
+                    if entry is not None:
+                        events.append(entry)
+            if partial and len(events) < count:
+                entry = _parse_line(partial)
+                if entry is not None:
+                    events.append(entry)
+        return events[:count]
+
+    def _tail_segment(self, segment: Path, count: int) -> list[dict[str, Any]]:
+        index = self._index(segment)
+        if index is None:
             return []
+        events: list[dict[str, Any]] = []
+        with segment.open("rb") as f:
+            for _, offset, length, _ in reversed(index["blocks"]):
+                f.seek(offset)
+                lines = gzip.decompress(f.read(length)).splitlines()
+                events.extend(e for e in map(_parse_line, reversed(lines)) if e is not None)
+                if len(events) >= count:
+                    break
+        return events[:count]
+
+    def _read_segment(self, segment: Path, index: dict[str, Any], start: str):
+        """Events from the block that may contain start onwards."""
+        blocks = index["blocks"]
+        first = max(0, bisect.bisect_left([b[0] for b in blocks], start) - 1)
+        with segment.open("rb") as f:
+            for _, offset, length, _ in blocks[first:]:
+                f.seek(offset)
+                for line in gzip.decompress(f.read(length)).splitlines():
+                    entry = _parse_line(line)
+                    if entry is not None:
+                        yield entry
+
+    def _read_text(self, path: Path, start: str):
+        """Events of an uncompressed file from start onwards, found by bisecting on byte offsets."""
+        if not path.exists():
+            return
+        with path.open("rb") as f:
+            lo, hi = 0, f.seek(0, 2)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                f.seek(mid)
+                if mid:
+                    f.readline()  # Skip to the next line start
+                entry = _parse_line(f.readline())
+                if entry is None or entry.get("timestamp", "") >= start:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            f.seek(lo)
+            if lo:
+                f.readline()
+            for line in f:
+                entry = _parse_line(line)
+                if entry is not None:
+                    yield entry
+
+    def get_stats(self) -> dict[str, Any]:
+        """Get audit logger statistics."""
+        with self._cond:
+            return {
+                "pending": len(self._pending),
+                "logged": self._logged,
+                "written": self._written,
+                "rotations": self._rotations,
+                "active_bytes": self._size,
+                "segments": len(self._segments()),
+            }
+
+
+# Basic XSS/injection detection (can be enhanced); checked case-insensitively
+SUSPICIOUS_PATTERNS = [
+    r"<script[^>]*>.*?</script>",  # Script tags
+    r"javascript:",  # JavaScript protocol
+    r"on\w+\s*=",  # Event handlers
+]
+
+
+# Regex metacharacters that end a literal run
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+_QUANTIFIERS = frozenset("?*+{")
+# Backreferences and named groups (numbering and names change once patterns
+# share one regex) and global inline flags cannot go into the combined regex
+_UNCOMBINABLE = re.compile(r"\\[1-9]|\(\?P[<=]|\(\?[aiLmsux]+\)")
+
+
+def _split_literal(pattern: str) -> tuple[list[str], str]:
+    """
+    Split pattern into the literal atoms every match starts with and the rest.
+
+    Atoms are leading anchors (\\b, \\A, ^) and plain or escaped punctuation
+    characters, ASCII letters lower-cased (matching ignores case). An atom
+    followed by a quantifier stays in the rest, and a pattern containing
+    "|" has no literal atoms.
+    """
+    if "|" in pattern:
+        return [], pattern
+    atoms: list[str] = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if pattern.startswith(("\\b", "\\A"), i) or c == "^":
+            atom = pattern[i : i + 2] if c == "\\" else c
+        elif c == "\\":
+            escaped = pattern[i + 1 : i + 2]
+            if not escaped or escaped.isalnum() or not escaped.isascii():
+                break
+            atom = pattern[i : i + 2]
+        elif c in _REGEX_META or not c.isascii():
+            break
+        else:
+            atom = c.lower()
+        if pattern[i + len(atom) : i + len(atom) + 1] in _QUANTIFIERS:
+            break
+        atoms.append(atom)
+        i += len(atom)
+    return atoms, pattern[i:]
+
+
+def _combined_regex(branches: list[tuple[list[str], str, str]]) -> str:
+    """
+    One alternation over (atoms, rest, group name) branches.
+
+    Atom prefixes shared by several patterns are factored into a trie, so
+    at each position the regex engine follows one path instead of trying
+    every pattern in turn. Each pattern's rest is wrapped in its named group.
+    When every branch starts with a literal character, a lookahead on those
+    characters lets the engine skip other positions without entering the trie.
+    """
+    trie: dict[str, Any] = {}
+    first_chars: set[str] | None = set()
+    for atoms, rest, name in branches:
+        node = trie
+        for atom in atoms:
+            node = node.setdefault(atom, {})
+        node.setdefault("", []).append(f"(?P<{name}>{rest})")
+        consuming = [a for a in atoms if a not in ("\\b", "\\A", "^")]
+        if consuming and first_chars is not None:
+            first_chars.add(consuming[0][-1])
+        else:
+            first_chars = None
+
+    def emit(node: dict[str, Any]) -> str:
+        alts = [*node.get("", []), *(atom + emit(child) for atom, child in node.items() if atom)]
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+
+    if first_chars:
+        return "(?=[" + "".join(sorted(map(re.escape, first_chars))) + "])" + emit(trie)
+    return emit(trie)
+
+
+class PatternMatcher:
+    """
+    Case-insensitive search for any of many regexes.
+
+    The patterns are compiled into one regex, an alternation with a named
+    group per pattern, so a single search scans the content once and
+    match.lastgroup says which pattern matched. A plain alternation would
+    make Python's backtracking engine try every pattern at every position;
+    instead the patterns' literal prefixes are merged into a trie and only
+    branches whose prefix matches are followed. Patterns that cannot share
+    a regex (backreferences, named groups, global flags) are searched
+    separately.
+    """
+
+    def __init__(self, patterns: list[str]):
+        self.patterns = list(patterns)
+        branches = []
+        self._separate: list[tuple[str, re.Pattern[str]]] = []
+        for i, pattern in enumerate(self.patterns):
+            if _UNCOMBINABLE.search(pattern):
+                self._separate.append((pattern, re.compile(pattern, re.IGNORECASE)))
+            else:
+                branches.append((*_split_literal(pattern), f"p{i}"))
+        self._combined = re.compile(_combined_regex(branches), re.IGNORECASE) if branches else None
+
+    def search(self, content: str) -> str | None:
+        """A pattern found in content (the leftmost match's), or None."""
+        if self._combined is not None:
+            match = self._combined.search(content)
+            if match:
+                return self.patterns[int(match.lastgroup[1:])]
+        for pattern, regex in self._separate:
+            if regex.search(content):
+                return pattern
+        return None
+
+
+class IPPrefixTrie:
+    """
+    Binary trie of IP networks keyed on address bits.
+
+    A lookup walks at most 32 (IPv4) or 128 (IPv6) bits, however many
+    networks are stored, and stops at the first (shortest) matching prefix.
+    """
+
+    def __init__(self, networks: list[ipaddress.IPv4Network | ipaddress.IPv6Network] = ()):
+        # Node: [child for bit 0, child for bit 1, terminal]
+        self._roots: dict[int, list] = {4: [None, None, False], 6: [None, None, False]}
+        for network in networks:
+            self.add(network)
+
+    def add(self, network: ipaddress.IPv4Network | ipaddress.IPv6Network) -> None:
+        node = self._roots[network.version]
+        bits = network.max_prefixlen
+        address = int(network.network_address)
+        for i in range(network.prefixlen):
+            if node[2]:
+                return  # Already covered by a shorter prefix
+            bit = (address >> (bits - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        node[2] = True
+        node[0] = node[1] = None  # Longer prefixes below are now redundant
+
+    def __contains__(self, ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
+        node = self._roots[ip.version]
+        bits = ip.max_prefixlen
+        address = int(ip)
+        for i in range(bits):
+            if node[2]:
+                return True
+            node = node[(address >> (bits - 1 - i)) & 1]
+            if node is None:
+                return False
+        return node[2]
 
 
 class SecurityValidator:
     """
     Security validator for input validation and IP whitelisting.
+
+    Suspicious-content patterns go through a PatternMatcher and the
+    whitelist into a prefix trie, so per-message cost stays flat as the
+    pattern set and the whitelist grow.
     """
 
-    def __init__(self, ip_whitelist: list[str] | None = None, enable_whitelist: bool = False):
+    def __init__(
+        self,
+        ip_whitelist: list[str] | None = None,
+        enable_whitelist: bool = False,
+        extra_patterns: list[str] | None = None,
+    ):
         """
         Initialize security validator.
 
         Args:
             ip_whitelist: List of allowed IP addresses/CIDR ranges
             enable_whitelist: Enable IP whitelist checking
+            extra_patterns: Additional suspicious-content regexes (case-insensitive)
         """
         self.enable_whitelist = enable_whitelist
         self.ip_whitelist = self._parse_ip_whitelist(ip_whitelist or [])
+        self._ip_trie = IPPrefixTrie(self.ip_whitelist)
+        self.suspicious_patterns = SUSPICIOUS_PATTERNS + list(extra_patterns or [])
+        self._suspicious = PatternMatcher(self.suspicious_patterns)
 
         logger.info(
             f"Security validator initialized (whitelist: {enable_whitelist}, "
@@ -345,17 +879,19 @@ class SecurityValidator:
 
         try:
             ip = ipaddress.ip_address(ip_address)
-            for network in self.ip_whitelist:
-                if ip in network:
-                    return True, None
-
-            logger.warning(f"IP address not in whitelist: {ip_address}")
-            return False, "IP address not allowed"
-
         except ValueError as e:
             logger.error(f"Invalid IP address: {ip_address} - {e}")
             return False, "Invalid IP address"
 
+        # IPv4 clients on a dual-stack socket show up as ::ffff:a.b.c.d
+        if ip.version == 6 and ip.ipv4_mapped:
+            ip = ip.ipv4_mapped
+        if ip in self._ip_trie:
+            return True, None
+
+        logger.warning(f"IP address not in whitelist: {ip_address}")
+        return False, "IP address not allowed"
+
     def validate_device_info(self, device_info: dict[str, Any]) -> tuple[bool, str | None]:
         """
         Validate device information from pairing request.
@@ -402,17 +938,10 @@ class SecurityValidator:
         if len(content) == 0:
             return False, "Message content empty"
 
-        # Basic XSS/injection detection (can be enhanced)
-        suspicious_patterns = [
-            r"<script[^>]*>.*?</script>",  # Script tags
-            r"javascript:",  # JavaScript protocol
-            r"on\w+\s*=",  # Event handlers
-        ]
-
-        for pattern in suspicious_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                logger.warning(f"Suspicious pattern detected in message: {pattern}")
-                return False, "Message content contains suspicious patterns"
+        pattern = self._suspicious.search(content)
+        if pattern:
+            logger.warning(f"Suspicious pattern detected in message: {pattern}")
+            return False, "Message content contains suspicious patterns"
 
         return True, None
 
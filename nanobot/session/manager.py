@@ -1,6 +1,8 @@
 """Session management for conversation history."""
 
 import json
+import sys
+import time
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -11,6 +13,59 @@ from loguru import logger
 from nanobot.utils.helpers import ensure_dir, safe_filename
 
 
+class SessionMessage:
+    """
+    A single stored message.
+    
+    Uses __slots__ and a float timestamp to keep per-message overhead small
+    when many sessions are resident. Role strings are interned so every
+    message shares the same few string objects.
+    """
+    
+    __slots__ = ("role", "content", "timestamp", "extra", "_llm")
+    
+    def __init__(
+        self,
+        role: str,
+        content: str,
+        timestamp: float | None = None,
+        extra: dict[str, Any] | None = None,
+    ):
+        self.role = sys.intern(role)
+        self.content = content
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.extra = extra or None
+        self._llm: dict[str, Any] | None = None
+    
+    def to_llm(self) -> dict[str, Any]:
+        """Get the message in LLM format (just role and content), built once."""
+        if self._llm is None:
+            self._llm = {"role": self.role, "content": self.content}
+        return self._llm
+    
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to the JSONL on-disk format."""
+        data = {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+        }
+        if self.extra:
+            data.update(self.extra)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "SessionMessage":
+        """Create from the JSONL on-disk format."""
+        data = dict(data)
+        role = data.pop("role")
+        content = data.pop("content", "")
+        ts = data.pop("timestamp", None)
+        if isinstance(ts, str):
+            ts = datetime.fromisoformat(ts).timestamp()
+        return cls(role, content, timestamp=ts, extra=data)
+
+
 @dataclass
 class Session:
     """
@@ -20,55 +75,72 @@ class Session:
     """
     
     key: str  # channel:chat_id
-    messages: list[dict[str, Any]] = field(default_factory=list)
+    messages: list[SessionMessage] = field(default_factory=list)
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Cached LLM-format history as (max_messages, messages); reset on append
+    _history: tuple[int, list[dict[str, Any]]] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
     
     def add_message(self, role: str, content: str, **kwargs: Any) -> None:
         """Add a message to the session."""
-        msg = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            **kwargs
-        }
-        self.messages.append(msg)
+        self.messages.append(SessionMessage(role, content, extra=kwargs))
         self.updated_at = datetime.now()
+        self._history = None
     
     def get_history(self, max_messages: int = 50) -> list[dict[str, Any]]:
         """
         Get message history for LLM context.
         
+        The returned list is cached until the next append and must be
+        treated as read-only; copy it before mutating.
+        
         Args:
             max_messages: Maximum messages to return.
         
         Returns:
             List of messages in LLM format.
         """
+        if self._history is not None and self._history[0] == max_messages:
+            return self._history[1]
+        
         # Get recent messages
         recent = self.messages[-max_messages:] if len(self.messages) > max_messages else self.messages
         
         # Convert to LLM format (just role and content)
-        return [{"role": m["role"], "content": m["content"]} for m in recent]
+        history = [m.to_llm() for m in recent]
+        self._history = (max_messages, history)
+        return history
     
     def clear(self) -> None:
         """Clear all messages in the session."""
         self.messages = []
         self.updated_at = datetime.now()
+        self._history = None
 
 
 class SessionManager:
     """
     Manages conversation sessions.
     
-    Sessions are stored as JSONL files in the sessions directory.
+    Sessions are stored as JSONL files in the sessions directory. Cached
+    sessions are reloaded if their file was rewritten by another process
+    (e.g. a second agent worker).
     """
     
     def __init__(self, workspace: Path):
         self.workspace = workspace
         self.sessions_dir = ensure_dir(Path.home() / ".nanobot" / "sessions")
         self._cache: dict[str, Session] = {}
+        self._mtimes: dict[str, int] = {}  # File mtime (ns) when each cached session was loaded/saved
+    
+    def _file_mtime(self, key: str) -> int | None:
+        try:
+            return self._get_session_path(key).stat().st_mtime_ns
+        except OSError:
+            return None
     
     def _get_session_path(self, key: str) -> Path:
         """Get the file path for a session."""
@@ -86,7 +158,8 @@ class SessionManager:
             The session.
         """
         # Check cache
-        if key in self._cache:
+        mtime = self._file_mtime(key)
+        if key in self._cache and self._mtimes.get(key) == mtime:
             return self._cache[key]
         
         # Try to load from disk
@@ -95,6 +168,7 @@ class SessionManager:
             session = Session(key=key)
         
         self._cache[key] = session
+        self._mtimes[key] = mtime
         return session
     
     def _load(self, key: str) -> Session | None:
@@ -121,7 +195,7 @@ class SessionManager:
                         metadata = data.get("metadata", {})
                         created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
                     else:
-                        messages.append(data)
+                        messages.append(SessionMessage.from_dict(data))
             
             return Session(
                 key=key,
@@ -149,9 +223,10 @@ class SessionManager:
             
             # Write messages
             for msg in session.messages:
-                f.write(json.dumps(msg) + "\n")
+                f.write(json.dumps(msg.to_dict()) + "\n")
         
         self._cache[session.key] = session
+        self._mtimes[session.key] = self._file_mtime(session.key)
     
     def delete(self, key: str) -> bool:
         """
@@ -165,6 +240,7 @@ class SessionManager:
         """
         # Remove from cache
         self._cache.pop(key, None)
+        self._mtimes.pop(key, None)
         
         # Remove file
         path = self._get_session_path(key)
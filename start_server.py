@@ -34,10 +34,13 @@ sys.path.insert(0, str(Path(__file__).parent))
 from nanobot import __logo__, __version__
 from nanobot.api.app import create_app
 from nanobot.auth.jwt_manager import JWTManager
+from nanobot.auth.revocation import open_revocation_store
+from nanobot.bus.ipc import BusServer
 from nanobot.bus.queue import MessageBus
 from nanobot.channels.manager import ChannelManager
 from nanobot.channels.mobile import MobileChannel
 from nanobot.config.loader import load_config
+from nanobot.gateway.cluster import default_cluster_dir, join_cluster
 from nanobot.gateway.websocket import SecureWebSocketServer
 from nanobot.pairing.manager import PairingManager
 from nanobot.agent.loop import AgentLoop
@@ -62,6 +65,7 @@ class EnterpriseServer:
         self.ws_port = ws_port or config.channels.mobile.websocket_port
         self.api_port = api_port or config.gateway.port
         self.running = False
+        self._stopped = asyncio.Event()
 
         # Core components
         self.bus: MessageBus | None = None
@@ -73,13 +77,15 @@ class EnterpriseServer:
         self.session_manager: SessionManager | None = None
         self.channel_manager: ChannelManager | None = None
         self.api_server_task: asyncio.Task | None = None
+        self.bus_server: BusServer | None = None
+        self.worker_processes: list[asyncio.subprocess.Process] = []
 
     def initialize_components(self):
         """Initialize all server components in correct order."""
         logger.info("Initializing Enterprise Entobot server components...")
 
         # 1. Message Bus
-        self.bus = MessageBus()
+        self.bus = MessageBus.from_config(self.config.bus)
         logger.info("✓ Message bus initialized")
 
         # 2. Session Manager
@@ -97,6 +103,8 @@ class EnterpriseServer:
             secret=jwt_secret,
             algorithm=self.config.auth.jwt_algorithm,
             expiry_hours=self.config.auth.jwt_expiry_hours,
+            cache_size=self.config.auth.jwt_cache_size,
+            revocation_store=open_revocation_store(self.config.auth.revocation_store),
         )
         logger.info("✓ JWT manager initialized")
 
@@ -104,27 +112,35 @@ class EnterpriseServer:
         protocol = "wss" if self.config.channels.mobile.tls_enabled else "ws"
         websocket_url = f"{protocol}://localhost:{self.ws_port}"
 
-        self.pairing_manager = PairingManager(
-            websocket_url=websocket_url,
-            session_expiry_minutes=self.config.auth.pairing_session_expiry_minutes,
-        )
+        self.pairing_manager = PairingManager.from_config(self.config, websocket_url)
         logger.info(f"✓ Pairing manager initialized (URL: {websocket_url})")
 
         # 5. Secure WebSocket Server
-        self.websocket_server = SecureWebSocketServer(
+        self.websocket_server = SecureWebSocketServer.from_config(
+            self.config.channels.mobile,
+            self.config.enterprise,
             host="0.0.0.0",
             port=self.ws_port,
             pairing_manager=self.pairing_manager,
             jwt_manager=self.jwt_manager,
             message_bus=self.bus,
-            tls_enabled=self.config.channels.mobile.tls_enabled,
-            tls_cert_path=Path(self.config.channels.mobile.tls_cert_path) if self.config.channels.mobile.tls_cert_path else None,
-            tls_key_path=Path(self.config.channels.mobile.tls_key_path) if self.config.channels.mobile.tls_key_path else None,
-            max_connections=self.config.channels.mobile.max_connections,
-            heartbeat_interval=self.config.channels.mobile.heartbeat_interval,
         )
         logger.info(f"✓ WebSocket server initialized (port: {self.ws_port})")
 
+        # 5b. Multi-process mode: this process is worker 0 of channels.mobile.workers
+        mobile = self.config.channels.mobile
+        if mobile.workers > 1:
+            if not self.config.auth.jwt_secret:
+                raise RuntimeError(
+                    "channels.mobile.workers > 1 requires auth.jwtSecret so every worker accepts the same tokens"
+                )
+            cluster_dir = Path(mobile.cluster_dir).expanduser() if mobile.cluster_dir else default_cluster_dir()
+            node = join_cluster(self.websocket_server, cluster_dir, "0")
+            node.registry.reset()
+            bus_socket = Path(self.config.bus.ipc_socket).expanduser() if self.config.bus.ipc_socket else cluster_dir / "bus.sock"
+            self.bus_server = BusServer(self.bus, bus_socket)
+            logger.info(f"✓ Gateway cluster: {mobile.workers} websocket workers (registry: {cluster_dir})")
+
         # 6. Mobile Channel
         self.mobile_channel = MobileChannel(
             config=self.config.channels.mobile,
@@ -155,6 +171,7 @@ class EnterpriseServer:
             exec_config=self.config.tools.exec,
             restrict_to_workspace=self.config.tools.restrict_to_workspace,
             session_manager=self.session_manager,
+            cross_session_recall=self.config.agents.defaults.cross_session_recall,
         )
         logger.info("✓ Agent loop initialized")
 
@@ -188,8 +205,11 @@ class EnterpriseServer:
         # 1. Start pairing manager
         await self.pairing_manager.start()
 
-        # 2. Start WebSocket server
+        # 2. Start WebSocket server (and, in multi-process mode, the other workers)
         await self.websocket_server.start()
+        if self.bus_server:
+            await self.bus_server.start()
+            await self._spawn_workers()
 
         # 3. Start mobile channel
         await self.mobile_channel.start()
@@ -197,7 +217,7 @@ class EnterpriseServer:
         # 4. Start REST API server
         self.api_server_task = asyncio.create_task(self._run_api_server())
 
-        # 5. Start agent loop and channel dispatcher
+        # 5. Start agent loop and outbound dispatcher
         self.running = True
 
         logger.info("✓ All components started successfully")
@@ -207,11 +227,24 @@ class EnterpriseServer:
         try:
             await asyncio.gather(
                 self.agent_loop.run(),
+                self.bus.dispatch_outbound(),
                 self._keep_alive(),
             )
         except asyncio.CancelledError:
             logger.info("Server cancelled")
 
+    async def _spawn_workers(self):
+        """Start websocket workers 1..N-1; they bind the same port and publish through the bus socket."""
+        for worker_id in range(1, self.config.channels.mobile.workers):
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "nanobot", "mobile-worker",
+                "--id", str(worker_id),
+                "--port", str(self.ws_port),
+                "--bus", str(self.bus_server.path),
+            )
+            self.worker_processes.append(process)
+            logger.info(f"✓ WebSocket worker {worker_id} started (pid {process.pid})")
+
     async def _run_api_server(self):
         """Run FastAPI server."""
         app = create_app(
@@ -236,9 +269,8 @@ class EnterpriseServer:
             logger.info("API server cancelled")
 
     async def _keep_alive(self):
-        """Keep server alive and handle graceful shutdown."""
-        while self.running:
-            await asyncio.sleep(1)
+        """Keep server alive until stop() is called."""
+        await self._stopped.wait()
 
     async def stop(self):
         """Stop all server components gracefully."""
@@ -247,6 +279,7 @@ class EnterpriseServer:
 
         logger.info("Stopping server components...")
         self.running = False
+        self._stopped.set()
 
         # Stop components in reverse order
         if self.agent_loop:
@@ -255,9 +288,19 @@ class EnterpriseServer:
         if self.mobile_channel:
             await self.mobile_channel.stop()
 
+        for process in self.worker_processes:
+            if process.returncode is None:
+                process.terminate()
+        for process in self.worker_processes:
+            await process.wait()
+        self.worker_processes.clear()
+
         if self.websocket_server:
             await self.websocket_server.stop()
 
+        if self.bus_server:
+            await self.bus_server.stop()
+
         if self.pairing_manager:
             await self.pairing_manager.stop()
 
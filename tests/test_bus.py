@@ -0,0 +1,350 @@
+import asyncio
+
+from nanobot.bus.events import InboundMessage, OutboundMessage
+from nanobot.bus.queue import BUSY_REPLY, MessageBus
+
+
+def _msg(content: str, lane: str = "interactive", channel: str = "mobile") -> InboundMessage:
+    return InboundMessage(channel=channel, sender_id="u", chat_id="c", content=content, lane=lane)
+
+
+async def test_higher_priority_lane_is_consumed_first() -> None:
+    bus = MessageBus()
+    await bus.publish_inbound(_msg("cron", lane="scheduled"))
+    await bus.publish_inbound(_msg("announce", lane="system"))
+    await bus.publish_inbound(_msg("chat"))
+
+    order = [(await bus.consume_inbound()).content for _ in range(3)]
+    assert order == ["chat", "announce", "cron"]
+    assert bus.get_stats()["inbound"]["scheduled"]["dequeued"] == 1
+
+
+async def test_overflow_policies() -> None:
+    bus = MessageBus(
+        lane_maxsize={"interactive": 2},
+        channel_policies={"mobile": "reject", "cli": "drop_oldest"},
+    )
+    assert await bus.publish_inbound(_msg("a"))
+    assert await bus.publish_inbound(_msg("b"))
+    assert not await bus.publish_inbound(_msg("c"))
+    busy = await bus.consume_outbound()
+    assert busy.content == BUSY_REPLY and busy.chat_id == "c"
+
+    assert await bus.publish_inbound(_msg("d", channel="cli"))
+    stats = bus.get_stats()["inbound"]["interactive"]
+    assert stats["rejected"] == 1 and stats["dropped"] == 1 and stats["depth"] == 2
+    assert (await bus.consume_inbound()).content == "b"
+    assert (await bus.consume_inbound()).content == "d"
+
+
+async def test_block_policy_waits_for_space() -> None:
+    bus = MessageBus(lane_maxsize={"interactive": 1})
+    await bus.publish_inbound(_msg("a"))
+    blocked = asyncio.create_task(bus.publish_inbound(_msg("b")))
+    await asyncio.sleep(0)
+    assert not blocked.done()
+
+    assert (await bus.consume_inbound()).content == "a"
+    assert await asyncio.wait_for(blocked, 1)
+    assert (await bus.consume_inbound()).content == "b"
+
+
+async def test_stop_wakes_idle_consumers_immediately() -> None:
+    from nanobot.bus.queue import BusClosedError
+
+    bus = MessageBus()
+    inbound = asyncio.create_task(bus.consume_inbound())
+    outbound = asyncio.create_task(bus.consume_outbound())
+    dispatcher = asyncio.create_task(bus.dispatch_outbound())
+    await asyncio.sleep(0)
+
+    bus.stop()
+    done, _ = await asyncio.wait({inbound, outbound, dispatcher}, timeout=0.5)
+    assert len(done) == 3
+    assert isinstance(inbound.exception(), BusClosedError)
+    assert isinstance(outbound.exception(), BusClosedError)
+    assert dispatcher.exception() is None
+    assert not await bus.publish_inbound(_msg("late"))
+
+
+async def test_slow_channel_does_not_block_others_and_failures_dead_letter() -> None:
+    bus = MessageBus(send_timeout=0.05, send_retries=1, retry_backoff=0.01)
+    delivered: list[str] = []
+    stall = asyncio.Event()
+
+    async def slow(msg: OutboundMessage) -> None:
+        await stall.wait()
+
+    async def fast(msg: OutboundMessage) -> None:
+        delivered.append(msg.content)
+
+    bus.subscribe_outbound("slow", slow)
+    bus.subscribe_outbound("fast", fast)
+    dispatcher = asyncio.create_task(bus.dispatch_outbound())
+
+    await bus.publish_outbound(OutboundMessage(channel="slow", chat_id="c", content="stuck"))
+    await bus.publish_outbound(OutboundMessage(channel="fast", chat_id="c", content="hi"))
+    await asyncio.sleep(0.01)
+    assert delivered == ["hi"]
+
+    await asyncio.sleep(0.2)
+    stats = bus.get_stats()["channels"]
+    assert stats["slow"]["timeouts"] == 2
+    assert stats["slow"]["dead_lettered"] == 1
+    assert stats["fast"]["sent"] == 1
+
+    bus.stop()
+    await asyncio.wait_for(dispatcher, 1)
+
+
+async def test_durable_bus_replays_uncommitted_messages(tmp_path) -> None:
+    from nanobot.bus.wal import InboundLog
+
+    bus = MessageBus(wal=InboundLog(tmp_path, segment_bytes=200, fsync_interval=0))
+    for text in ("one", "two", "three"):
+        await bus.publish_inbound(_msg(text))
+    bus.commit_inbound(await bus.consume_inbound())
+    bus.stop()
+
+    log = InboundLog(tmp_path)
+    restarted = MessageBus(wal=log)
+    assert [(await restarted.consume_inbound()).content for _ in range(2)] == ["two", "three"]
+    assert log.get_stats()["watermark"] == 0
+    assert len(list(tmp_path.glob("segment-*.log"))) > 1
+
+
+async def test_remote_bus_round_trip_over_unix_socket(tmp_path) -> None:
+    from nanobot.bus.ipc import BusServer, RemoteMessageBus
+
+    hub = MessageBus()
+    server = BusServer(hub, tmp_path / "bus.sock")
+    await server.start()
+    hub_dispatch = asyncio.create_task(hub.dispatch_outbound())
+
+    front = RemoteMessageBus(tmp_path / "bus.sock")
+    replies: list[str] = []
+
+    async def deliver(msg: OutboundMessage) -> None:
+        replies.append(msg.content)
+
+    front.subscribe_outbound("mobile", deliver)
+    await front.connect()
+    front_dispatch = asyncio.create_task(front.dispatch_outbound())
+
+    worker = RemoteMessageBus(tmp_path / "bus.sock")
+    await worker.connect()
+
+    assert await front.publish_inbound(_msg("first"))
+    assert await front.publish_inbound(_msg("second"))
+    msg = await asyncio.wait_for(worker.consume_inbound(), 1)
+    assert msg.content == "first"
+    await worker.publish_outbound(OutboundMessage(channel="mobile", chat_id=msg.chat_id, content="re: first"))
+    worker.commit_inbound(msg)
+
+    # Disconnecting mid-turn requeues the in-flight message for another worker
+    assert (await asyncio.wait_for(worker.consume_inbound(), 1)).content == "second"
+    worker.stop()
+    retry = RemoteMessageBus(tmp_path / "bus.sock")
+    await retry.connect()
+    assert (await asyncio.wait_for(retry.consume_inbound(), 1)).content == "second"
+
+    for _ in range(50):
+        if replies:
+            break
+        await asyncio.sleep(0.01)
+    assert replies == ["re: first"]
+
+    for bus in (retry, front, hub):
+        bus.stop()
+    await asyncio.gather(hub_dispatch, front_dispatch)
+    await server.stop()
+
+
+async def test_redelivered_message_gets_cached_response() -> None:
+    bus = MessageBus()
+    first = _msg("hello")
+    first.message_id = "m1"
+    assert await bus.publish_inbound(first)
+
+    copy = _msg("hello")
+    copy.message_id = "m1"
+    assert await bus.publish_inbound(copy)  # In progress: accepted, not queued again
+    assert bus.inbound_size == 1
+
+    msg = await bus.consume_inbound()
+    bus.commit_inbound(msg, OutboundMessage(channel="mobile", chat_id="c", content="hi there"))
+    assert await bus.publish_inbound(copy)
+    assert bus.inbound_size == 0
+    assert (await bus.consume_outbound()).content == "hi there"
+    assert bus.get_stats()["dedup"]["duplicates"] == 2
+
+
+async def test_fair_share_serves_light_sender_before_heavy_backlog() -> None:
+    bus = MessageBus(fair_share_weights={"vip": 10})
+
+    def from_sender(sender: str, content: str) -> InboundMessage:
+        return InboundMessage(channel="mobile", sender_id=sender, chat_id=sender, content=content)
+
+    for i in range(3):
+        await bus.publish_inbound(from_sender("heavy", f"h{i}"))
+    await bus.publish_inbound(from_sender("light", "l0"))
+    await bus.publish_inbound(from_sender("vip", "v0"))
+    await bus.publish_inbound(from_sender("vip", "v1"))
+
+    order = []
+    for _ in range(6):
+        msg = await bus.consume_inbound()
+        order.append(msg.content)
+        await asyncio.sleep(0.01)  # Simulated turn
+        bus.commit_inbound(msg)
+
+    assert order[:3] == ["h0", "l0", "v0"]
+    assert order.index("v1") < order.index("h1")
+    senders = bus.get_stats()["senders"]
+    assert senders["mobile:heavy"]["served"] == 3
+    assert senders["mobile:vip"]["weight"] == 10
+
+
+async def test_wal_trims_torn_tail_before_appending(tmp_path) -> None:
+    from nanobot.bus.wal import InboundLog
+
+    log = InboundLog(tmp_path, fsync_interval=0)
+    await log.append(_msg("one"))
+    log.close()
+    segment = next(tmp_path.glob("segment-*.log"))
+    with open(segment, "ab") as f:
+        f.write(b'{"channel": "mobile", "sender_id": "u", "cont')  # Crash mid-write
+
+    log = InboundLog(tmp_path, fsync_interval=0)
+    await log.append(_msg("two"))
+    log.close()
+    assert [m.content for m in InboundLog(tmp_path).replay()] == ["one", "two"]
+
+
+async def test_block_policy_holds_slot_across_wal_write(tmp_path) -> None:
+    from nanobot.bus.wal import InboundLog
+
+    bus = MessageBus(lane_maxsize={"interactive": 2}, wal=InboundLog(tmp_path, fsync_interval=0.01))
+    publishers = [asyncio.create_task(bus.publish_inbound(_msg(str(i)))) for i in range(5)]
+    await asyncio.sleep(0.05)
+    assert bus.get_stats()["inbound"]["interactive"]["depth"] == 2
+
+    for _ in range(5):
+        msg = await asyncio.wait_for(bus.consume_inbound(), 1)
+        bus.commit_inbound(msg)
+        assert bus.get_stats()["inbound"]["interactive"]["depth"] <= 2
+    assert all(await asyncio.gather(*publishers))
+    bus.wal.close()
+
+
+async def test_process_inbound_returns_reply_to_publisher() -> None:
+    from nanobot.bus.events import REPLY_TO_CALLER
+
+    bus = MessageBus()
+    pending = asyncio.create_task(bus.process_inbound(_msg("cron job", lane="scheduled", channel="cli")))
+    msg = await bus.consume_inbound()
+    assert msg.lane == "scheduled" and msg.metadata[REPLY_TO_CALLER]
+
+    bus.commit_inbound(msg, OutboundMessage(channel="cli", chat_id="c", content="done"))
+    assert (await asyncio.wait_for(pending, 1)).content == "done"
+    assert bus.outbound.empty()
+
+
+async def test_channel_manager_delivers_through_bus_workers() -> None:
+    from nanobot.channels.base import BaseChannel
+    from nanobot.channels.manager import ChannelManager
+    from nanobot.config.schema import Config
+
+    sent: list[str] = []
+
+    class StubChannel(BaseChannel):
+        name = "stub"
+
+        async def start(self) -> None:
+            self._running = True
+
+        async def stop(self) -> None:
+            self._running = False
+
+        async def send(self, msg: OutboundMessage) -> None:
+            sent.append(msg.content)
+
+    bus = MessageBus()
+    manager = ChannelManager(Config(), bus)
+    manager.channels["stub"] = StubChannel(None, bus)
+    await manager.start_all()
+
+    await bus.publish_outbound(OutboundMessage(channel="stub", chat_id="c", content="hi"))
+    for _ in range(100):
+        if sent:
+            break
+        await asyncio.sleep(0.01)
+    assert sent == ["hi"]
+    assert manager.get_status()["stub"]["outbound"]["sent"] == 1
+
+    await manager.stop_all()
+    assert not bus.has_subscribers("stub") and bus.get_channel_stats("stub") is None
+
+
+def test_fair_share_tracks_messages_by_uid_across_copies() -> None:
+    from nanobot.bus.fair import FairScheduler
+
+    fair = FairScheduler()
+    msg = InboundMessage(channel="cli", sender_id="a", chat_id="c", content="x")
+    flow = fair.enqueue(msg)
+    fair.dispatch(flow, msg, wait_s=0.0)
+
+    # The WAL and IPC hand back a reconstructed copy, not the original object
+    copy = InboundMessage.from_dict(msg.to_dict())
+    assert copy is not msg and copy.uid == msg.uid
+    fair.done(copy)
+    assert flow.inflight == 0
+
+
+async def test_wal_persists_commits_in_batches_off_the_loop(tmp_path, monkeypatch) -> None:
+    import json
+
+    from nanobot.bus.wal import InboundLog
+
+    log = InboundLog(tmp_path, fsync_interval=0, commit_interval=0.02)
+    writes = []
+    write = log._write_commit_state
+    monkeypatch.setattr(log, "_write_commit_state", lambda snapshot: (writes.append(snapshot), write(snapshot)))
+    offsets = [await log.append(_msg(str(i))) for i in range(10)]
+    for offset in offsets:
+        log.commit(offset)
+    assert log.get_stats()["unpersisted_commits"] == 10 and not writes
+
+    await asyncio.sleep(0.1)
+    assert len(writes) == 1 and log.get_stats()["unpersisted_commits"] == 0
+    assert json.loads((tmp_path / "committed.json").read_text())["watermark"] == 9
+
+    log.commit(await log.append(_msg("last")))
+    log.close()  # Flushes the pending batch
+    assert InboundLog(tmp_path).replay() == []
+
+
+async def test_remote_commit_is_not_stuck_behind_a_blocked_publish(tmp_path) -> None:
+    from nanobot.bus.ipc import BusServer, RemoteMessageBus
+
+    hub = MessageBus(lane_maxsize={"interactive": 1})
+    server = BusServer(hub, tmp_path / "bus.sock")
+    await server.start()
+    worker = RemoteMessageBus(tmp_path / "bus.sock")
+    other = RemoteMessageBus(tmp_path / "bus.sock")
+    await worker.connect()
+    await other.connect()
+
+    await hub.publish_inbound(_msg("one"))
+    first = await asyncio.wait_for(worker.consume_inbound(), 1)
+    await hub.publish_inbound(_msg("two"))  # Lane full; held back until "one" is committed
+
+    blocked = asyncio.create_task(worker.publish_inbound(_msg("three")))
+    await asyncio.sleep(0.05)
+    worker.commit_inbound(first)  # Sent after the blocked publish on the same connection
+    assert (await asyncio.wait_for(other.consume_inbound(), 1)).content == "two"
+    assert await asyncio.wait_for(blocked, 1)
+
+    for bus in (worker, other, hub):
+        bus.stop()
+    await server.stop()
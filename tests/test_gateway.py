@@ -0,0 +1,641 @@
+import asyncio
+import json
+
+import pytest
+
+from nanobot.gateway.connection import CLOSE_SLOW_CONSUMER, ConnectionState, ConnectionWriter
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent: list[str | bytes] = []
+        self.closed_with: int | None = None
+
+    async def send(self, frame: str | bytes) -> None:
+        await asyncio.sleep(self.delay)
+        self.sent.append(frame)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        self.closed_with = code
+
+
+async def test_writer_drops_or_disconnects_slow_consumers() -> None:
+    slow = FakeWebSocket(delay=1)
+    dropper = ConnectionWriter(slow, maxsize=2, policy="drop")
+    dropper.start()
+    results = [dropper.enqueue(f"m{i}") for i in range(5)]
+    await asyncio.sleep(0)
+    assert results == [True, True, False, False, False]
+    assert dropper.get_stats()["dropped"] == 3
+    assert slow.closed_with is None
+    await dropper.stop()
+
+    stuck = FakeWebSocket(delay=1)
+    closer = ConnectionWriter(stuck, maxsize=1, policy="disconnect", send_timeout=0.05)
+    closer.start()
+    closer.enqueue("a")
+    await asyncio.sleep(0.1)  # First send times out
+    assert stuck.closed_with == CLOSE_SLOW_CONSUMER
+    assert not closer.enqueue("b")
+    await closer.stop()
+
+
+async def test_writer_delivers_in_order() -> None:
+    ws = FakeWebSocket()
+    writer = ConnectionWriter(ws)
+    writer.start()
+    for i in range(3):
+        writer.enqueue(f"m{i}")
+    await asyncio.sleep(0.01)
+    assert ws.sent == ["m0", "m1", "m2"]
+    await writer.stop()
+
+
+async def test_connection_registry_lookups_and_reauth_cleanup() -> None:
+    from nanobot.gateway.websocket import AuthenticatedClient, SecureWebSocketServer
+
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=None)
+    old_ws, new_ws = FakeWebSocket(), FakeWebSocket()
+    for ws in (old_ws, new_ws):
+        server._connections[ws] = ConnectionState(ws, "10.0.0.1", ConnectionWriter(ws))
+        server._register_client(ws, AuthenticatedClient("dev1", "Phone", ws, 0.0))
+
+    assert server._find_device_id_by_websocket(old_ws) == "dev1"
+    assert server.authenticated_clients["dev1"].websocket is new_ws
+    assert server.authenticated_clients["dev1"].writer is server._connections[new_ws].writer
+
+
+async def test_broadcast_encodes_once_and_honours_filters() -> None:
+    from nanobot.gateway.websocket import AuthenticatedClient, SecureWebSocketServer
+
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=None)
+    sockets = {}
+    for name in ("a", "b", "c", "tablet"):
+        ws = FakeWebSocket()
+        writer = ConnectionWriter(ws)
+        writer.start()
+        server._connections[ws] = ConnectionState(ws, "10.0.0.1", writer)
+        server._register_client(ws, AuthenticatedClient(name, name.title(), ws, 0.0))
+        sockets[name] = ws
+
+    queued = await server.broadcast_message(
+        "hello",
+        exclude_device_id="a",
+        device_filter=lambda client: client.device_id != "tablet",
+    )
+    await asyncio.sleep(0.01)
+    assert queued == 2
+    assert [name for name, ws in sockets.items() if ws.sent] == ["b", "c"]
+    assert sockets["b"].sent[0] is sockets["c"].sent[0]  # One encoded frame shared by all
+    for state in server._connections.values():
+        await state.writer.stop()
+
+
+async def test_admission_limits_and_auth_deadline() -> None:
+    from nanobot.gateway.admission import CLOSE_AUTH_TIMEOUT, CLOSE_TRY_AGAIN_LATER
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+    class IdleWebSocket(FakeWebSocket):
+        def __init__(self, ip: str):
+            super().__init__()
+            self.remote_address = (ip, 1234)
+            self._closed = asyncio.Event()
+
+        async def close(self, code: int = 1000, reason: str = "") -> None:
+            self.closed_with = code
+            self._closed.set()
+
+        def __aiter__(self):
+            return self
+
+        async def __anext__(self):
+            await self._closed.wait()
+            raise StopAsyncIteration
+
+    server = SecureWebSocketServer(
+        "127.0.0.1", 0, pairing_manager=None, jwt_manager=None,
+        max_connections=3, max_connections_per_ip=2, auth_timeout=0.05,
+    )
+    sockets = [IdleWebSocket(ip) for ip in ("10.0.0.1", "10.0.0.1", "10.0.0.1", "10.0.0.2", "10.0.0.3")]
+    tasks = [asyncio.create_task(server._handle_connection(ws)) for ws in sockets]
+    await asyncio.sleep(0.01)
+
+    # Third socket from 10.0.0.1 hits the per-IP cap, the fifth the global cap
+    assert [ws.closed_with for ws in sockets] == [None, None, CLOSE_TRY_AGAIN_LATER, None, CLOSE_TRY_AGAIN_LATER]
+    assert server.get_admission_stats()["rejected"] == {"ip_limit": 1, "server_full": 1}
+
+    await asyncio.gather(*tasks)  # The rest never authenticate
+    stats = server.get_admission_stats()
+    assert sockets[0].closed_with == CLOSE_AUTH_TIMEOUT
+    assert (stats["accepted"], stats["auth_timeouts"], stats["open"], stats["unauthenticated"]) == (3, 3, 0, 0)
+
+
+def test_per_ip_connection_cap_is_off_by_default() -> None:
+    from nanobot.config.schema import MobileAppConfig
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+    # Behind the relay or a reverse proxy every client arrives from one address
+    server = SecureWebSocketServer.from_config(MobileAppConfig(), host="127.0.0.1", port=0, pairing_manager=None, jwt_manager=None)
+    for _ in range(50):
+        assert server.admission.admit("10.0.0.1") is None
+
+
+async def test_negotiated_binary_encoding_and_json_fallback() -> None:
+    msgpack = pytest.importorskip("msgpack")
+    from websockets.asyncio.client import connect
+
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=None)
+    await server.start()
+    port = next(iter(server._server.sockets)).getsockname()[1]
+    try:
+        async with connect(f"ws://127.0.0.1:{port}", subprotocols=["nanobot.msgpack", "nanobot.json"]) as ws:
+            assert ws.subprotocol == "nanobot.msgpack"
+            await ws.send(msgpack.packb({"type": "ping"}))
+            assert msgpack.unpackb(await ws.recv()) == {"type": "pong"}
+            await ws.send('{"type": "ping"}')  # JSON text is still understood
+            assert msgpack.unpackb(await ws.recv()) == {"type": "pong"}
+
+        async with connect(f"ws://127.0.0.1:{port}") as ws:
+            assert ws.subprotocol is None
+            await ws.send('{"type": "ping"}')
+            assert json.loads(await ws.recv()) == {"type": "pong"}
+    finally:
+        await server.stop()
+
+
+async def test_outbox_replays_missed_messages_after_last_seq() -> None:
+    from types import SimpleNamespace
+
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+    class StubJWT:
+        def verify(self, token: str):
+            return SimpleNamespace(device_id="dev1", device_name="Phone", issued_at=0.0)
+
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=StubJWT())
+
+    async def connect(last_seq: int | None) -> list[dict]:
+        ws = FakeWebSocket()
+        writer = ConnectionWriter(ws)
+        writer.start()
+        server._connections[ws] = ConnectionState(ws, "10.0.0.1", writer)
+        frame = {"type": "auth", "jwt_token": "t"}
+        if last_seq is not None:
+            frame["last_seq"] = last_seq
+        await server._handle_jwt_auth(ws, frame, "10.0.0.1")
+        await asyncio.sleep(0.01)
+        await writer.stop()
+        server._connections.pop(ws)
+        del server.authenticated_clients["dev1"]
+        return [json.loads(f) for f in ws.sent]
+
+    # Device offline: messages are kept, not dropped
+    for text in ("one", "two", "three"):
+        assert await server.send_to_device("dev1", text)
+
+    frames = await connect(last_seq=1)
+    assert frames[0]["last_seq"] == 3
+    assert [(f["seq"], f["content"]) for f in frames[1:]] == [(2, "two"), (3, "three")]
+
+    # Those were delivered but never acked, so a resume from seq 2 gets only 3;
+    # a client that doesn't track seqs gets nothing it already received
+    assert [f["seq"] for f in (await connect(last_seq=2))[1:]] == [3]
+    assert await connect(last_seq=None) == [frames[0]]
+
+
+async def test_websocket_auth_attempts_are_audited(tmp_path) -> None:
+    from types import SimpleNamespace
+
+    from nanobot.gateway.websocket import SecureWebSocketServer
+    from nanobot.security.hardening import AuditLogger
+
+    class StubJWT:
+        def verify(self, token: str):
+            if token == "good":
+                return SimpleNamespace(device_id="dev1", device_name="Phone", issued_at=0.0)
+            return None
+
+    audit = AuditLogger(tmp_path / "audit.log")
+    server = SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=StubJWT(), audit_logger=audit)
+    try:
+        for token in ("bad", "good"):
+            ws = FakeWebSocket()
+            writer = ConnectionWriter(ws)
+            writer.start()
+            server._connections[ws] = ConnectionState(ws, "10.0.0.1", writer)
+            await server._handle_jwt_auth(ws, {"type": "auth", "jwt_token": token}, "10.0.0.1")
+            await writer.stop()
+        events = audit.get_recent_events(10)
+        assert [(e["event_type"], e["success"]) for e in events] == [("access_denied", False), ("authentication", True)]
+        assert events[1]["device_id"] == "dev1" and events[0]["ip_address"] == "10.0.0.1"
+    finally:
+        audit.close()
+
+
+def test_from_config_builds_defaults_only_when_not_supplied(monkeypatch) -> None:
+    from nanobot.config.schema import EnterpriseConfig, MobileAppConfig
+    from nanobot.gateway import websocket
+    from nanobot.security.hardening import RateLimiter
+
+    def unexpected(*args, **kwargs):
+        raise AssertionError("default built although the caller supplied one")
+
+    monkeypatch.setattr(websocket, "AuditLogger", unexpected)
+    monkeypatch.setattr(websocket, "RateLimiter", unexpected)
+    supplied = {"rate_limiter": RateLimiter(60), "ip_rate_limiter": RateLimiter(300), "audit_logger": object()}
+    server = websocket.SecureWebSocketServer.from_config(
+        MobileAppConfig(), EnterpriseConfig(), host="127.0.0.1", port=0,
+        pairing_manager=None, jwt_manager=None, **supplied,
+    )
+    assert server.audit_logger is supplied["audit_logger"]
+    assert server.rate_limiter is supplied["rate_limiter"]
+
+
+async def test_cluster_routes_sends_and_moves_outbox_between_workers(tmp_path) -> None:
+    from types import SimpleNamespace
+
+    from nanobot.gateway.cluster import join_cluster
+    from nanobot.gateway.websocket import SecureWebSocketServer
+
+    class StubJWT:
+        def verify(self, token: str):
+            return SimpleNamespace(device_id="dev1", device_name="Phone", issued_at=0.0)
+
+    workers = [SecureWebSocketServer("127.0.0.1", 0, pairing_manager=None, jwt_manager=StubJWT()) for _ in range(2)]
+    nodes = [join_cluster(server, tmp_path, str(i)) for i, server in enumerate(workers)]
+    for node in nodes:
+        await node.start()
+
+    async def auth(server: SecureWebSocketServer, last_seq: int) -> FakeWebSocket:
+        ws = FakeWebSocket()
+        writer = ConnectionWriter(ws)
+        writer.start()
+        server._connections[ws] = ConnectionState(ws, "10.0.0.1", writer)
+        await server._handle_jwt_auth(ws, {"type": "auth", "jwt_token": "t", "last_seq": last_seq}, "10.0.0.1")
+        return ws
+
+    try:
+        # Device on worker 0; worker 1 sends to it through the registry
+        ws0 = await auth(workers[0], 0)
+        assert await workers[1].send_to_device("dev1", "hello")
+        await asyncio.sleep(0.01)
+        assert json.loads(ws0.sent[-1])["content"] == "hello"
+
+        # Device drops; a message sent meanwhile waits in worker 0's outbox
+        await workers[0]._connections[ws0].writer.stop()
+        del workers[0]._connections[ws0], workers[0].authenticated_clients["dev1"]
+        await nodes[0].release("dev1")
+        assert await workers[1].send_to_device("dev1", "missed")
+
+        # It reconnects to worker 1, which takes the outbox over and replays
+        ws1 = await auth(workers[1], 1)
+        await asyncio.sleep(0.01)
+        assert [json.loads(f).get("content") for f in ws1.sent] == [None, "missed"]
+        assert workers[0].outbox.peek("dev1") is None
+        for state in workers[1]._connections.values():
+            await state.writer.stop()
+    finally:
+        for node in nodes:
+            await node.stop()
+
+
+def test_jwt_verify_caches_until_exp_and_honours_revocation(monkeypatch) -> None:
+    import time
+
+    import jwt
+
+    from nanobot.auth.jwt_manager import JWTManager
+
+    manager = JWTManager(secret="x" * 40, expiry_hours=1, cache_size=2)
+    token = manager.generate_token("dev1", "Phone")
+
+    decodes = []
+    real_decode = jwt.decode
+    monkeypatch.setattr(jwt, "decode", lambda *a, **kw: decodes.append(1) or real_decode(*a, **kw))
+    assert manager.verify(token).device_name == "Phone"
+    assert manager.validate_token(token) == "dev1"
+    assert len(decodes) == 1  # Second check served from the cache
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 1)
+    manager.revoke_device("dev1")
+    assert manager.verify(token) is None
+    assert manager.restore_device("dev1") and manager.verify(token) is not None
+
+    monkeypatch.setattr(time, "time", lambda: real_time() + 7200)
+    assert manager.verify(token) is None  # Cached entry past exp is not trusted
+    assert manager.get_stats()["cached_tokens"] == 0
+
+
+def test_jwt_refresh_rejects_revoked_tokens(monkeypatch) -> None:
+    import time
+
+    from nanobot.auth.jwt_manager import JWTManager
+
+    manager = JWTManager(secret="x" * 40, expiry_hours=1)
+    old = manager.generate_token("dev1", "Phone")
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 1)
+    manager.revoke_device("dev1")
+    assert manager.refresh_token(old) is None
+
+    monkeypatch.undo()
+    manager.restore_device("dev1")
+    assert manager.verify(manager.refresh_token(old)).device_id == "dev1"
+
+
+def test_revocations_persist_and_reach_other_processes(tmp_path, monkeypatch) -> None:
+    import time
+
+    from nanobot.auth.jwt_manager import JWTManager
+    from nanobot.auth.revocation import RevocationStore
+
+    path = tmp_path / "revoked.db"
+    api = JWTManager(secret="x" * 40, revocation_store=RevocationStore(path))
+    worker = JWTManager(secret="x" * 40, revocation_store=RevocationStore(path), revocation_refresh_s=0)
+    token = api.generate_token("dev1", "Phone")
+    issued_at = worker.verify(token).issued_at
+
+    real_time = time.time
+    monkeypatch.setattr(time, "time", lambda: real_time() + 1)
+    api.revoke_device("dev1")
+    assert worker.verify(token) is None  # Seen by the other manager
+    assert not worker.is_revoked("dev1", issued_at + 1)  # Issued in the revocation's second
+
+    restarted = JWTManager(secret="x" * 40, revocation_store=RevocationStore(path))
+    assert restarted.is_revoked("dev1", issued_at)
+    assert restarted.restore_device("dev1")
+    assert not RevocationStore(path).load()
+
+
+def test_device_revocation_requires_admin_token() -> None:
+    from fastapi.testclient import TestClient
+
+    from nanobot.api.app import create_app
+    from nanobot.auth.jwt_manager import JWTManager
+    from nanobot.config.schema import Config
+
+    config = Config()
+    jwt_manager = JWTManager(secret="x" * 40)
+    client = TestClient(create_app(config, pairing_manager=None, jwt_manager=jwt_manager))
+    token = jwt_manager.generate_token("dev1", "Phone")
+
+    assert client.delete("/api/v1/auth/devices/dev1").status_code == 403  # No admin token configured
+    config.auth.admin_token = "admin-secret"
+    assert client.delete("/api/v1/auth/devices/dev1").status_code == 401
+    bad = {"Authorization": "Bearer wrong"}
+    assert client.delete("/api/v1/auth/devices/dev1", headers=bad).status_code == 401
+    assert jwt_manager.verify(token) is not None
+
+    ok = {"Authorization": "Bearer admin-secret"}
+    assert client.delete("/api/v1/auth/devices/dev1", headers=ok).status_code == 200
+    assert jwt_manager.is_revoked("dev1", 0)
+
+
+def test_gcra_limiter_allows_burst_then_paces_and_expires_lazily(monkeypatch) -> None:
+    import time
+
+    from nanobot.security.hardening import RateLimiter
+
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(requests_per_minute=60, block_duration_seconds=0, burst=3)
+
+    assert [limiter.hit("dev1") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.hit("dev1") == 1.0  # Next slot opens in one emission interval
+    assert limiter.hit("dev2") == 0.0  # Keys are independent
+    now[0] += 1.0
+    assert limiter.hit("dev1") == 0.0 and limiter.hit("dev1") > 0
+
+    now[0] += 10.0  # Both buckets are full again, so their state is dropped on the next check
+    limiter.hit("dev3")
+    assert limiter.get_stats()["tracked"] == 1
+
+
+def test_rate_limiter_zero_is_off_and_blocks_expire_lazily(monkeypatch) -> None:
+    import time
+
+    from nanobot.security.hardening import RateLimiter
+
+    assert all(RateLimiter(requests_per_minute=0).hit("dev") == 0.0 for _ in range(100))
+
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    limiter = RateLimiter(requests_per_minute=60, block_duration_seconds=30, burst=1)
+    for device in ("dev1", "dev2"):
+        limiter.hit(device)
+        assert limiter.hit(device) == 30.0
+    assert limiter.get_stats()["blocked"] == 2
+
+    now[0] += 31.0
+    limiter.hit("dev3")
+    assert limiter.get_stats()["blocked"] == 0
+
+
+def test_security_validator_trie_and_pattern_matcher() -> None:
+    from nanobot.security.hardening import SecurityValidator
+
+    validator = SecurityValidator(
+        ["10.0.0.0/8", "10.1.0.0/16", "192.168.1.5", "2001:db8::/32"],
+        enable_whitelist=True,
+        extra_patterns=[r"\bdrop\s+table\b", "abc", "cde"],
+    )
+    assert validator.validate_ip_address("10.200.0.1") == (True, None)
+    assert validator.validate_ip_address("::ffff:192.168.1.5") == (True, None)
+    assert validator.validate_ip_address("192.168.1.6") == (False, "IP address not allowed")
+    assert validator.validate_ip_address("2001:db9::1") == (False, "IP address not allowed")
+    assert validator.validate_ip_address("nope") == (False, "Invalid IP address")
+
+    assert validator.validate_message_content("once upon a time, on the table")[0]
+    for content in ["<SCRIPT>x</script>", "javaſcript:1", "a onclick = 1", "DROP  TABLE users", "ab cde"]:
+        assert not validator.validate_message_content(content)[0], content
+
+    defaults = SecurityValidator()
+    assert defaults.validate_message_content("once upon a time")[0]
+    assert not defaults.validate_message_content("JavaScript:alert(1)")[0]
+
+
+def test_pattern_matcher_reports_the_matching_pattern_from_one_regex() -> None:
+    from nanobot.security.hardening import PatternMatcher
+
+    patterns = ["ab", "abc", r"\bdrop\s+table\b", "x+y", r"\.exe\b", r"(\w)\1{3}"]
+    matcher = PatternMatcher(patterns)
+    assert [p for p, _ in matcher._separate] == [r"(\w)\1{3}"]  # Backreference: searched on its own
+    assert matcher._combined.pattern.count("(?P<") == 5
+
+    cases = {"xABcx": "ab", "Drop Table t": r"\bdrop\s+table\b", "xxy": "x+y", "a.EXE": r"\.exe\b", "zzzz": r"(\w)\1{3}"}
+    for content, pattern in cases.items():
+        assert matcher.search(content) == pattern, content
+    assert matcher.search("abc") in ("ab", "abc")
+    assert matcher.search("backdrop the chair; run exe files") is None
+
+
+def test_audit_logger_batches_rotates_into_indexed_segments(tmp_path) -> None:
+    import gzip
+
+    from nanobot.security.hardening import AuditLogger
+
+    audit = AuditLogger(
+        tmp_path / "audit.log", max_file_size_mb=0.01, max_files=2, batch_size=20, block_size=2048
+    )
+    try:
+        for i in range(300):
+            audit.log("authentication", device_id=f"d{i}", details={"i": i})
+            if i % 20 == 19:
+                assert audit.flush(5)
+
+        segments = audit._segments()
+        assert len(segments) == 2  # Older segments pruned
+        assert all((s.parent / (s.name + ".idx")).exists() for s in segments)
+        archived = [json.loads(line) for line in gzip.open(segments[0]).read().splitlines()]
+
+        assert [e["details"]["i"] for e in audit.get_recent_events(3)] == [297, 298, 299]
+        window = audit.get_events(since=archived[5]["timestamp"], limit=4)
+        assert [e["details"]["i"] for e in window] == [archived[5]["details"]["i"] + k for k in range(4)]
+
+        audit.log("access_denied")  # Still buffered, but visible to readers
+        assert audit.get_recent_events(1)[0]["event_type"] == "access_denied"
+    finally:
+        audit.close()
+
+
+def test_audit_logger_archives_legacy_files_and_reads_files_being_archived(tmp_path) -> None:
+    from nanobot.security.hardening import AuditLogger
+
+    def write(path, start, count):
+        lines = [
+            json.dumps({"timestamp": f"2025-01-01T00:00:{start + i:02d}.000000Z", "event_type": "auth", "i": start + i})
+            for i in range(count)
+        ]
+        path.write_text("\n".join(lines) + "\n")
+
+    # Old rotation scheme: audit.3 is the oldest
+    for n, start in ((3, 0), (2, 10), (1, 20)):
+        write(tmp_path / f"audit.{n}", start, 10)
+    write(tmp_path / "audit.log.rotating", 30, 5)  # Rotated, not yet compressed
+
+    reader = AuditLogger(tmp_path / "audit.log", read_only=True)
+    assert [e["i"] for e in reader.get_events(limit=100)] == list(range(30, 35))
+
+    audit = AuditLogger(tmp_path / "audit.log", max_files=3)
+    try:
+        audit.log("access_denied")
+        assert audit.flush(5)
+        assert not list(tmp_path.glob("audit.[0-9]")) and not (tmp_path / "audit.log.rotating").exists()
+        assert len(audit._segments()) == 3  # The oldest legacy file was pruned
+        events = reader.get_events(limit=100)
+        assert [e.get("i") for e in events] == list(range(10, 35)) + [None]
+        assert reader.get_recent_events(2)[0]["i"] == 34
+    finally:
+        audit.close()
+        reader.close()
+
+
+async def test_pairing_sessions_render_off_loop_and_expire_via_heap(monkeypatch) -> None:
+    import time
+
+    from nanobot.pairing.manager import PairingManager
+
+    manager = PairingManager("ws://localhost:8765", session_expiry_minutes=1)
+    try:
+        session_id, png = await manager.create_pairing_session_async()
+        assert png.startswith(b"\x89PNG")
+        session = manager.get_session(session_id)
+        ascii_qr = manager.generate_qr_ascii(session_id, session.temp_token)
+        assert "██" in ascii_qr and len(set(map(len, ascii_qr.splitlines()))) == 1
+
+        redeemed = manager.create_session()
+        assert manager.validate_pairing(redeemed.session_id, redeemed.temp_token, {"device_name": "phone"})
+        assert not manager.validate_pairing(redeemed.session_id, redeemed.temp_token, {})  # Single use
+
+        real_time = time.time
+        monkeypatch.setattr(time, "time", lambda: real_time() + 61)
+        assert manager.get_active_session_count() == 0
+        assert manager.store._heap == []
+    finally:
+        await manager.stop()
+
+
+async def test_pairing_cleanup_sleeps_until_the_earliest_expiry() -> None:
+    from nanobot.pairing.manager import PairingManager
+
+    manager = PairingManager("ws://localhost:8765", session_expiry_minutes=0.002)  # 120 ms
+    await manager.start()
+    try:
+        await asyncio.sleep(0.05)  # Idle: waiting on an empty store
+        manager.create_session()
+        redeemed = manager.create_session()
+        assert manager.validate_pairing(redeemed.session_id, redeemed.temp_token, {})
+        assert manager.store.next_expiry() is not None
+        await asyncio.sleep(0.3)
+        assert not manager.store._sessions and manager.store._heap == []
+        assert manager.store.next_expiry() is None
+    finally:
+        await manager.stop()
+
+
+def test_sqlite_pairing_store_is_shared_and_single_use(tmp_path) -> None:
+    from nanobot.pairing.manager import PairingManager
+    from nanobot.pairing.store import SQLitePairingStore
+
+    path = tmp_path / "pairing.db"
+    relay_a = PairingManager("ws://relay", store=SQLitePairingStore(path))
+    relay_b = PairingManager("ws://relay", store=SQLitePairingStore(path))
+
+    session = relay_a.create_session()
+    assert relay_b.get_session(session.session_id).temp_token == session.temp_token
+    assert relay_b.get_active_session_count() == 1
+
+    assert not relay_b.validate_pairing(session.session_id, "wrong", {})  # Wrong token keeps the session
+    assert relay_b.validate_pairing(session.session_id, session.temp_token, {"device_name": "phone"})
+    assert not relay_a.validate_pairing(session.session_id, session.temp_token, {})
+    assert relay_a.store.redeem(session.session_id, session.temp_token) == (None, "session not found")
+
+    expired = relay_a.create_session()
+    relay_a.store._db.execute("UPDATE pairing_sessions SET expires_at = 0")
+    assert relay_b.store.redeem(expired.session_id, expired.temp_token) == (None, "session expired")
+    assert relay_a.get_active_session_count() == 0
+
+
+def test_pairing_from_config_opens_a_store_only_when_none_is_passed(tmp_path) -> None:
+    from nanobot.config.schema import Config
+    from nanobot.pairing.manager import PairingManager
+    from nanobot.pairing.store import MemoryPairingStore
+
+    config = Config()
+    config.auth.pairing_store = str(tmp_path / "pairing.db")
+    store = MemoryPairingStore()
+    assert PairingManager.from_config(config, "ws://relay", store=store).store is store
+    assert not (tmp_path / "pairing.db").exists()
+
+    manager = PairingManager.from_config(config, "ws://relay")
+    assert manager.store.blocking and (tmp_path / "pairing.db").exists()
+    manager.store.close()
+
+
+async def test_sqlite_pairing_redeem_waits_for_lock_off_the_event_loop(tmp_path) -> None:
+    import sqlite3
+    import time
+
+    from nanobot.pairing.manager import PairingManager
+    from nanobot.pairing.store import SQLitePairingStore
+
+    path = tmp_path / "pairing.db"
+    manager = PairingManager("ws://relay", store=SQLitePairingStore(path))
+    session = await manager.create_session_async()
+
+    other = sqlite3.connect(str(path), isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # Another process mid-write
+    redeem = asyncio.create_task(manager.validate_pairing_async(session.session_id, session.temp_token, {}))
+    started = time.monotonic()
+    await asyncio.sleep(0.1)
+    assert time.monotonic() - started < 0.5 and not redeem.done()
+
+    other.execute("COMMIT")
+    assert await asyncio.wait_for(redeem, 5)
+    assert await manager.get_session_async(session.session_id) is None
+    other.close()
@@ -0,0 +1,127 @@
+from pathlib import Path
+
+from nanobot.agent.memory import MemoryStore
+from nanobot.utils.helpers import today_date
+
+
+def test_append_today_appends_without_rewriting(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.append_today("first")
+    store.append_today("second")
+
+    assert store.read_today() == f"# {today_date()}\n\nfirst\nsecond"
+
+
+def test_memory_context_tracks_file_changes(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term("likes tea")
+    assert "likes tea" in store.get_memory_context()
+
+    store.write_long_term("likes coffee instead")
+    context = store.get_memory_context()
+    assert "likes coffee instead" in context
+    assert "likes tea" not in context
+
+    store.memory_file.unlink()
+    assert store.read_long_term() == ""
+
+
+def test_small_memory_is_injected_in_full(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path)
+    store.write_long_term("# Memory\n\nUser prefers metric units.")
+
+    context = store.get_memory_context("what's the weather?")
+    assert context.startswith("## Long-term Memory")
+    assert "metric units" in context
+
+
+def test_large_memory_injects_pinned_and_relevant_chunks(tmp_path: Path) -> None:
+    store = MemoryStore(tmp_path, top_k=2, token_budget=500, full_injection_tokens=100)
+    filler = "\n\n".join(f"## Topic {i}\n\nUnrelated note number {i} about gardening." for i in range(50))
+    store.write_long_term(
+        "## Pinned\n\nAlways answer in English.\n\n"
+        "## Projects\n\nThe billing service is written in Rust.\n\n" + filler
+    )
+
+    context = store.get_memory_context("which language is the billing service?")
+    assert "Always answer in English." in context
+    assert "billing service is written in Rust" in context
+    assert "Unrelated note number 7" not in context
+    assert len(context) < 1000
+
+
+async def test_consolidation_merges_old_notes_and_archives(tmp_path: Path) -> None:
+    from nanobot.agent.consolidation import MemoryConsolidator
+
+    store = MemoryStore(tmp_path)
+    store.write_long_term("## Pinned\n\nNever share secrets.\n\n## Facts\n\n- likes tea")
+    for day in ("2020-01-01", "2020-01-02"):
+        (store.memory_dir / f"{day}.md").write_text(f"# {day}\n\n- likes tea\n- met Sam on {day}")
+    store.append_today("- fresh note")
+
+    consolidator = MemoryConsolidator(store, provider=None, keep_days=7)
+    report = await consolidator.consolidate(dry_run=True)
+    assert report.merged_files == ["2020-01-01.md", "2020-01-02.md"]
+    assert report.bytes_saved > 0
+    assert (store.memory_dir / "2020-01-01.md").exists()
+
+    report = await consolidator.consolidate()
+    memory = store.read_long_term()
+    assert memory.startswith("## Pinned\n\nNever share secrets.")
+    assert memory.count("likes tea") == 1
+    assert "met Sam on 2020-01-02" in memory
+    assert not (store.memory_dir / "2020-01-01.md").exists()
+    assert (consolidator.archive_dir / "2020-01-01.md").exists()
+    assert [p.name for p in store.list_memory_files()] == [store.get_today_file().name]
+
+
+async def test_consolidation_cap_keeps_newest_notes(tmp_path: Path) -> None:
+    from nanobot.agent.consolidation import MemoryConsolidator
+
+    store = MemoryStore(tmp_path)
+    for day in range(1, 21):
+        (store.memory_dir / f"2020-01-{day:02d}.md").write_text(f"- note from day {day} " + "x" * 40)
+
+    await MemoryConsolidator(store, provider=None, keep_days=7, max_bytes=300).consolidate()
+    memory = store.read_long_term()
+    assert len(memory.encode("utf-8")) <= 300
+    assert "note from day 20 " in memory
+    assert "note from day 1 " not in memory
+
+
+async def test_consolidation_cap_trims_new_notes_before_existing_memory(tmp_path: Path) -> None:
+    from nanobot.agent.consolidation import MemoryConsolidator
+
+    store = MemoryStore(tmp_path)
+    store.write_long_term("## Facts\n\n- oldest curated fact\n\n- second fact")
+    for day in range(1, 11):
+        (store.memory_dir / f"2020-01-{day:02d}.md").write_text(f"- note from day {day} " + "x" * 40)
+
+    await MemoryConsolidator(store, provider=None, keep_days=7, max_bytes=250).consolidate()
+    memory = store.read_long_term()
+    assert len(memory.encode("utf-8")) <= 250
+    assert memory.startswith("## Facts\n\n- oldest curated fact\n\n- second fact")
+    assert "note from day 10 " in memory and "note from day 1 " not in memory
+
+    # One paragraph larger than the cap is cut inside it, never emptied
+    store.write_long_term("- " + "y" * 400)
+    await MemoryConsolidator(store, provider=None, keep_days=7, max_bytes=100).consolidate()
+    memory = store.read_long_term()
+    assert memory.startswith("- yyy") and len(memory.encode("utf-8")) <= 100
+
+
+def test_consolidation_job_follows_config(tmp_path: Path) -> None:
+    from nanobot.agent.consolidation import CONSOLIDATION_JOB_NAME, sync_consolidation_job
+    from nanobot.config.schema import MemoryConsolidationConfig
+    from nanobot.cron.service import CronService
+
+    cron = CronService(tmp_path / "jobs.json")
+    first = sync_consolidation_job(cron, MemoryConsolidationConfig(enabled=True, schedule="0 3 * * *"))
+    assert sync_consolidation_job(cron, MemoryConsolidationConfig(enabled=True, schedule="0 3 * * *")).id == first.id
+
+    job = sync_consolidation_job(cron, MemoryConsolidationConfig(enabled=True, schedule="30 4 * * *"))
+    jobs = [j for j in cron.list_jobs(include_disabled=True) if j.name == CONSOLIDATION_JOB_NAME]
+    assert jobs == [job] and job.schedule.expr == "30 4 * * *"
+
+    assert sync_consolidation_job(cron, MemoryConsolidationConfig()) is None  # Opt-in
+    assert not cron.list_jobs(include_disabled=True)
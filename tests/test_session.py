@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from nanobot.session.manager import Session, SessionManager
+
+
+def test_history_is_cached_until_append() -> None:
+    session = Session(key="cli:direct")
+    session.add_message("user", "hi")
+    session.add_message("assistant", "hello")
+
+    first = session.get_history()
+    assert first == [
+        {"role": "user", "content": "hi"},
+        {"role": "assistant", "content": "hello"},
+    ]
+    assert session.get_history() is first
+
+    session.add_message("user", "again")
+    second = session.get_history()
+    assert second is not first
+    assert len(second) == 3
+    assert session.get_history(max_messages=1) == [{"role": "user", "content": "again"}]
+
+
+def test_save_and_load_roundtrip(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+    manager = SessionManager(tmp_path / "workspace")
+
+    session = manager.get_or_create("mobile:device_1")
+    session.add_message("user", "ping", tool="x")
+    session.add_message("assistant", "pong")
+    manager.save(session)
+
+    loaded = SessionManager(tmp_path / "workspace").get_or_create("mobile:device_1")
+    assert [m.to_dict()["content"] for m in loaded.messages] == ["ping", "pong"]
+    assert loaded.messages[0].extra == {"tool": "x"}
+    assert loaded.messages[0].timestamp == pytest.approx(session.messages[0].timestamp, abs=1e-3)
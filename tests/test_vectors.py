@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from nanobot.agent.vectors import HashingEmbedder, VectorStore
+
+np = pytest.importorskip("numpy")
+
+
+def test_hashing_embedder_is_normalised_and_stable() -> None:
+    embed = HashingEmbedder(dim=64)
+    a = embed(["deploy the billing service", ""])
+    b = embed(["deploy the billing service"])
+
+    assert a.shape == (2, 64)
+    assert np.allclose(np.linalg.norm(a[0]), 1.0)
+    assert not a[1].any()
+    assert np.array_equal(a[0], b[0])
+
+
+def test_vector_store_search_and_persistence(tmp_path: Path) -> None:
+    store = VectorStore(tmp_path, dim=128, initial_capacity=2)
+    store.upsert([
+        ("a", "MEMORY.md", "the billing service is written in rust"),
+        ("b", "MEMORY.md", "user likes green tea in the morning"),
+        ("c", "cli:direct", "we discussed the garden layout"),
+    ])
+    assert store.upsert([("a", "MEMORY.md", "the billing service is written in rust")]) == 0
+
+    hits = store.search("what language is the billing service", top_k=1)
+    assert [entry.key for entry, _ in hits] == ["a"]
+
+    store.remove(["a"])
+    store.flush()
+
+    reopened = VectorStore(tmp_path, dim=128)
+    assert len(reopened) == 2
+    assert sorted(reopened.keys()) == ["b", "c"]
+    hits = reopened.search("green tea", top_k=1)
+    assert hits[0][0].key == "b"
+
+
+async def test_recall_stays_within_the_current_session(tmp_path: Path) -> None:
+    from nanobot.agent.context import ContextBuilder
+
+    context = ContextBuilder(tmp_path)
+    await context.index_turn("mobile:alice", 1, "my bank pin is 4321", "Noted.")
+    await context.index_turn("mobile:bob", 1, "what is my bank pin?", "You have not told me.")
+    await context.index_turn("mobile:bob", 2, "my bank account is at Acme", "Got it.")
+
+    prompt = context.build_system_prompt(query="what is my bank pin", session_key="mobile:bob")
+    assert "4321" not in prompt  # Another user's conversation
+    assert "bank account is at Acme" in prompt
+
+    # Turns already in the history window are not repeated
+    history = [
+        {"role": "user", "content": "my bank account is at Acme"},
+        {"role": "assistant", "content": "Got it."},
+    ]
+    messages = context.build_messages(history, "what is my bank pin", channel="mobile", chat_id="bob")
+    assert "bank account is at Acme" not in messages[0]["content"]
+
+    shared = ContextBuilder(tmp_path, cross_session_recall=True)
+    assert "4321" in shared.build_system_prompt(query="what is my bank pin", session_key="mobile:bob")